@@ -0,0 +1,144 @@
+"""
+Monolithic vs fan-out analysis: latency and failure isolation against the fake Gemini.
+
+Starts benchmarks/fake_services.py with a per-output-token generation time (so, as with the
+real models, reply time grows with answer length), then runs the comprehensive resume and
+LinkedIn analyses in-process in both modes. PDF extraction and HTTP are left out so the
+numbers only reflect how the LLM work is split. Failed analyses raise; partial ones are
+fan-out results where some section came back as FANOUT_SECTION_UNAVAILABLE.
+
+With the default model list, fallbacks and retry rounds absorb most injected 429s; a single
+model with a high rate limit share shows what happens when a call fails for good.
+
+Usage (from the Backend directory):
+    python benchmarks/analysis_fanout.py --analyses 40 --concurrency 4
+    python benchmarks/analysis_fanout.py --models gemini-2.5-flash --rate-limit-rate 0.5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_services import add_fake_service_arguments
+from load_test import BACKEND_DIR, free_port, percentile, synthetic_document
+
+ENDPOINTS = {
+    "resume-comprehensive": "resume",
+    "linkedin-optimizer": "linkedin",
+}
+
+async def run_mode(app_module, endpoint: str, mode: str, documents: list, concurrency: int) -> dict:
+    run = app_module.run_comprehensive_analysis if endpoint == "resume-comprehensive" else app_module.run_linkedin_analysis
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures, partial, unavailable_fields = [], 0, 0, 0
+
+    async def one(text: str):
+        nonlocal failures, partial, unavailable_fields
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await run(text, mode)
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            missing = sum(value == app_module.FANOUT_SECTION_UNAVAILABLE for value in result.model_dump().values())
+            if missing:
+                partial += 1
+                unavailable_fields += missing
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in documents))
+    return {
+        "p50": percentile(latencies, 0.5) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "throughput": len(documents) / (time.perf_counter() - started),
+        "failed": failures,
+        "partial": partial,
+        "unavailableFields": unavailable_fields,
+    }
+
+async def compare_modes(app_module, args, stats_url: str):
+    # One event loop for every run: the router's semaphore and gRPC channel belong to it
+    async with httpx.AsyncClient(timeout=5) as client:
+        for endpoint, kind in ENDPOINTS.items():
+            documents = [synthetic_document(kind, index, args.words) for index in range(args.analyses)]
+            for mode in app_module.ANALYSIS_MODES:
+                calls_before = (await client.get(stats_url)).json()["geminiCalls"]
+                result = await run_mode(app_module, endpoint, mode, documents, args.concurrency)
+                calls = (await client.get(stats_url)).json()["geminiCalls"] - calls_before
+                print(f"{endpoint:22} {mode:10}  p50 {result['p50']:7.0f} ms  p99 {result['p99']:7.0f} ms  "
+                      f"{result['throughput']:6.2f}/s  failed {result['failed']:3}  partial {result['partial']:3} "
+                      f"({result['unavailableFields']} fields)  Gemini calls {calls}", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyses", type=int, default=40, help="Analyses per endpoint and mode")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--words", type=int, default=700, help="Words per synthetic document")
+    parser.add_argument("--models", help="GEMINI_MODELS for the app (defaults to its own list)")
+    add_fake_service_arguments(parser)
+    parser.set_defaults(latency_median_ms=400.0, latency_sigma=0.3, output_ms_per_token=8.0, malformed_rate=0.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="careerai-fanout-")
+    gemini_port, github_port = free_port(), free_port()
+    fake_log = open(os.path.join(workdir, "fake_services.log"), "w")
+    fake = subprocess.Popen(
+        [
+            sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "fake_services.py"),
+            "--gemini-port", str(gemini_port), "--github-port", str(github_port),
+            "--latency-median-ms", str(args.latency_median_ms), "--latency-sigma", str(args.latency_sigma),
+            "--output-ms-per-token", str(args.output_ms_per_token), "--malformed-rate", str(args.malformed_rate),
+            "--rate-limit-rate", str(args.rate_limit_rate), "--seed", str(args.seed),
+        ],
+        stdout=fake_log,
+        stderr=subprocess.STDOUT,
+    )
+    try:
+        stats_url = f"http://127.0.0.1:{github_port}/__stats"
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(stats_url, timeout=1)
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or fake.poll() is not None:
+                    sys.exit(f"fake services did not start; see {fake_log.name}")
+                time.sleep(0.2)
+
+        os.environ.update({
+            "GEMINI_API_KEY": "benchmark",
+            "GEMINI_API_ENDPOINT": f"127.0.0.1:{gemini_port}",
+            "GEMINI_API_INSECURE": "1",
+            "RESULT_CACHE_ENABLED": "0",
+            "QUOTA_BACKEND": "memory",
+            "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+            "RESUME_INDEX_DIR": os.path.join(workdir, "resume_index"),
+        })
+        if args.models:
+            os.environ["GEMINI_MODELS"] = args.models
+        import main as app_module
+        logging.disable(logging.CRITICAL)
+
+        print(f"{args.analyses} analyses per endpoint and mode at concurrency {args.concurrency}; fake Gemini "
+              f"{args.latency_median_ms:.0f} ms + {args.output_ms_per_token:g} ms/token, "
+              f"{args.rate_limit_rate:.0%} rate limited; LLM_MAX_CONCURRENCY={app_module.gemini_router.concurrency}")
+        asyncio.run(compare_modes(app_module, args, stats_url))
+    finally:
+        fake.terminate()
+        fake.wait(timeout=10)
+        fake_log.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
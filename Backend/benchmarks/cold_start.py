@@ -0,0 +1,92 @@
+"""
+Cold start: how long a fresh worker takes to answer /livez and to report ready on /readyz.
+
+Each run boots `uvicorn main:app` in a new process (as an autoscaler would), polls both
+probes every few milliseconds, and stops the server once it is ready. The LLM connectivity
+check does not gate readiness by default, so it is disabled here unless --llm-check is set.
+
+Usage (from the Backend directory):
+    python benchmarks/cold_start.py --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLL_INTERVAL = 0.005
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def import_seconds() -> float:
+    """Time to import the app module alone, in a fresh interpreter"""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def cold_start(env: dict, timeout: float) -> tuple:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    live_at = ready_at = None
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while ready_at is None and time.perf_counter() - started < timeout:
+                try:
+                    if live_at is None and client.get("/livez").status_code == 200:
+                        live_at = time.perf_counter() - started
+                    if live_at is not None and client.get("/readyz").status_code == 200:
+                        ready_at = time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(POLL_INTERVAL)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return live_at, ready_at
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--llm-check", action="store_true", help="Keep the Gemini connectivity check enabled")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "benchmark")
+    env.setdefault("JOB_WORKERS", "0")
+    if not args.llm_check:
+        env["WARMUP_LLM_CHECK"] = "0"
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    print(f"import main: median {statistics.median(imports) * 1000:.0f} ms")
+
+    live, ready = [], []
+    for run in range(args.runs):
+        live_at, ready_at = cold_start(env, args.timeout)
+        print(f"run {run + 1}: live {live_at * 1000 if live_at else float('nan'):.0f} ms, "
+              f"ready {ready_at * 1000 if ready_at else float('nan'):.0f} ms")
+        if live_at is not None:
+            live.append(live_at)
+        if ready_at is not None:
+            ready.append(ready_at)
+    if live:
+        print(f"/livez  first 200: median {statistics.median(live) * 1000:.0f} ms")
+    if ready:
+        print(f"/readyz first 200: median {statistics.median(ready) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
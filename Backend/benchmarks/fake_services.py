@@ -0,0 +1,313 @@
+"""
+Local stand-ins for Gemini and GitHub, so the app can be load tested without network access or quota.
+
+Gemini is served over plaintext gRPC (the SDK's async transport); point the app at it with
+GEMINI_API_ENDPOINT=127.0.0.1:<port> and GEMINI_API_INSECURE=1. Replies are synthesized from
+the response schema sent with each request, after a log-normal delay plus an optional per-output-token
+generation time; a configurable share of replies is malformed (fenced, with trailing commas) or rejected with RESOURCE_EXHAUSTED (429).
+
+GitHub serves /users/{user}/repos (paginated, with ETags), /repos/{owner}/{repo}/languages and /readme and the
+raw README URLs; point GITHUB_API_URL at http://127.0.0.1:<port> and GITHUB_RAW_URL at .../raw.
+Counters for both fakes are at GET /__stats on the GitHub port.
+
+Usage (from the Backend directory):
+    python benchmarks/fake_services.py --gemini-port 50051 --github-port 8090 --rate-limit-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+
+import grpc
+import uvicorn
+from google.ai import generativelanguage_v1beta as glm
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+GEMINI_SERVICE = "google.ai.generativelanguage.v1beta.GenerativeService"
+LANGUAGES = ["Python", "TypeScript", "JavaScript", "Go", "Rust", "Java", "C++", "Shell", None]
+FILLER = (
+    "Quantify the impact of each role, lead with the strongest project and align the skills "
+    "section with the keywords of the roles you are targeting."
+).split()
+
+class FakeServiceStats:
+    def __init__(self):
+        self.counters = {
+            "geminiCalls": 0,
+            "geminiStreams": 0,
+            "geminiRateLimited": 0,
+            "geminiMalformed": 0,
+            "githubRequests": 0,
+        }
+
+    def bump(self, name: str):
+        self.counters[name] += 1
+
+class FakeGemini:
+    """GenerativeService with configurable latency, malformed-JSON and 429 rates"""
+
+    def __init__(self, args, stats: FakeServiceStats):
+        self.rng = random.Random(args.seed)
+        self.latency_median = args.latency_median_ms / 1000
+        self.latency_sigma = args.latency_sigma
+        self.output_token_seconds = args.output_ms_per_token / 1000
+        self.malformed_rate = args.malformed_rate
+        self.rate_limit_rate = args.rate_limit_rate
+        self.stream_chunks = args.stream_chunks
+        self.stats = stats
+
+    def latency(self) -> float:
+        return self.rng.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+
+    def generation_time(self, text: str) -> float:
+        """Models emit tokens one after another, so long answers take longer"""
+        return max(1, len(text) // 4) * self.output_token_seconds
+
+    def sample(self, schema, name: str = ""):
+        kind = schema.type_
+        if kind == glm.Type.OBJECT:
+            return {key: self.sample(child, key) for key, child in schema.properties.items()}
+        if kind == glm.Type.ARRAY:
+            return [self.sample(schema.items, name) for _ in range(self.rng.randint(2, 5))]
+        if kind == glm.Type.INTEGER:
+            return self.rng.randint(1, 12)
+        if kind == glm.Type.NUMBER:
+            return round(self.rng.uniform(55, 95), 1)
+        if kind == glm.Type.BOOLEAN:
+            return self.rng.random() < 0.5
+        if name == "name":
+            return self.rng.choice(LANGUAGES[:-1])
+        return " ".join(self.rng.choice(FILLER) for _ in range(self.rng.randint(12, 40))).capitalize() + "."
+
+    def reply_text(self, request) -> str:
+        prompt = " ".join(part.text for content in request.contents for part in content.parts)
+        schema = request.generation_config.response_schema if "generation_config" in request else None
+        if schema is not None and schema.type_ == glm.Type.OBJECT:
+            payload = self.sample(schema)
+        elif prompt.startswith("Fix this text to be valid JSON"):
+            match = re.search(r"\{.*\}", prompt, re.DOTALL)
+            return re.sub(r",\s*([}\]])", r"\1", match.group(0)) if match else "{}"
+        else:
+            # Prompts without a schema (legacy mode) list their keys as "key": ... placeholders
+            payload = {}
+            for key in dict.fromkeys(re.findall(r'"(\w+)"\s*:', prompt)):
+                if key.lower().endswith("score"):
+                    payload[key] = round(self.rng.uniform(55, 95), 1)
+                elif key.endswith(("Distribution", "Activity")):
+                    payload[key] = [{"name": self.rng.choice(LANGUAGES[:-1]), "value": self.rng.randint(1, 9)}]
+                else:
+                    payload[key] = self.sample(glm.Schema(type_=glm.Type.STRING))
+            if not payload:
+                return "API working"
+
+        text = json.dumps(payload)
+        if self.rng.random() < self.malformed_rate:
+            self.stats.bump("geminiMalformed")
+            text = "```json\n" + json.dumps(payload, indent=2)[:-2] + ",\n}\n```"
+        return text
+
+    def response(self, text: str, prompt_tokens: int):
+        output_tokens = max(1, len(text) // 4)
+        return glm.GenerateContentResponse(
+            candidates=[
+                glm.Candidate(
+                    index=0,
+                    content=glm.Content(role="model", parts=[glm.Part(text=text)]),
+                    finish_reason=glm.Candidate.FinishReason.STOP,
+                )
+            ],
+            usage_metadata=glm.GenerateContentResponse.UsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    async def _admit(self, context) -> float:
+        delay = self.latency()
+        if self.rng.random() < self.rate_limit_rate:
+            self.stats.bump("geminiRateLimited")
+            await asyncio.sleep(delay / 10)
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Resource has been exhausted (e.g. check quota).")
+        return delay
+
+    @staticmethod
+    def prompt_tokens(request) -> int:
+        return sum(len(part.text) for content in request.contents for part in content.parts) // 4
+
+    async def generate_content(self, request, context):
+        self.stats.bump("geminiCalls")
+        delay = await self._admit(context)
+        text = self.reply_text(request)
+        await asyncio.sleep(delay + self.generation_time(text))
+        return self.response(text, self.prompt_tokens(request))
+
+    async def stream_generate_content(self, request, context):
+        self.stats.bump("geminiStreams")
+        delay = await self._admit(context)
+        text = self.reply_text(request)
+        delay += self.generation_time(text)
+        size = max(1, -(-len(text) // self.stream_chunks))
+        # Time to first chunk is a quarter of the total; the rest is spread over the chunks
+        await asyncio.sleep(delay / 4)
+        for start in range(0, len(text), size):
+            yield self.response(text[start:start + size], self.prompt_tokens(request))
+            await asyncio.sleep(delay * 3 / 4 / self.stream_chunks)
+
+    def handler(self):
+        return grpc.method_handlers_generic_handler(GEMINI_SERVICE, {
+            "GenerateContent": grpc.unary_unary_rpc_method_handler(
+                self.generate_content,
+                request_deserializer=glm.GenerateContentRequest.deserialize,
+                response_serializer=glm.GenerateContentResponse.serialize,
+            ),
+            "StreamGenerateContent": grpc.unary_stream_rpc_method_handler(
+                self.stream_generate_content,
+                request_deserializer=glm.GenerateContentRequest.deserialize,
+                response_serializer=glm.GenerateContentResponse.serialize,
+            ),
+        })
+
+def fake_github_app(args, stats: FakeServiceStats) -> Starlette:
+    """GitHub REST and raw-content endpoints with deterministic data per user and repository"""
+    latency = args.github_latency_ms / 1000
+
+    def seeded(*parts) -> random.Random:
+        return random.Random(hashlib.sha256("/".join(parts).encode()).hexdigest())
+
+    def repositories(username: str) -> list:
+        rng = seeded(username)
+        repos = []
+        for number in range(args.github_repos):
+            year = rng.randint(2016, 2025)
+            repos.append({
+                "name": f"{username}-project-{number}",
+                "full_name": f"{username}/{username}-project-{number}",
+                "description": " ".join(rng.choice(FILLER) for _ in range(rng.randint(0, 14))) or None,
+                "language": rng.choice(LANGUAGES),
+                "created_at": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+                "updated_at": f"{min(2026, year + rng.randint(0, 3))}-{rng.randint(1, 12):02d}-01T12:00:00Z",
+                "pushed_at": f"{min(2026, year + rng.randint(0, 3))}-{rng.randint(1, 12):02d}-01T12:00:00Z",
+                "stargazers_count": int(rng.paretovariate(1.2)) - 1,
+                "forks_count": int(rng.paretovariate(1.5)) - 1,
+                "size": rng.randint(10, 20000),
+                "fork": rng.random() < 0.15,
+                "archived": rng.random() < 0.05,
+            })
+        return repos
+
+    def readme(owner: str, repo: str) -> str:
+        rng = seeded(owner, repo)
+        sections = ["Installation", "Usage", "Configuration", "Contributing", "License"]
+        lines = [f"# {repo}", "", " ".join(rng.choice(FILLER) for _ in range(40)), ""]
+        for section in rng.sample(sections, rng.randint(2, len(sections))):
+            lines += [f"## {section}", "", " ".join(rng.choice(FILLER) for _ in range(rng.randint(20, 120))), ""]
+        return "\n".join(lines)
+
+    async def user_repos(request: Request):
+        stats.bump("githubRequests")
+        await asyncio.sleep(latency)
+        username = request.path_params["username"]
+        per_page = int(request.query_params.get("per_page", 30))
+        page = int(request.query_params.get("page", 1))
+        repos = repositories(username)
+        body = json.dumps(repos[(page - 1) * per_page:page * per_page])
+        etag = '"' + hashlib.sha256(body.encode()).hexdigest()[:20] + '"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"etag": etag})
+        headers = {"etag": etag, "x-ratelimit-remaining": "4999"}
+        last_page = max(1, -(-len(repos) // per_page))
+        if last_page > 1:
+            base = str(request.url.remove_query_params(["page"]))
+            headers["link"] = f'<{base}&page={min(page + 1, last_page)}>; rel="next", <{base}&page={last_page}>; rel="last"'
+        return Response(body, media_type="application/json", headers=headers)
+
+    async def repo_languages(request: Request):
+        stats.bump("githubRequests")
+        await asyncio.sleep(latency)
+        owner, repo = request.path_params["owner"], request.path_params["repo"]
+        match = next((item for item in repositories(owner) if item["name"] == repo), None)
+        if match is None:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        # Repositories without a primary language have no code, as on GitHub
+        languages = {}
+        if match["language"]:
+            rng = seeded(owner, repo, "languages")
+            languages[match["language"]] = rng.randint(20000, 400000)
+            for language in rng.sample([name for name in LANGUAGES if name], rng.randint(0, 3)):
+                languages.setdefault(language, rng.randint(500, 150000))
+        body = json.dumps(dict(sorted(languages.items(), key=lambda item: item[1], reverse=True)))
+        etag = '"' + hashlib.sha256(body.encode()).hexdigest()[:20] + '"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"etag": etag})
+        return Response(body, media_type="application/json", headers={"etag": etag, "x-ratelimit-remaining": "4999"})
+
+    async def repo_readme(request: Request):
+        stats.bump("githubRequests")
+        await asyncio.sleep(latency)
+        return PlainTextResponse(readme(request.path_params["owner"], request.path_params["repo"]))
+
+    async def raw_readme(request: Request):
+        stats.bump("githubRequests")
+        await asyncio.sleep(latency)
+        if request.path_params["name"] != "README.md":
+            return PlainTextResponse("404: Not Found", status_code=404)
+        return PlainTextResponse(readme(request.path_params["owner"], request.path_params["repo"]))
+
+    async def service_stats(request: Request):
+        return JSONResponse(stats.counters)
+
+    return Starlette(routes=[
+        Route("/users/{username}/repos", user_repos),
+        Route("/repos/{owner}/{repo}/languages", repo_languages),
+        Route("/repos/{owner}/{repo}/readme", repo_readme),
+        Route("/raw/{owner}/{repo}/HEAD/{name}", raw_readme),
+        Route("/__stats", service_stats),
+    ])
+
+async def serve(args):
+    stats = FakeServiceStats()
+    gemini = FakeGemini(args, stats)
+    grpc_server = grpc.aio.server()
+    grpc_server.add_generic_rpc_handlers((gemini.handler(),))
+    grpc_server.add_insecure_port(f"{args.host}:{args.gemini_port}")
+    await grpc_server.start()
+
+    config = uvicorn.Config(
+        fake_github_app(args, stats), host=args.host, port=args.github_port, log_level="warning", lifespan="off"
+    )
+    print(f"fake Gemini on {args.host}:{args.gemini_port}, fake GitHub on http://{args.host}:{args.github_port}", flush=True)
+    try:
+        await uvicorn.Server(config).serve()
+    finally:
+        await grpc_server.stop(grace=1)
+
+def add_fake_service_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-median-ms", type=float, default=800.0, help="Median Gemini reply time")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of Gemini reply times")
+    parser.add_argument(
+        "--output-ms-per-token", type=float, default=0.0, help="Extra Gemini reply time per generated token"
+    )
+    parser.add_argument("--malformed-rate", type=float, default=0.05, help="Share of replies with broken JSON")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.02, help="Share of calls rejected with 429")
+    parser.add_argument("--stream-chunks", type=int, default=8, help="Chunks per streamed reply")
+    parser.add_argument("--github-latency-ms", type=float, default=60.0)
+    parser.add_argument("--github-repos", type=int, default=45, help="Repositories per fake user")
+    parser.add_argument("--seed", type=int, default=17)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--gemini-port", type=int, default=50051)
+    parser.add_argument("--github-port", type=int, default=8090)
+    add_fake_service_arguments(parser)
+    asyncio.run(serve(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Keyword matching: accuracy against a labelled fixture, and per-resume latency.
+
+Accuracy is pairwise ranking agreement: for every job description, each pair of
+resumes with different grades counts as correct when the better-graded resume
+scores higher. The legacy whitespace-split set overlap is reported alongside
+for comparison.
+
+Usage (from the Backend directory):
+    python benchmarks/keyword_match.py --iterations 2000
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "keyword_match_labelled.json")
+
+def legacy_keyword_match_score(resume_text: str, job_desc: str) -> float:
+    """The original set-overlap scorer"""
+    resume_words = set(resume_text.lower().split())
+    job_words = set(job_desc.lower().split())
+    if not job_words:
+        return 0.0
+    matches = resume_words.intersection(job_words)
+    return round((len(matches) / len(job_words)) * 100, 2)
+
+def pairwise_accuracy(cases: list, scorer) -> tuple:
+    correct = 0
+    total = 0
+    by_label = {}
+    for case in cases:
+        scored = [(resume["label"], scorer(resume["text"], case["jobDescription"])) for resume in case["resumes"]]
+        for label, score in scored:
+            by_label.setdefault(label, []).append(score)
+        for i, (label_a, score_a) in enumerate(scored):
+            for label_b, score_b in scored[i + 1:]:
+                if label_a == label_b:
+                    continue
+                total += 1
+                if (score_a - score_b) * (label_a - label_b) > 0:
+                    correct += 1
+    means = {label: round(statistics.mean(scores), 1) for label, scores in sorted(by_label.items())}
+    return correct / total, means
+
+def latency(cases: list, scorer, iterations: int, repeat_text: int) -> list:
+    pairs = [(resume["text"] * repeat_text, case["jobDescription"]) for case in cases for resume in case["resumes"]]
+    for resume_text, job_desc in pairs:
+        scorer(resume_text, job_desc)  # warm caches
+    samples = []
+    for index in range(iterations):
+        resume_text, job_desc = pairs[index % len(pairs)]
+        started = time.perf_counter()
+        scorer(resume_text, job_desc)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+def describe(samples: list) -> str:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    return f"p50 {p50:7.1f} µs   p99 {p99:7.1f} µs   mean {statistics.mean(samples):7.1f} µs"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--repeat-text", type=int, default=12,
+                        help="Repeat each fixture resume this many times to reach a realistic resume length")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    import main as app_module
+    logging.disable(logging.CRITICAL)
+
+    with open(FIXTURE, encoding="utf-8") as handle:
+        cases = json.load(handle)["cases"]
+
+    scorers = {"legacy set overlap": legacy_keyword_match_score, "keyword engine": app_module.keyword_match_score}
+    average_chars = statistics.mean(len(resume["text"]) * args.repeat_text for case in cases for resume in case["resumes"])
+    print(f"{sum(len(case['resumes']) for case in cases)} labelled resumes, {len(cases)} job descriptions")
+    for name, scorer in scorers.items():
+        accuracy, means = pairwise_accuracy(cases, scorer)
+        print(f"{name:>20}: pairwise accuracy {accuracy:6.1%}   mean score by grade {means}")
+    print(f"\nLatency per resume (~{average_chars:.0f} characters, {args.iterations} iterations)")
+    for name, scorer in scorers.items():
+        print(f"{name:>20}: {describe(latency(cases, scorer, args.iterations, args.repeat_text))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""
+Offline load test: the real app under concurrent traffic, against fake Gemini and GitHub servers.
+
+Boots benchmarks/fake_services.py and `uvicorn main:app` (pointed at the fakes, result cache off,
+jobs and resume index in a temporary directory), builds a corpus of synthetic resume and LinkedIn
+PDFs of varied sizes, then drives each endpoint in turn at the given concurrency. Every request
+uses a fresh document or username, so nothing is answered from a cache. Reports p50/p95/p99
+latency, throughput, error rate and the resident memory of the app's process tree.
+
+With a baseline (benchmarks/fixtures/load_test_baseline.json by default) the run exits with
+status 1 when an endpoint's p50, throughput or peak memory is worse than the baseline by more
+than --tolerance, its p95 by more than --tail-tolerance (a tail percentile over a few dozen
+requests is noisy), or its error rate rises by more than --error-tolerance.
+--update-baseline records the current run instead.
+
+Usage (from the Backend directory):
+    python benchmarks/load_test.py --requests 40 --concurrency 8
+    python benchmarks/load_test.py --endpoints github-profile,resume-search --update-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+import httpx
+
+from fake_services import add_fake_service_arguments
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "fixtures", "load_test_baseline.json")
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Kubernetes", "Docker", "AWS", "Terraform",
+    "React", "TypeScript", "GraphQL", "Kafka", "Spark", "Airflow", "pandas", "PyTorch", "CI/CD", "Go",
+]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Scaled", "Reduced", "Shipped", "Owned"]
+OBJECTS = [
+    "a billing service", "the data pipeline", "an internal search tool", "the CI pipeline",
+    "a recommendation API", "the onboarding flow", "a metrics dashboard", "the payments integration",
+]
+JOB_DESCRIPTION = (
+    "Senior backend engineer. Build and operate Python services on AWS with FastAPI, PostgreSQL and "
+    "Redis; own CI/CD, Docker and Kubernetes deployments; mentor engineers; experience with Kafka a plus."
+)
+# Words per document; requests cycle through the sizes so every endpoint sees the same mix
+DOCUMENT_SIZES = [250, 700, 2000]
+SCENARIOS = [
+    "resume-job-description",
+    "resume-comprehensive",
+    "resume-comprehensive-stream",
+    "linkedin-optimizer",
+    "github-profile",
+    "github-repository",
+    "resume-search",
+    "jobs-comprehensive",
+]
+# Which synthetic document each upload scenario sends; they are built before the timed run
+SCENARIO_DOCUMENTS = {
+    "resume-job-description": "resume",
+    "resume-comprehensive": "resume",
+    "resume-comprehensive-stream": "resume",
+    "linkedin-optimizer": "linkedin",
+    "jobs-comprehensive": "resume",
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def bullet(rng: random.Random) -> str:
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {', '.join(rng.sample(SKILLS, 3))}, " \
+           f"cutting latency by {rng.randint(10, 70)}% for {rng.randint(2, 90)}k users."
+
+def synthetic_document(kind: str, index: int, words: int) -> str:
+    rng = random.Random(f"{kind}-{index}")
+    name = f"Candidate {index}"
+    if kind == "linkedin":
+        headings = ["Headline", "About", "Experience", "Skills", "Activity", "Education"]
+    else:
+        headings = ["Summary", "Skills", "Experience", "Projects", "Education"]
+    lines = [name, f"candidate{index}@example.com | +1 555 {index:04d}", ""]
+    per_section = max(20, words // len(headings))
+    for heading in headings:
+        lines += [heading.upper(), ""]
+        if heading == "Skills":
+            lines.append(", ".join(rng.sample(SKILLS, 10)))
+        else:
+            text = []
+            while len(" ".join(text).split()) < per_section:
+                text.append(bullet(rng))
+            lines += [f"- {sentence}" for sentence in text]
+        lines.append("")
+    return "\n".join(lines)
+
+def synthetic_pdf(text: str) -> bytes:
+    import fitz
+
+    wrapped = []
+    for line in text.splitlines():
+        wrapped += textwrap.wrap(line, 100) or [""]
+    document = fitz.open()
+    for start in range(0, len(wrapped), 64):
+        page = document.new_page()
+        page.insert_text((48, 56), "\n".join(wrapped[start:start + 64]), fontsize=9)
+    data = document.tobytes()
+    document.close()
+    return data
+
+class Corpus:
+    """Synthetic PDFs, built lazily so each request gets a document nobody has uploaded before"""
+
+    def __init__(self):
+        self.next_index = 0
+
+    def pdf(self, kind: str) -> tuple:
+        index = self.next_index
+        self.next_index += 1
+        text = synthetic_document(kind, index, DOCUMENT_SIZES[index % len(DOCUMENT_SIZES)])
+        return f"{kind}-{index}.pdf", synthetic_pdf(text)
+
+def process_tree_rss(pid: int) -> float:
+    """Resident memory of a process and its descendants in MB (Linux /proc; 0 elsewhere)"""
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as status:
+                fields = dict(line.split(":", 1) for line in status if ":" in line)
+        except OSError:
+            continue
+        children.setdefault(int(fields["PPid"].strip()), []).append(int(entry))
+        rss[int(entry)] = int(fields.get("VmRSS", "0 kB").split()[0])
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total / 1024
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class LoadDriver:
+    def __init__(self, client: httpx.AsyncClient, corpus: Corpus, run_id: str):
+        self.client = client
+        self.corpus = corpus
+        self.run_id = run_id
+
+    async def request(self, scenario: str, index: int, document: tuple):
+        """One request for the scenario; returns the final HTTP status (599 for a failed stream or job)"""
+        client = self.client
+        username = f"load-{self.run_id}-{index}"
+        if scenario == "resume-job-description":
+            name, data = document
+            response = await client.post(
+                "/api/resume-analyzer/job-description",
+                files={"resume": (name, data, "application/pdf")}, data={"jobDescription": JOB_DESCRIPTION},
+            )
+            return response.status_code
+        if scenario == "resume-comprehensive":
+            name, data = document
+            response = await client.post("/api/resume-analyzer/comprehensive", files={"resume": (name, data, "application/pdf")})
+            return response.status_code
+        if scenario == "resume-comprehensive-stream":
+            name, data = document
+            async with client.stream(
+                "POST", "/api/resume-analyzer/comprehensive/stream", files={"resume": (name, data, "application/pdf")}
+            ) as response:
+                body = (await response.aread()).decode()
+            if response.status_code == 200 and ("event: error" in body or "event: complete" not in body):
+                return 599
+            return response.status_code
+        if scenario == "linkedin-optimizer":
+            name, data = document
+            response = await client.post("/api/linkedin-optimizer", files={"profile": (name, data, "application/pdf")})
+            return response.status_code
+        if scenario == "github-profile":
+            response = await client.post("/api/github-analyzer/profile", json={"githubUsername": username})
+            return response.status_code
+        if scenario == "github-repository":
+            response = await client.post(
+                "/api/github-analyzer/repository",
+                json={"repositoryUrl": f"https://github.com/{username}/{username}-project-0"},
+            )
+            return response.status_code
+        if scenario == "resume-search":
+            response = await client.post("/api/resume-index/search", json={"jobDescription": JOB_DESCRIPTION, "topK": 10})
+            return response.status_code
+        if scenario == "jobs-comprehensive":
+            name, data = document
+            response = await client.post(
+                "/api/jobs/resume-analyzer/comprehensive", files={"resume": (name, data, "application/pdf")}
+            )
+            if response.status_code != 202:
+                return response.status_code
+            job_id = response.json()["jobId"]
+            while True:
+                response = await client.get(f"/api/jobs/{job_id}")
+                if response.status_code != 200:
+                    return response.status_code
+                status = response.json()["status"]
+                if status == "completed":
+                    return 200
+                if status == "failed":
+                    return 599
+                await asyncio.sleep(0.05)
+        raise ValueError(f"unknown scenario {scenario}")
+
+    async def run(self, scenario: str, requests: int, concurrency: int) -> dict:
+        semaphore = asyncio.Semaphore(concurrency)
+        kind = SCENARIO_DOCUMENTS.get(scenario)
+        documents = [self.corpus.pdf(kind) if kind else None for _ in range(requests)]
+        latencies, errors, statuses = [], 0, {}
+
+        async def one(index: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    status = await self.request(scenario, index, documents[index])
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if not isinstance(status, int) or status >= 300:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(requests)))
+        elapsed = time.perf_counter() - started
+        return {
+            "requests": requests,
+            "p50Ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95Ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99Ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "throughputRps": round(requests / elapsed, 2),
+            "errorRate": round(errors / requests, 4),
+            "statuses": statuses,
+        }
+
+def wait_until(check, timeout: float, what: str, log_path: str):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if check():
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    with open(log_path, errors="replace") as log:
+        tail = log.read()[-3000:]
+    raise SystemExit(f"{what} did not become ready within {timeout:.0f}s\n{tail}")
+
+def compare(results: dict, baseline: dict, tolerance: float, tail_tolerance: float, error_tolerance: float) -> list:
+    regressions = []
+    for scenario, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(scenario)
+        if previous is None:
+            continue
+        for key, allowed in (("p50Ms", tolerance), ("p95Ms", tail_tolerance)):
+            if current[key] > previous[key] * (1 + allowed):
+                regressions.append(f"{scenario}: {key[:3]} {current[key]:.0f} ms vs baseline {previous[key]:.0f} ms")
+        if current["throughputRps"] < previous["throughputRps"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario}: throughput {current['throughputRps']:.2f}/s vs baseline {previous['throughputRps']:.2f}/s"
+            )
+        if current["errorRate"] > previous["errorRate"] + error_tolerance:
+            regressions.append(f"{scenario}: error rate {current['errorRate']:.1%} vs baseline {previous['errorRate']:.1%}")
+    if baseline.get("peakRssMb") and results["peakRssMb"] > baseline["peakRssMb"] * (1 + tolerance):
+        regressions.append(f"memory: peak RSS {results['peakRssMb']:.0f} MB vs baseline {baseline['peakRssMb']:.0f} MB")
+    return regressions
+
+async def drive(args, base_url: str, server_pid: int) -> dict:
+    corpus = Corpus()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {"endpoints": {}, "peakRssMb": 0.0}
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.request_timeout, limits=limits) as client:
+        driver = LoadDriver(client, corpus, run_id=f"{os.getpid()}")
+        for scenario in args.endpoints:
+            stats = await driver.run(scenario, args.requests, args.concurrency)
+            stats["rssMb"] = round(process_tree_rss(server_pid), 1)
+            results["endpoints"][scenario] = stats
+            results["peakRssMb"] = max(results["peakRssMb"], stats["rssMb"])
+            print(
+                f"{scenario:<28} p50 {stats['p50Ms']:>7.0f} ms  p95 {stats['p95Ms']:>7.0f} ms  "
+                f"p99 {stats['p99Ms']:>7.0f} ms  {stats['throughputRps']:>6.2f} req/s  "
+                f"errors {stats['errorRate']:>6.1%}  rss {stats['rssMb']:>6.0f} MB",
+                flush=True,
+            )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative p50/throughput/RSS regression")
+    parser.add_argument("--tail-tolerance", type=float, default=0.6, help="Allowed relative p95 regression")
+    parser.add_argument("--error-tolerance", type=float, default=0.02, help="Allowed absolute error-rate increase")
+    parser.add_argument("--app-env", action="append", default=[], metavar="NAME=VALUE", help="Extra app environment")
+    add_fake_service_arguments(parser)
+    args = parser.parse_args()
+    args.endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(args.endpoints) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix="careerai-load-")
+    gemini_port, github_port, app_port = free_port(), free_port(), free_port()
+    fake_args = [
+        "--gemini-port", str(gemini_port), "--github-port", str(github_port),
+        "--latency-median-ms", str(args.latency_median_ms), "--latency-sigma", str(args.latency_sigma),
+        "--output-ms-per-token", str(args.output_ms_per_token),
+        "--malformed-rate", str(args.malformed_rate), "--rate-limit-rate", str(args.rate_limit_rate),
+        "--stream-chunks", str(args.stream_chunks), "--github-latency-ms", str(args.github_latency_ms),
+        "--github-repos", str(args.github_repos), "--seed", str(args.seed),
+    ]
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "load-test",
+        "GEMINI_API_ENDPOINT": f"127.0.0.1:{gemini_port}",
+        "GEMINI_API_INSECURE": "1",
+        "GITHUB_API_URL": f"http://127.0.0.1:{github_port}",
+        "GITHUB_RAW_URL": f"http://127.0.0.1:{github_port}/raw",
+        "RESULT_CACHE_ENABLED": "0",
+        "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "JOBS_DATA_DIR": os.path.join(workdir, "job_documents"),
+        "RESUME_INDEX_DIR": os.path.join(workdir, "resume_index"),
+        "QUOTA_DB_PATH": os.path.join(workdir, "quota.sqlite3"),
+        "PYTHONWARNINGS": "ignore",
+    }
+    env.update(item.split("=", 1) for item in args.app_env)
+
+    fake_log_path, app_log_path = os.path.join(workdir, "fake_services.log"), os.path.join(workdir, "app.log")
+    fake_log, app_log = open(fake_log_path, "w"), open(app_log_path, "w")
+    processes = []
+    try:
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "fake_services.py"), *fake_args],
+            cwd=BACKEND_DIR, env=env, stdout=fake_log, stderr=subprocess.STDOUT,
+        ))
+        wait_until(
+            lambda: httpx.get(f"http://127.0.0.1:{github_port}/__stats", timeout=1).status_code == 200,
+            30, "fake services", fake_log_path,
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env, stdout=app_log, stderr=subprocess.STDOUT,
+        )
+        processes.append(server)
+        base_url = f"http://127.0.0.1:{app_port}"
+        wait_until(lambda: httpx.get(f"{base_url}/readyz", timeout=1).status_code == 200, 60, "app", app_log_path)
+
+        print(f"{args.requests} requests per endpoint at concurrency {args.concurrency}; "
+              f"fake Gemini median {args.latency_median_ms:.0f} ms, {args.malformed_rate:.0%} malformed, "
+              f"{args.rate_limit_rate:.0%} rate limited", flush=True)
+        results = asyncio.run(drive(args, base_url, server.pid))
+        results["fakeServices"] = httpx.get(f"http://127.0.0.1:{github_port}/__stats", timeout=5).json()
+        results["settings"] = {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latencyMedianMs": args.latency_median_ms,
+            "latencySigma": args.latency_sigma,
+            "outputMsPerToken": args.output_ms_per_token,
+            "malformedRate": args.malformed_rate,
+            "rateLimitRate": args.rate_limit_rate,
+            "githubLatencyMs": args.github_latency_ms,
+            "githubRepos": args.github_repos,
+        }
+        print(f"peak RSS {results['peakRssMb']:.0f} MB; fake services: {json.dumps(results['fakeServices'])}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        fake_log.close()
+        app_log.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against (run with --update-baseline to record one)")
+        return
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get("settings") != results["settings"]:
+        print("⚠️ baseline was recorded with different settings; the comparison is indicative only")
+    regressions = compare(results, baseline, args.tolerance, args.tail_tolerance, args.error_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print("no regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Event-loop latency under concurrent PDF uploads.
+
+Compares the old behaviour (PyMuPDF called directly inside the async handler)
+with extraction through the bounded process pool. While the uploads are being
+parsed, a probe coroutine measures how late the event loop wakes it up, which
+is the delay every other in-flight request (including /health) experiences.
+
+Usage (from the Backend directory):
+    python benchmarks/pdf_event_loop_latency.py --uploads 16 --pages 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+
+PROBE_INTERVAL = 0.005
+
+def make_pdf(pages: int) -> bytes:
+    """Build a synthetic text-heavy PDF"""
+    doc = fitz.open()
+    line = "Senior software engineer with Python, FastAPI and distributed systems experience. "
+    for page_number in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(36, 36, 576, 756), f"Page {page_number}\n" + line * 40, fontsize=8)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+async def probe(samples: list, stop: asyncio.Event):
+    """Record how late the loop resumes a coroutine that sleeps for a fixed interval"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+async def run_scenario(name: str, extract, pdf: bytes, uploads: int) -> dict:
+    samples = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(samples, stop))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(extract(pdf) for _ in range(uploads)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    errors = sum(1 for result in results if isinstance(result, Exception))
+    samples.sort()
+    return {
+        "scenario": name,
+        "wall_s": round(elapsed, 3),
+        "errors": errors,
+        "lag_p50_ms": round(statistics.median(samples), 2) if samples else 0.0,
+        "lag_p99_ms": round(samples[int(len(samples) * 0.99) - 1], 2) if samples else 0.0,
+        "lag_max_ms": round(samples[-1], 2) if samples else 0.0,
+        "probe_samples": len(samples),
+    }
+
+async def main_async(args):
+    import main
+
+    pdf = make_pdf(args.pages)
+    print(f"Synthetic PDF: {args.pages} pages, {len(pdf)} bytes, {args.uploads} concurrent uploads\n")
+
+    async def inline_extract(content: bytes):
+        # Pre-change behaviour: synchronous parse on the event loop
+        return main.extract_text_from_pdf(content)
+
+    pool = main.PDFExtractionPool(
+        workers=args.workers,
+        max_queued=args.uploads,
+        timeout=120.0,
+        retry_after=5,
+    )
+    pool.start()
+    try:
+        # Warm the worker processes so process start-up is not counted
+        await asyncio.gather(*(pool.extract(make_pdf(1)) for _ in range(args.workers)))
+        rows = [
+            await run_scenario("inline (before)", inline_extract, pdf, args.uploads),
+            await run_scenario(f"process pool x{args.workers} (after)", pool.extract, pdf, args.uploads),
+        ]
+    finally:
+        pool.shutdown()
+
+    header = f"{'scenario':<28}{'wall s':>9}{'errors':>8}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['scenario']:<28}{row['wall_s']:>9}{row['errors']:>8}"
+            f"{row['lag_p50_ms']:>12}{row['lag_p99_ms']:>12}{row['lag_max_ms']:>12}"
+        )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=16, help="concurrent uploads")
+    parser.add_argument("--pages", type=int, default=200, help="pages per synthetic PDF")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="pool worker processes")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(main_async(parse_args()))
@@ -0,0 +1,95 @@
+"""
+Resume term index: build time, on-disk size and search latency at pool scale.
+
+Builds an index of synthetic resumes in a temporary directory (through the same
+ResumeTermIndex.add() the endpoints use, including compaction), reopens it from
+disk as a fresh process would, and times ranking job descriptions against the
+whole pool.
+
+Usage (from the Backend directory):
+    python benchmarks/resume_index_search.py --documents 100000 --searches 50
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FILLER = (
+    "led built designed implemented improved delivered managed owned migrated reduced increased "
+    "customers platform service pipeline product features reliability latency revenue stakeholders "
+    "mentored engineers analysts release roadmap launch dashboard reporting automation quality"
+).split()
+
+JOB_DESCRIPTIONS = [
+    "Senior Data Scientist: Python, machine learning, deep learning, SQL, pandas, AWS. NLP is a plus.",
+    "Backend Engineer: Node.js, TypeScript, REST APIs, microservices, PostgreSQL, Docker, Kubernetes, CI/CD.",
+    "DevOps Engineer: AWS, Terraform, Kubernetes, Docker, Linux, monitoring, Python or Bash scripting.",
+    "Frontend Developer: React, TypeScript, HTML, CSS, Tailwind, unit testing, user experience.",
+    "C++ Systems Engineer: low latency, Linux, multithreading, data structures and algorithms, networking.",
+]
+
+def synthetic_resume(rng: random.Random, skills: list, terms: int) -> str:
+    chosen = rng.sample(skills, rng.randint(6, 18))
+    words = [rng.choice(FILLER) for _ in range(terms)]
+    for skill in chosen:
+        words.insert(rng.randrange(len(words) + 1), skill)
+    # A long tail of rare tokens (project names, employers) like real resumes have
+    words.extend(f"proj{rng.randint(0, 50000)}" for _ in range(rng.randint(2, 8)))
+    return " ".join(words)
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--terms", type=int, default=150, help="Filler words per synthetic resume")
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    import main as app_module
+    logging.disable(logging.CRITICAL)
+
+    rng = random.Random(7)
+    skills = [form for forms in app_module.KEYWORD_SKILL_LEXICON.values() for form in forms]
+    with tempfile.TemporaryDirectory() as directory:
+        index = app_module.ResumeTermIndex(
+            directory, app_module.keyword_matcher, app_module.RESUME_INDEX_COMPACT_POSTINGS
+        )
+        started = time.perf_counter()
+        for number in range(args.documents):
+            index.add(f"{number:064x}", f"resume-{number}.pdf", synthetic_resume(rng, skills, args.terms))
+        build_seconds = time.perf_counter() - started
+        print(f"Indexed {args.documents} resumes in {build_seconds:.1f}s "
+              f"({build_seconds / args.documents * 1e3:.2f} ms each), {index.compactions} compactions, "
+              f"{directory_size(directory) / 1e6:.1f} MB on disk")
+
+        reopened = app_module.ResumeTermIndex(
+            directory, app_module.keyword_matcher, app_module.RESUME_INDEX_COMPACT_POSTINGS
+        )
+        started = time.perf_counter()
+        reopened.load()
+        print(f"Reopened in {(time.perf_counter() - started) * 1e3:.0f} ms: {reopened.stats()}")
+
+        timings = []
+        for number in range(args.searches):
+            job_desc = JOB_DESCRIPTIONS[number % len(JOB_DESCRIPTIONS)]
+            started = time.perf_counter()
+            result = reopened.search(job_desc, args.top_k)
+            timings.append((time.perf_counter() - started) * 1e3)
+        timings.sort()
+        print(f"Search over {result['documents']} resumes, top {args.top_k}: "
+              f"p50 {timings[len(timings) // 2]:.1f} ms   p95 {timings[int(len(timings) * 0.95) - 1]:.1f} ms   "
+              f"mean {statistics.mean(timings):.1f} ms")
+        print("Top result for last query:", result["results"][0] if result["results"] else None)
+
+if __name__ == "__main__":
+    main()
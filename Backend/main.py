@@ -1,23 +1,60 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, status
+from fastapi import FastAPI, File, UploadFile, Form, Header, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-import google.generativeai as genai
-import fitz  # PyMuPDF
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Match
+from pydantic import BaseModel, ValidationError, create_model
 import httpx
 import json
 import os
-from typing import Optional
+from typing import Optional, Union
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
 from typing import List
 import asyncio
-from collections import Counter
+import bisect
+import contextvars
+from collections import Counter, OrderedDict, deque
 import re
+import hashlib
+import importlib
+import math
+import sqlite3
+import threading
+import time
+import multiprocessing
+import tempfile
+import zipfile
+import secrets
+import shutil
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 # Load environment variables from .env file
 load_dotenv()
 
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to the default"""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to the default"""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag (1/true/yes/on) from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 # Configure logging with more detail
 logging.basicConfig(
     level=logging.INFO,
@@ -55,13 +92,46 @@ if not GEMINI_API_KEY:
     logger.error("❌ GEMINI_API_KEY not found in environment variables")
     print("❌ GEMINI_API_KEY not found! Please check your .env file")
     # Don't raise error immediately, let the app start for health checks
-else:
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        print("✅ Gemini API configured successfully")
-    except Exception as e:
-        logger.error(f"❌ Error configuring Gemini API: {str(e)}")
-        print(f"❌ Error configuring Gemini API: {str(e)}")
+
+# Send Gemini calls to another host:port, e.g. the fake server in benchmarks/fake_services.py.
+# GEMINI_API_INSECURE connects to it without TLS, which only a local fake should need.
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "").strip()
+GEMINI_API_INSECURE = env_bool("GEMINI_API_INSECURE", False)
+
+_genai_module = None
+_genai_lock = threading.Lock()
+
+def insecure_gemini_transport(host: str, **kwargs):
+    """Plaintext gRPC transport for GEMINI_API_INSECURE; it serves the async generation calls only"""
+    import grpc
+    from google.ai.generativelanguage_v1beta.services.generative_service.transports import (
+        GenerativeServiceGrpcAsyncIOTransport,
+    )
+    return GenerativeServiceGrpcAsyncIOTransport(host=host, channel=grpc.aio.insecure_channel(host))
+
+def get_genai():
+    """
+    google.generativeai, imported and configured on first use. Importing it takes most of a
+    second, so the startup warmup task does it in a thread instead of every worker paying at import.
+    """
+    global _genai_module
+    if _genai_module is None:
+        with _genai_lock:
+            if _genai_module is None:
+                import google.generativeai as genai
+                if GEMINI_API_KEY:
+                    options = {}
+                    if GEMINI_API_ENDPOINT:
+                        options["client_options"] = {"api_endpoint": GEMINI_API_ENDPOINT}
+                        if GEMINI_API_INSECURE:
+                            options["transport"] = insecure_gemini_transport
+                    try:
+                        genai.configure(api_key=GEMINI_API_KEY, **options)
+                        logger.info("✅ Gemini API configured successfully")
+                    except Exception as e:
+                        logger.error(f"❌ Error configuring Gemini API: {str(e)}")
+                _genai_module = genai
+    return _genai_module
 
 def ensure_string_values(data: dict) -> dict:
     """Ensure all dict values are strings; convert lists/dicts/numbers to readable strings."""
@@ -82,6 +152,174 @@ def ensure_string_values(data: dict) -> dict:
             data[k] = str(v)
     return data
 
+# How LLM output reached a parsed dict: directly via structured output, or through the legacy cleanup/repair path
+llm_json_stats = {
+    "structuredDirect": 0,
+    "structuredFallbacks": 0,
+    "legacyParses": 0,
+    "repairAttempts": 0,
+    "repairFailures": 0,
+}
+
+# Per-stage latency histograms and event counters, served on /metrics in the Prometheus text
+# format. Each worker process keeps its own registry, so scrape every worker.
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def format_metric_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class MetricCounter:
+    """A monotonically increasing count per label combination"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, *label_values, amount: float = 1.0):
+        if METRICS_ENABLED:
+            self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_metric_labels(self.labels, label_values)} {value:g}")
+        return lines
+
+class MetricHistogram:
+    """
+    Observations bucketed per label combination. Each series is one flat list of per-bucket
+    counts plus the running sum, so an observation is a bisect and two additions.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, value: float, *label_values):
+        if not METRICS_ENABLED:
+            return
+        series = self.series.get(label_values)
+        if series is None:
+            # One slot per bucket, one for +Inf, then the sum
+            series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        bucket_labels = self.labels + ("le",)
+        for label_values, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{format_metric_labels(bucket_labels, label_values + (le,))} {cumulative}")
+            labels = format_metric_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> MetricCounter:
+        metric = MetricCounter(name, help_text, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> MetricHistogram:
+        metric = MetricHistogram(name, help_text, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "careerai_http_request_duration_seconds", "Time to produce the response head, by route", ("endpoint", "method", "status")
+)
+STAGE_SECONDS = metrics.histogram(
+    "careerai_stage_duration_seconds", "Time spent in each stage of a request", ("endpoint", "stage", "model")
+)
+LLM_ATTEMPTS = metrics.counter("careerai_llm_attempts_total", "Model calls by outcome", ("endpoint", "model", "outcome"))
+LLM_FALLBACKS = metrics.counter(
+    "careerai_llm_fallbacks_total", "Times a failed model was followed by another model", ("endpoint", "model")
+)
+LLM_RETRIES = metrics.counter("careerai_llm_retries_total", "Extra rounds after every model failed", ("endpoint",))
+LLM_HEDGES = metrics.counter("careerai_llm_hedges_total", "Hedged second-model launches", ("endpoint", "model"))
+JSON_REPAIRS = metrics.counter("careerai_json_repairs_total", "LLM JSON repair round-trips by outcome", ("endpoint", "outcome"))
+STRUCTURED_OUTPUT_FALLBACKS = metrics.counter(
+    "careerai_structured_output_fallbacks_total", "Structured replies that failed validation", ("endpoint",)
+)
+GITHUB_RATE_LIMITED = metrics.counter("careerai_github_rate_limited_total", "GitHub rate-limit responses", ("endpoint",))
+
+# Route template (or job kind) of the work in progress, used as the endpoint label
+request_endpoint = contextvars.ContextVar("request_endpoint", default="")
+
+def record_stage(stage: str, started: float, model: str = ""):
+    """Observe the time since `started` (a perf_counter reading) for a stage of the current request"""
+    STAGE_SECONDS.observe(time.perf_counter() - started, request_endpoint.get(), stage, model)
+
+@contextmanager
+def stage_timer(stage: str, model: str = ""):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, started, model)
+
+# W3C trace context: continue the caller's trace (or start one) and pass it on to GitHub and Gemini
+TRACE_PROPAGATION = env_bool("TRACE_PROPAGATION", False)
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+trace_context = contextvars.ContextVar("trace_context", default=None)
+
+def start_trace(traceparent: Optional[str]) -> str:
+    """Make this request a child span of the incoming traceparent and return its own traceparent"""
+    match = TRACEPARENT_PATTERN.match((traceparent or "").strip().lower())
+    trace_id, flags = (match.group(1), match.group(3)) if match else (secrets.token_hex(16), "01")
+    if trace_id == "0" * 32:
+        trace_id = secrets.token_hex(16)
+    value = f"00-{trace_id}-{secrets.token_hex(8)}-{flags}"
+    trace_context.set(value)
+    return value
+
+def current_traceparent() -> Optional[str]:
+    return trace_context.get() if TRACE_PROPAGATION else None
+
+def gemini_request_options() -> Optional[dict]:
+    """Per-call options for the SDK: gRPC metadata carrying the trace context, when there is one"""
+    traceparent = current_traceparent()
+    return {"metadata": [("traceparent", traceparent)]} if traceparent else None
+
+def response_parts_text(response) -> str:
+    """
+    Text of a Gemini response or streamed chunk, read from the first candidate's parts.
+    The SDK's `.text` raises ValueError when there are no parts, as in a chunk that only
+    carries a finish reason, usage metadata or a safety block; such chunks have no text.
+    """
+    candidates = getattr(response, "candidates", None) or []
+    if not candidates:
+        return ""
+    parts = getattr(getattr(candidates[0], "content", None), "parts", None) or []
+    return "".join(getattr(part, "text", "") or "" for part in parts)
+
 async def extract_clean_json(text: str):
     """
     Extract and clean JSON from LLM responses, fixing common formatting issues.
@@ -120,6 +358,8 @@ async def extract_clean_json(text: str):
         logger.error(f"Problematic JSON string preview: {json_str[:500]}")
 
         # Async JSON repair fallback
+        llm_json_stats["repairAttempts"] += 1
+        repair_started = time.perf_counter()
         try:
             logger.warning("🔄 Attempting LLM JSON repair...")
             repair_prompt = f"Fix this text to be valid JSON only (no markdown, no explanations):\n\n{text}"
@@ -129,11 +369,18 @@ async def extract_clean_json(text: str):
                 repaired_json = json.loads(repaired_match.group(0))
                 if isinstance(repaired_json, str):
                     repaired_json = json.loads(repaired_json)
+                JSON_REPAIRS.inc(request_endpoint.get(), "success")
                 return repaired_json
         except Exception as repair_err:
+            llm_json_stats["repairFailures"] += 1
+            JSON_REPAIRS.inc(request_endpoint.get(), "failure")
             logger.error(f"⚠️ JSON repair failed: {repair_err}")
             raise
+        finally:
+            record_stage("json_repair", repair_started)
 
+        llm_json_stats["repairFailures"] += 1
+        JSON_REPAIRS.inc(request_endpoint.get(), "failure")
         raise
 
 # Pydantic models for request/response validation
@@ -152,6 +399,7 @@ class ResumeAnalysisJobResponse(BaseModel):
     projectFeedback: str
     jobRoleSuggestions: str
     overallSuggestions: str
+    analysisMode: str = "llm"
 
 class ResumeAnalysisComprehensiveResponse(BaseModel):
     score: float
@@ -163,6 +411,7 @@ class ResumeAnalysisComprehensiveResponse(BaseModel):
     projectFeedback: str
     jobRoleSuggestions: str
     overallSuggestions: str
+    analysisMode: str = "llm"
 
 class LinkedInOptimizerResponse(BaseModel):
     profileStrengthScore: float
@@ -173,6 +422,7 @@ class LinkedInOptimizerResponse(BaseModel):
     activityFeedback: str
     keywordSuggestions: str
     overallSuggestions: str
+    analysisMode: str = "llm"
 
 class LanguageItem(BaseModel):
     name: str
@@ -192,201 +442,3298 @@ class GitHubRepoResponse(BaseModel):
     documentationQualityFeedback: str
     overallSuggestions: str
 
+class MultiAnalysisResponse(BaseModel):
+    comprehensive: Optional[ResumeAnalysisComprehensiveResponse] = None
+    jobDescription: Optional[ResumeAnalysisJobResponse] = None
+    linkedin: Optional[LinkedInOptimizerResponse] = None
+    errors: dict = {}
+
+# Prompt template versions - bump an entry whenever its prompt changes so stale
+# cached results for that endpoint are no longer served
+PROMPT_TEMPLATE_VERSIONS = {
+    "resume-job-description": "1",
+    "resume-comprehensive": "1",
+    "linkedin-optimizer": "1",
+    "github-profile": "2",
+    "github-repository": "1",
+}
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache with per-entry TTL and size-based eviction"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, size: int = 1, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[2]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+class ResultCache:
+    """
+    Content-addressed cache for analysis results.
+    Entries live in an in-memory LRU tier and, when a database path is configured,
+    in an SQLite tier that survives restarts.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int, db_path: Optional[str] = None, enabled: bool = True):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.db_path = db_path or None
+        self.memory = TTLCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+        self._db = None
+        self._db_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(endpoint: str, *parts: str) -> str:
+        """Hash the endpoint, its prompt template version and the normalized inputs into a cache key"""
+        digest = hashlib.sha256()
+        for part in (endpoint, PROMPT_TEMPLATE_VERSIONS.get(endpoint, "0"), *parts):
+            encoded = part.encode("utf-8")
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return f"{endpoint}:{digest.hexdigest()}"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT value FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _disk_set(self, key: str, payload: str):
+        with self._db_lock:
+            db = self._connect()
+            now = time.time()
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, now + self.ttl),
+            )
+            db.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+            db.commit()
+
+    async def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return json.loads(value)
+        if self.db_path:
+            try:
+                payload = await asyncio.to_thread(self._disk_get, key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ Result cache read failed: {str(e)}")
+                payload = None
+            if payload is not None:
+                self.disk_hits += 1
+                self.memory.set(key, payload, size=len(payload))
+                return json.loads(payload)
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: dict):
+        if not self.enabled:
+            return
+        payload = json.dumps(value, separators=(",", ":"))
+        self.memory.set(key, payload, size=len(payload))
+        if self.db_path:
+            try:
+                await asyncio.to_thread(self._disk_set, key, payload)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ Result cache write failed: {str(e)}")
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memoryHits": self.memory_hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "hitRate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+            "entries": len(self.memory),
+            "bytes": self.memory.size_bytes,
+            "evictions": self.memory.evictions,
+            "persistent": bool(self.db_path),
+        }
+
+result_cache = ResultCache(
+    ttl=env_float("RESULT_CACHE_TTL_SECONDS", 24 * 3600),
+    max_entries=env_int("RESULT_CACHE_MAX_ENTRIES", 1024),
+    max_bytes=env_int("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+    db_path=os.getenv("RESULT_CACHE_DB_PATH"),
+    enabled=env_bool("RESULT_CACHE_ENABLED", True),
+)
+
+SINGLE_FLIGHT_JOINED = metrics.counter(
+    "careerai_single_flight_joined_total", "Requests that waited on an identical in-flight analysis", ("endpoint",)
+)
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one shared task.
+    Callers wait through asyncio.shield, so a caller whose client disconnects only gives up its
+    own wait; the shared task (and its upstream GitHub/Gemini calls) is cancelled once nobody is
+    waiting for it any more. Coalescing is per process; the job queue dedupes across workers.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls = {}
+        self.leaders = 0
+        self.joined = 0
+        self.abandoned = 0
+
+    async def run(self, key: str, factory):
+        if not self.enabled:
+            return await factory()
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = {"task": asyncio.create_task(factory()), "waiters": 0}
+            call["task"].add_done_callback(lambda _: self._forget(key, call))
+            self.leaders += 1
+        else:
+            self.joined += 1
+            SINGLE_FLIGHT_JOINED.inc(request_endpoint.get())
+            logger.info("🔗 Joining an identical analysis already in flight")
+        call["waiters"] += 1
+        try:
+            return await asyncio.shield(call["task"])
+        finally:
+            call["waiters"] -= 1
+            if call["waiters"] == 0 and not call["task"].done():
+                # Every caller went away: stop the upstream work instead of finishing it for nobody
+                self.abandoned += 1
+                self._forget(key, call)
+                call["task"].cancel()
+
+    def _forget(self, key: str, call: dict):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "inFlight": len(self._calls),
+            "leaders": self.leaders,
+            "joined": self.joined,
+            "abandoned": self.abandoned,
+        }
+
+analysis_flights = SingleFlight(enabled=env_bool("SINGLE_FLIGHT_ENABLED", True))
+
+# Stands in for the fields of a fan-out sub-analysis that failed
+FANOUT_SECTION_UNAVAILABLE = "Feedback for this section is temporarily unavailable. Please try again later."
+
+def is_partial_result(result: BaseModel) -> bool:
+    """True when part of a fan-out analysis failed, so the result must not be cached or reused"""
+    return FANOUT_SECTION_UNAVAILABLE in result.model_dump().values()
+
+async def coalesced_analysis(cache_key: str, analyze, cache_result: bool = True):
+    """
+    Run analyze() once for all concurrent requests with this cache key and cache its result.
+    The cache key already holds the normalized inputs (username, repository URL, or document
+    hash plus job description), so it doubles as the coalescing key. With cache_result=False
+    the key only coalesces, for results that depend on more than the cached inputs.
+    """
+    async def run():
+        result = await analyze()
+        if cache_result and not is_partial_result(result):
+            await result_cache.set(cache_key, result.model_dump())
+        return result
+
+    return await analysis_flights.run(cache_key, run)
+
+def normalize_text_input(text: str) -> str:
+    """Collapse whitespace so trivially different inputs share a cache entry"""
+    return " ".join((text or "").split())
+
+def normalize_github_username(username: str) -> str:
+    return username.strip().lower()
+
+def normalize_repository_url(repository_url: str) -> str:
+    return repository_url.strip().rstrip("/").lower()
+
+class ServiceWarmup:
+    """
+    Startup work that used to block the event loop (SDK import, LLM round-trip, index load)
+    runs here in the background. /livez answers immediately; /readyz turns ready once the
+    local pieces are warm, so autoscaled workers take traffic without waiting on Gemini.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready_at = None
+        self.checks = {"gemini": "pending", "pdfPool": "pending", "resumeIndex": "pending", "llm": "pending"}
+        self.require_llm = env_bool("READYZ_REQUIRE_LLM", False)
+        self.llm_check = env_bool("WARMUP_LLM_CHECK", True)
+        self.llm_timeout = env_float("WARMUP_LLM_TIMEOUT_SECONDS", 10.0)
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        required = ["gemini", "pdfPool"] + (["llm"] if self.require_llm else [])
+        return all(self.checks[name] in ("ok", "disabled") for name in required)
+
+    async def _check(self, name: str, step):
+        try:
+            result = await step()
+            self.checks[name] = result if isinstance(result, str) else "ok"
+        except Exception as e:
+            self.checks[name] = "failed"
+            logger.error(f"❌ Warmup step {name} failed: {str(e)}")
+
+    async def _load_resume_index(self):
+        if not RESUME_INDEX_ENABLED:
+            return "disabled"
+        await asyncio.to_thread(resume_index.load)
+
+    async def _test_llm(self):
+        if not GEMINI_API_KEY or not self.llm_check:
+            return "disabled" if not self.require_llm else "failed"
+        logger.info("🧪 Testing Gemini API connectivity...")
+        model = await gemini_router.model_async(GEMINI_MODEL_NAMES[0])
+        test_response = await asyncio.wait_for(
+            model.generate_content_async("Hello, respond with 'API working'"), timeout=self.llm_timeout
+        )
+        if test_response and test_response.text:
+            logger.info("✅ Gemini API test successful")
+            return "ok"
+        logger.warning("⚠️ Gemini API test returned empty response")
+        return "failed"
+
+    async def run(self):
+        await asyncio.gather(
+            self._check("gemini", lambda: asyncio.to_thread(get_genai)),
+            self._check("pdfPool", pdf_pool.warm),
+            self._check("resumeIndex", self._load_resume_index),
+        )
+        if self.ready:
+            self.ready_at = time.monotonic()
+            logger.info(f"✅ Warmup completed in {self.ready_at - self.started_at:.2f}s")
+        await self._check("llm", self._test_llm)
+        if self.ready and self.ready_at is None:
+            self.ready_at = time.monotonic()
+
+    def status(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "checks": self.checks,
+            "uptimeSeconds": round(time.monotonic() - self.started_at, 3),
+            "warmupSeconds": round(self.ready_at - self.started_at, 3) if self.ready_at else None,
+        }
+
+service_warmup = ServiceWarmup()
+
 # Add startup event handler
 @app.on_event("startup")
 async def startup_event():
     logger.info("🎯 FastAPI startup event triggered")
-    
-    # Test Gemini API connectivity
-    if GEMINI_API_KEY:
-        try:
-            # Test with a simple prompt
-            logger.info("🧪 Testing Gemini API connectivity...")
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            test_response = model.generate_content("Hello, respond with 'API working'")
-            if test_response and test_response.text:
-                logger.info("✅ Gemini API test successful")
-            else:
-                logger.warning("⚠️ Gemini API test returned empty response")
-        except Exception as e:
-            logger.error(f"❌ Gemini API test failed: {str(e)}")
-    
+    pdf_pool.start()
+    github_http.start()
+    job_workers.start()
+    # Gemini import and connectivity test, PDF worker warmup and index load happen in the background
+    service_warmup.start()
     logger.info("✅ Startup completed successfully")
 
 # Add shutdown event handler
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("🛑 FastAPI shutdown event triggered")
+    await service_warmup.stop()
+    await job_workers.stop()
+    job_store.close()
+    result_cache.close()
+    resume_lineages.close()
+    pdf_pool.shutdown()
+    await github_http.aclose()
 
-# Utility functions
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text content from PDF file"""
+# Upload and extraction limits
+MAX_UPLOAD_BYTES = env_int("MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+UPLOAD_SPOOL_THRESHOLD = env_int("UPLOAD_SPOOL_THRESHOLD", 1024 * 1024)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+PDF_MAX_PAGES = env_int("PDF_MAX_PAGES", 50)
+PDF_MAX_CHARS = env_int("PDF_MAX_CHARS", 60000)
+
+MAX_REQUEST_BYTES = env_int("MAX_REQUEST_BYTES", MAX_UPLOAD_BYTES + 1024 * 1024)
+BATCH_MAX_REQUEST_BYTES = env_int("BATCH_MAX_REQUEST_BYTES", 1024 * 1024 * 1024)
+
+# Endpoints that legitimately receive many documents in one request
+REQUEST_SIZE_LIMITS = {
+    "/api/resume-analyzer/batch": BATCH_MAX_REQUEST_BYTES,
+}
+
+class RequestSizeLimitMiddleware:
+    """
+    Caps request bodies on the ASGI receive stream. A declared Content-Length over the limit is
+    refused before anything is read; a chunked or understated body is cut off with a 413 as soon
+    as it passes the limit, before the multipart parser has spooled the rest of it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = REQUEST_SIZE_LIMITS.get(scope["path"], MAX_REQUEST_BYTES)
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await JSONResponse(status_code=413, content={"detail": "Request body is too large"})(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Re-raised by FastAPI's body parsing and turned into the 413 response
+                    raise HTTPException(status_code=413, detail="Request body is too large")
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as e:
+            if e.status_code != 413 or response_started:
+                raise
+            await JSONResponse(status_code=413, content={"detail": e.detail})(scope, receive, send)
+
+app.add_middleware(RequestSizeLimitMiddleware)
+
+@app.middleware("http")
+async def report_prompt_tokens_saved(request: Request, call_next):
+    """Tell clients how many prompt tokens budgeting saved on this request (X-Prompt-Tokens-Saved)"""
+    report = {"budgeted": False, "saved": 0}
+    prompt_budget_report.set(report)
+    response = await call_next(request)
+    if report["budgeted"]:
+        response.headers["X-Prompt-Tokens-Saved"] = str(report["saved"])
+    return response
+
+_route_labels = {}
+
+def route_label(scope) -> str:
+    """The matching route's path template (e.g. /api/jobs/{job_id}), so ids never become label values"""
+    path = scope["path"]
+    label = _route_labels.get(path)
+    if label is None:
+        label = "unmatched"
+        for route in app.router.routes:
+            if route.matches(scope)[0] == Match.FULL:
+                label = route.path
+                break
+        if label == path:
+            _route_labels[path] = label
+    return label
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Label the request's stage metrics with its route, time it, and continue the caller's trace"""
+    endpoint = route_label(request.scope)
+    request_endpoint.set(endpoint)
+    traceparent = start_trace(request.headers.get("traceparent")) if TRACE_PROPAGATION else None
+    started = time.perf_counter()
+    status_code = 500
     try:
-        logger.info(f"📄 Extracting text from PDF ({len(file_content)} bytes)")
-        doc = fitz.open(stream=file_content, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        logger.info(f"✅ Successfully extracted {len(text)} characters from PDF")
-        return text.strip()
-    except Exception as e:
-        logger.error(f"❌ Error extracting PDF text: {str(e)}")
-        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint, request.method, status_code)
+    if traceparent:
+        response.headers["traceresponse"] = traceparent
+    return response
 
-async def call_gemini(prompt: str, max_retries: int = 3) -> str:
-    """Call Gemini API with retry logic and better error handling"""
-    
-    if not GEMINI_API_KEY:
-        raise HTTPException(status_code=500, detail="Gemini API key not configured")
-    
-    # Try different model names in order of preference
-    model_names = [
-        'gemini-2.5-flash',
-        'gemini-2.5-pro', 
-        'gemini-1.5-flash',
-        'gemini-1.5-pro', 
-        'gemini-pro'
-    ]
-    
-    for attempt in range(max_retries):
-        for model_name in model_names:
+class SpooledUpload:
+    """An uploaded document held in memory when small, or in a temporary file once it outgrows the spool threshold"""
+
+    def __init__(self, data: Optional[bytes], path: Optional[str], size: int, sha256: str):
+        self.data = data
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """Bytes for in-memory uploads, a file path for spooled ones (cheap to hand to a worker process)"""
+        return self.path if self.path else self.data
+
+    def cleanup(self):
+        if self.path:
             try:
-                logger.info(f"🤖 Calling Gemini API (model: {model_name}, attempt: {attempt + 1})")
-                
-                # Add timeout for API calls
-                model = genai.GenerativeModel(model_name)
-                
-                # Use asyncio to add timeout
-                response = await asyncio.wait_for(
-                    asyncio.to_thread(model.generate_content, prompt),
-                    timeout=30.0  # 30 second timeout
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self.data = None
+
+async def spool_upload(upload: UploadFile, max_bytes: int = None, spool_threshold: int = None) -> SpooledUpload:
+    """
+    Copy an upload in fixed-size chunks, hashing as it goes, and enforce the per-file limit (413).
+    The request itself was already capped on the receive stream by RequestSizeLimitMiddleware;
+    uploads past the spool threshold are copied to a named file the PDF workers can open.
+    """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    spool_threshold = UPLOAD_SPOOL_THRESHOLD if spool_threshold is None else spool_threshold
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    spool_file = None
+    size = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Uploaded file is too large (limit {max_bytes // (1024 * 1024)} MB)",
                 )
-                
-                # Check if response has text
-                if hasattr(response, 'text') and response.text:
-                    logger.info(f"✅ Successful response from {model_name}")
-                    return response.text
-                elif hasattr(response, 'candidates') and response.candidates:
-                    text = response.candidates[0].content.parts[0].text
-                    logger.info(f"✅ Successful response from {model_name} (via candidates)")
-                    return text
+            digest.update(chunk)
+            if spool_file is None and len(buffer) + len(chunk) > spool_threshold:
+                spool_file = await asyncio.to_thread(
+                    tempfile.NamedTemporaryFile, prefix="careerai-", suffix=".pdf", delete=False
+                )
+                await asyncio.to_thread(spool_file.write, bytes(buffer))
+                buffer = bytearray()
+            if spool_file is not None:
+                await asyncio.to_thread(spool_file.write, chunk)
+            else:
+                buffer.extend(chunk)
+    except BaseException:
+        if spool_file is not None:
+            spool_file.close()
+            os.remove(spool_file.name)
+        raise
+    finally:
+        await upload.close()
+        record_stage("upload_read", started)
+
+    if spool_file is not None:
+        await asyncio.to_thread(spool_file.close)
+        logger.info(f"💾 Spooled {size} byte upload to disk")
+        return SpooledUpload(data=None, path=spool_file.name, size=size, sha256=digest.hexdigest())
+    return SpooledUpload(data=bytes(buffer), path=None, size=size, sha256=digest.hexdigest())
+
+def spool_zip_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, max_bytes: int = None) -> SpooledUpload:
+    """Copy one archive member into a SpooledUpload, enforcing the per-file limit on the decompressed bytes"""
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    if info.file_size > max_bytes:
+        raise HTTPException(status_code=413, detail="File in archive is too large")
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    spool_file = None
+    size = 0
+    try:
+        with archive.open(info) as member:
+            while True:
+                chunk = member.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    # The declared size lied (e.g. a zip bomb)
+                    raise HTTPException(status_code=413, detail="File in archive is too large")
+                digest.update(chunk)
+                if spool_file is None and len(buffer) + len(chunk) > UPLOAD_SPOOL_THRESHOLD:
+                    spool_file = tempfile.NamedTemporaryFile(prefix="careerai-", suffix=".pdf", delete=False)
+                    spool_file.write(buffer)
+                    buffer = bytearray()
+                if spool_file is not None:
+                    spool_file.write(chunk)
                 else:
-                    raise ValueError("Empty response from model")
-                    
-            except asyncio.TimeoutError:
-                logger.warning(f"⏰ Timeout for model {model_name} (attempt {attempt + 1})")
-                continue
-            except Exception as e:
-                logger.warning(f"⚠️ Model {model_name} failed (attempt {attempt + 1}): {str(e)}")
-                continue
-        
-        # If all models failed for this attempt, log and continue to next attempt
-        logger.error(f"❌ All models failed on attempt {attempt + 1}")
-        if attempt < max_retries - 1:
-            await asyncio.sleep(1)  # Brief pause before retry
-    
-    raise HTTPException(status_code=500, detail="LLM service unavailable. Please check your API key and try again.")
+                    buffer.extend(chunk)
+    except BaseException:
+        if spool_file is not None:
+            spool_file.close()
+            os.remove(spool_file.name)
+        raise
+    if spool_file is not None:
+        spool_file.close()
+        return SpooledUpload(data=None, path=spool_file.name, size=size, sha256=digest.hexdigest())
+    return SpooledUpload(data=bytes(buffer), path=None, size=size, sha256=digest.hexdigest())
 
-def parse_json_response(text: str) -> dict:
-    """Parse JSON response from LLM output and ensure all values are strings"""
+# Utility functions
+def read_pdf_text(source: Union[bytes, str], max_pages: int = None, max_chars: int = None) -> str:
+    """
+    Extract text content from PDF bytes or a PDF file path, one page at a time.
+    Stops once the page or character cap is reached so huge documents stay bounded.
+    Module-level and free of HTTP concerns so it can run inside pool worker processes.
+    """
+    import fitz  # PyMuPDF; imported on first use, mostly inside pool workers
+
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    if isinstance(source, str):
+        logger.info(f"📄 Extracting text from PDF file {source}")
+        doc = fitz.open(source, filetype="pdf")
+    else:
+        logger.info(f"📄 Extracting text from PDF ({len(source)} bytes)")
+        doc = fitz.open(stream=source, filetype="pdf")
+    parts = []
+    total_chars = 0
     try:
-        logger.info("🔍 Parsing JSON response from LLM")
-        
-        # Find JSON content between ```json and ``` or just parse directly
-        if "```json" in text:
-            start = text.find("```json") + 7
-            end = text.find("```", start)
-            json_text = text[start:end].strip()
+        page_count = doc.page_count
+        for page_number in range(min(page_count, max_pages)):
+            page_text = doc.load_page(page_number).get_text()
+            if total_chars + len(page_text) >= max_chars:
+                parts.append(page_text[:max_chars - total_chars])
+                total_chars = max_chars
+                logger.info(f"✂️ PDF text truncated at {max_chars} characters (page {page_number + 1}/{page_count})")
+                break
+            parts.append(page_text)
+            total_chars += len(page_text)
         else:
-            json_text = text.strip()
-        
-        data = json.loads(json_text)
-        
-        # Convert any list values to comma-separated strings
-        for key, value in data.items():
-            if isinstance(value, list):
-                data[key] = ", ".join(str(item) for item in value)
-            elif not isinstance(value, (str, int, float)):
-                data[key] = str(value)
-        
-        logger.info("✅ Successfully parsed JSON response")
-        return data
-    except Exception as e:
-        logger.error(f"❌ Failed to parse JSON from LLM response: {str(e)}")
-        logger.error(f"Response text preview: {text[:500]}...")
-        raise HTTPException(status_code=500, detail="Failed to parse LLM response")
+            if page_count > max_pages:
+                logger.info(f"✂️ PDF truncated to first {max_pages} of {page_count} pages")
+    finally:
+        doc.close()
+    text = "".join(parts).strip()
+    logger.info(f"✅ Successfully extracted {len(text)} characters from PDF")
+    return text
 
-async def fetch_github_user_repos(username: str) -> list:
-    """Fetch user repositories from GitHub API with optional authentication"""
+def extract_text_from_pdf(file_content: Union[bytes, str]) -> str:
+    """Extract text content from PDF file"""
     try:
-        logger.info(f"🐙 Fetching GitHub repos for user: {username}")
+        return read_pdf_text(file_content)
+    except Exception as e:
+        logger.error(f"❌ Error extracting PDF text: {str(e)}")
+        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
 
-        headers = {"Accept": "application/vnd.github.v3+json"}
-        github_token = os.getenv("GITHUB_TOKEN")
-        if github_token:
-            headers["Authorization"] = f"token {github_token}"
+def warm_pdf_worker() -> bool:
+    import fitz  # noqa: F401  (loads PyMuPDF into the worker process)
+    return True
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"https://api.github.com/users/{username}/repos",
-                headers=headers
-            )
+class PDFExtractionPool:
+    """
+    Runs PDF text extraction in a bounded process pool so parsing never blocks the event loop.
+    At most `workers` documents are parsed at once and at most `max_queued` more may wait;
+    beyond that callers get a 503 with Retry-After. A parse that exceeds the per-document
+    timeout has its worker processes killed and the pool is recreated.
+    With zero workers, extraction falls back to a thread (useful for local development).
+    """
 
-            if response.status_code == 403 and "rate limit" in response.text.lower():
-                logger.error("❌ GitHub API rate limit reached")
-                raise HTTPException(
-                    status_code=429,
-                    detail="GitHub API rate limit exceeded. Please try again later."
-                )
+    def __init__(self, workers: int, max_queued: int, timeout: float, retry_after: int, start_method: Optional[str] = None):
+        self.workers = max(0, workers)
+        self.max_queued = max(0, max_queued)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.start_method = start_method or None
+        self._executor = None
+        self._generation = 0
+        self._slots = asyncio.Semaphore(max(1, self.workers))
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.restarts = 0
 
-            if response.status_code == 404:
-                raise HTTPException(status_code=404, detail="GitHub user not found")
+    def _create_executor(self):
+        mp_context = multiprocessing.get_context(self.start_method) if self.start_method else None
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context)
 
-            response.raise_for_status()
-            repos = response.json()
-            logger.info(f"✅ Fetched {len(repos)} repositories")
-            return repos
+    def start(self):
+        if self.workers and self._executor is None:
+            self._executor = self._create_executor()
+            logger.info(f"🧵 PDF extraction pool started ({self.workers} workers, queue {self.max_queued})")
 
-    except httpx.HTTPStatusError as e:
-        logger.error(f"❌ GitHub API error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to fetch GitHub data")
+    async def warm(self):
+        """Start the worker processes and import PyMuPDF in each before the first upload arrives"""
+        if not self.workers:
+            return "disabled"
+        self.start()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, warm_pdf_worker) for _ in range(self.workers)))
 
-def normalize_score(raw_score: float) -> float:
-    try:
-        raw_score = float(raw_score)
-    except (ValueError, TypeError):
-        return 75.0  # fallback
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
-    if raw_score >= 90:
-        return min(100, raw_score)  # Excellent → keep up to 100
-    elif raw_score >= 80:
-        return 75 + (raw_score - 80)  # Good → map 80–89 to 75–85
-    elif raw_score >= 70:
-        return 65 + (raw_score - 70)  # Average → map 70–79 to 65–74
-    else:
-        return raw_score  # Poor → keep as-is
+    def _recycle(self, generation: int):
+        """Kill the worker processes of a stuck pool and replace it (once per generation)"""
+        if generation != self._generation or self._executor is None:
+            return
+        executor = self._executor
+        self._generation += 1
+        self._executor = self._create_executor()
+        self.restarts += 1
+        for process in list(getattr(executor, "_processes", {}).values()):
+            try:
+                process.kill()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("♻️ PDF extraction pool recycled after a runaway parse")
 
-def keyword_match_score(resume_text: str, job_desc: str) -> float:
-    resume_words = set(resume_text.lower().split())
-    job_words = set(job_desc.lower().split())
-    if not job_words:
-        return 0.0
-    matches = resume_words.intersection(job_words)
-    return round((len(matches) / len(job_words)) * 100, 2)
+    async def _run(self, file_content: Union[bytes, str]) -> str:
+        if not self.workers:
+            return await asyncio.wait_for(asyncio.to_thread(read_pdf_text, file_content), timeout=self.timeout)
+        if self._executor is None:
+            self.start()
+        for _ in range(2):
+            generation = self._generation
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, read_pdf_text, file_content)
+            try:
+                return await asyncio.wait_for(future, timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self._recycle(generation)
+                raise
+            except BrokenProcessPool:
+                # Another document's timeout killed this worker; retry once on the fresh pool
+                if generation == self._generation:
+                    self._recycle(generation)
+                    raise
+        raise BrokenProcessPool("PDF extraction pool unavailable")
 
-REQUIRED_KEYS_COMPREHENSIVE = [
-    "score", "comprehensiveAnalysis", "summaryFeedback", "skillsFeedback",
-    "experienceFeedback", "educationFeedback", "projectFeedback",
-    "jobRoleSuggestions", "overallSuggestions"
-]
+    async def extract(self, file_content: Union[bytes, str]) -> str:
+        """Extract PDF text off the event loop, applying backpressure and the per-document timeout"""
+        if self._pending >= max(1, self.workers) + self.max_queued:
+            self.rejected += 1
+            logger.warning("🚦 PDF extraction queue full, rejecting request")
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy processing documents. Please try again shortly.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self._pending += 1
+        queued = time.perf_counter()
+        try:
+            async with self._slots:
+                record_stage("pdf_queue", queued)
+                with stage_timer("pdf_extract"):
+                    text = await self._run(file_content)
+            self.completed += 1
+            return text
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.error(f"⏰ PDF extraction timed out after {self.timeout}s")
+            raise HTTPException(status_code=400, detail="PDF took too long to process")
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"❌ Error extracting PDF text: {str(e)}")
+            raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
+        finally:
+            self._pending -= 1
 
-REQUIRED_KEYS_JOB = [
-    "score", "summaryFeedback", "skillsFeedback", "experienceFeedback",
-    "educationFeedback", "projectFeedback", "jobRoleSuggestions", "overallSuggestions"
-]
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "maxQueued": self.max_queued,
+            "pending": self._pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
 
-REQUIRED_KEYS_LINKEDIN = [
+pdf_pool = PDFExtractionPool(
+    workers=env_int("PDF_WORKERS", min(4, os.cpu_count() or 1)),
+    max_queued=env_int("PDF_QUEUE_SIZE", 16),
+    timeout=env_float("PDF_EXTRACT_TIMEOUT_SECONDS", 20.0),
+    retry_after=env_int("PDF_RETRY_AFTER_SECONDS", 5),
+    start_method=os.getenv("PDF_POOL_START_METHOD"),
+)
+
+GEMINI_MODEL_NAMES = [
+    name.strip()
+    for name in os.getenv(
+        "GEMINI_MODELS", "gemini-2.5-flash,gemini-2.5-pro,gemini-1.5-flash,gemini-1.5-pro,gemini-pro"
+    ).split(",")
+    if name.strip()
+]
+
+class LLMUnavailableError(HTTPException):
+    """Raised when no model produced an answer within the request's deadline budget"""
+
+class ModelHealth:
+    """Rolling success/latency statistics and circuit breaker state for one Gemini model"""
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float, max_cooldown: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latencies = deque(maxlen=100)
+        self.state = "closed"
+        self.opened_until = 0.0
+        self.trial_in_flight = False
+        self.last_error = None
+
+    def available(self, now: float) -> bool:
+        if self.state == "closed":
+            return True
+        if now < self.opened_until:
+            return False
+        # Cooldown over: half-open, let a single trial request through
+        return not self.trial_in_flight
+
+    def begin(self, now: float):
+        if self.state != "closed" and now >= self.opened_until:
+            self.state = "half_open"
+            self.trial_in_flight = True
+
+    def record_success(self, latency: float):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.latencies.append(latency)
+        if self.state != "closed":
+            logger.info(f"🟢 Circuit for {self.name} closed again")
+        self.state = "closed"
+        self.cooldown = self.base_cooldown
+        self.trial_in_flight = False
+
+    def record_failure(self, error: Exception, now: float):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(error)[:200]
+        self.trial_in_flight = False
+        if is_permanent_model_error(error):
+            self._open(now, self.max_cooldown)
+        elif self.state == "half_open":
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open(now, self.cooldown)
+        elif self.consecutive_failures >= self.failure_threshold:
+            self._open(now, self.cooldown)
+
+    def record_cancelled(self):
+        self.trial_in_flight = False
+
+    def _open(self, now: float, duration: float):
+        self.state = "open"
+        self.opened_until = now + duration
+        logger.warning(f"🔴 Circuit for {self.name} opened for {duration:.0f}s")
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def stats(self) -> dict:
+        calls = self.successes + self.failures
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "state": self.state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "successRate": round(self.successes / calls, 4) if calls else None,
+            "latencyP50Ms": round(p50 * 1000) if p50 is not None else None,
+            "latencyP95Ms": round(p95 * 1000) if p95 is not None else None,
+            "lastError": self.last_error,
+        }
+
+def is_permanent_model_error(error: Exception) -> bool:
+    """Errors that will not go away by retrying, e.g. a retired or unknown model name"""
+    if type(error).__name__ in ("NotFound", "PermissionDenied", "InvalidArgument"):
+        return "model" in str(error).lower() or type(error).__name__ == "NotFound"
+    message = str(error).lower()
+    return "404" in message and "model" in message
+
+TOKEN_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+TOKEN_SYMBOL_PATTERN = re.compile(r"[\d_]|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Offline token estimate for rate limiting and prompt budgets: about 1.3 tokens per word
+    (long words split into several pieces) plus one per digit or punctuation mark
+    """
+    if not text:
+        return 0
+    return int(len(TOKEN_WORD_PATTERN.findall(text)) * 1.3) + len(TOKEN_SYMBOL_PATTERN.findall(text)) + 1
+
+class RateLimitWaitExceeded(Exception):
+    """The quota governor could not grant capacity before the request's deadline"""
+
+def refilled_quota(state: Optional[tuple], capacity: float, rate: float, now: float) -> float:
+    """Level of a token bucket stored as (tokens, updated wall-clock time), refilled up to `now`"""
+    if state is None:
+        return capacity
+    tokens, updated = state
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+class QuotaBackend:
+    """
+    Token-bucket state shared by everyone enforcing a quota. Subclasses implement _update(keys, change):
+    atomically read the (tokens, updated) state of the keys, call change(states) and store what it
+    returns. A store spanning several hosts (e.g. Redis) can instead implement reserve/adjust/cap/level/snapshot.
+    """
+
+    blocking = False
+
+    def reserve(self, requests: list, now: float) -> float:
+        """
+        Take `amount` from every (key, capacity, rate, amount) bucket, or from none of them.
+        Returns 0 when granted, otherwise the seconds until all of them will have capacity.
+        """
+        wait = 0.0
+
+        def change(states: dict) -> dict:
+            nonlocal wait
+            levels = {key: refilled_quota(states.get(key), capacity, rate, now) for key, capacity, rate, _ in requests}
+            for key, capacity, rate, amount in requests:
+                wait = max(wait, (min(amount, capacity) - levels[key]) / rate)
+            if wait > 0:
+                return {}
+            return {key: (levels[key] - min(amount, capacity), now) for key, capacity, rate, amount in requests}
+
+        self._update([request[0] for request in requests], change)
+        return wait
+
+    def adjust(self, key: str, capacity: float, rate: float, delta: float, now: float):
+        """Charge (positive) or refund (negative) the difference between estimated and actual usage"""
+        self._update([key], lambda states: {key: (min(capacity, refilled_quota(states.get(key), capacity, rate, now) - delta), now)})
+
+    def cap(self, key: str, capacity: float, rate: float, tokens: float, now: float):
+        """Lower a bucket to what the upstream reports as left (or to empty after an upstream 429)"""
+        self._update([key], lambda states: {key: (min(tokens, refilled_quota(states.get(key), capacity, rate, now)), now)})
+
+    def level(self, key: str, capacity: float, rate: float, now: float) -> float:
+        """Tokens a bucket holds at `now`, without taking any"""
+        level = capacity
+
+        def change(states: dict) -> dict:
+            nonlocal level
+            level = refilled_quota(states.get(key), capacity, rate, now)
+            return {}
+
+        self._update([key], change)
+        return level
+
+class MemoryQuotaBackend(QuotaBackend):
+    """Buckets in this process only: each worker spends the whole budget on its own"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _update(self, keys: list, change):
+        with self._lock:
+            self._buckets.update(change({key: self._buckets[key] for key in keys if key in self._buckets}))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: round(tokens, 2) for key, (tokens, _) in sorted(self._buckets.items())}
+
+class SQLiteQuotaBackend(QuotaBackend):
+    """Buckets in an SQLite file (WAL mode), shared by every worker process on the host"""
+
+    blocking = True
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # Losing the last few updates in a crash only forgets some spent quota
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS quota_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+        return self._db
+
+    def _update(self, keys: list, change):
+        with self._lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                placeholders = ",".join("?" * len(keys))
+                rows = db.execute(
+                    f"SELECT key, tokens, updated FROM quota_buckets WHERE key IN ({placeholders})", keys
+                ).fetchall()
+                updates = change({key: (tokens, updated) for key, tokens, updated in rows})
+                db.executemany(
+                    "INSERT INTO quota_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    [(key, tokens, updated) for key, (tokens, updated) in updates.items()],
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            rows = self._connect().execute("SELECT key, tokens FROM quota_buckets ORDER BY key").fetchall()
+        return {key: round(tokens, 2) for key, tokens in rows}
+
+def make_quota_backend(spec: str) -> QuotaBackend:
+    """
+    QUOTA_BACKEND: "sqlite" (shared by the workers on this host), "memory" (per process), or
+    "package.module:factory" for a custom backend, e.g. one on Redis for several hosts
+    """
+    spec = (spec or "sqlite").strip()
+    if spec == "memory":
+        return MemoryQuotaBackend()
+    if spec == "sqlite":
+        return SQLiteQuotaBackend(os.getenv("QUOTA_DB_PATH", "careerai_quota.sqlite3"))
+    module_name, _, attribute = spec.partition(":")
+    try:
+        return getattr(importlib.import_module(module_name), attribute)()
+    except (ImportError, AttributeError, ValueError, TypeError) as e:
+        logger.error(f"❌ Cannot load QUOTA_BACKEND {spec!r} ({str(e)}), falling back to per-process quotas")
+        return MemoryQuotaBackend()
+
+class QuotaBudget:
+    """
+    One quota, e.g. a model's tokens per minute or a GitHub token's requests per hour.
+    Only (1 - headroom) of the upstream limit is handed out, so callers start queueing
+    before the upstream starts throttling.
+    """
+
+    def __init__(self, key: str, limit: float, period: float, headroom: float):
+        self.key = key
+        self.limit = limit
+        self.capacity = limit * (1 - headroom)
+        self.rate = self.capacity / period
+
+class QuotaGovernor:
+    """Hands out budgets from the quota backend; a blocking backend is called off the event loop"""
+
+    def __init__(self, backend: QuotaBackend, headroom: float, max_wait: float):
+        self.backend = backend
+        self.headroom = min(0.9, max(0.0, headroom))
+        self.max_wait = max_wait
+        self.waits = 0
+        self.sheds = 0
+        self.errors = 0
+
+    def budget(self, key: str, limit: float, period: float) -> QuotaBudget:
+        return QuotaBudget(key, limit, period, self.headroom)
+
+    async def _call(self, method, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def reserve(self, wanted: list) -> float:
+        """Take (budget, amount) pairs all at once; returns 0 when granted, else the seconds to wait"""
+        requests = [(budget.key, budget.capacity, budget.rate, amount) for budget, amount in wanted]
+        try:
+            return await self._call(self.backend.reserve, requests, time.time())
+        except Exception as e:
+            # A broken quota store must not take the service down with it
+            self.errors += 1
+            logger.warning(f"⚠️ Quota backend error, letting the request through: {str(e)}")
+            return 0.0
+
+    async def acquire(self, wanted: list, deadline_at: float) -> int:
+        """
+        Wait until the budgets have capacity and take them; returns how many times it waited.
+        Sheds the work (RateLimitWaitExceeded) rather than wait past `deadline_at` (monotonic)
+        or longer than QUOTA_MAX_WAIT_SECONDS.
+        """
+        waits = 0
+        while True:
+            wait = await self.reserve(wanted)
+            if wait <= 0:
+                return waits
+            if wait > self.max_wait or time.monotonic() + wait > deadline_at:
+                self.sheds += 1
+                raise RateLimitWaitExceeded(f"rate limit wait of {wait:.1f}s exceeds the deadline")
+            waits += 1
+            self.waits += 1
+            await asyncio.sleep(wait)
+
+    async def adjust(self, budget: QuotaBudget, delta: float):
+        try:
+            await self._call(self.backend.adjust, budget.key, budget.capacity, budget.rate, delta, time.time())
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Quota backend error: {str(e)}")
+
+    async def cap(self, budget: QuotaBudget, tokens: float):
+        try:
+            await self._call(self.backend.cap, budget.key, budget.capacity, budget.rate, tokens, time.time())
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Quota backend error: {str(e)}")
+
+    async def level(self, budget: QuotaBudget) -> float:
+        try:
+            return await self._call(self.backend.level, budget.key, budget.capacity, budget.rate, time.time())
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Quota backend error: {str(e)}")
+            return budget.capacity
+
+    def stats(self) -> dict:
+        try:
+            levels = self.backend.snapshot()
+        except Exception:
+            levels = None
+        return {
+            "backend": type(self.backend).__name__,
+            "headroom": self.headroom,
+            "maxWaitSeconds": self.max_wait,
+            "waits": self.waits,
+            "sheds": self.sheds,
+            "errors": self.errors,
+            "levels": levels,
+        }
+
+quota_governor = QuotaGovernor(
+    make_quota_backend(os.getenv("QUOTA_BACKEND", "sqlite")),
+    headroom=env_float("QUOTA_HEADROOM", 0.1),
+    max_wait=env_float("QUOTA_MAX_WAIT_SECONDS", 30.0),
+)
+
+class ModelRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets for one model, drawn from the quota
+    governor so that all worker processes share them. Callers in this process queue in FIFO
+    order until both budgets have capacity, instead of sending the request and getting an upstream 429.
+    """
+
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0, governor: QuotaGovernor = None):
+        self.governor = governor or quota_governor
+        self.requests = self.governor.budget(f"gemini:{name}:rpm", rpm, 60.0) if rpm > 0 else None
+        self.tokens = self.governor.budget(f"gemini:{name}:tpm", tpm, 60.0) if tpm > 0 else None
+        self._lock = asyncio.Lock()
+        self.waits = 0
+        self.rejections = 0
+
+    async def acquire(self, token_estimate: int, deadline_at: float):
+        wanted = []
+        if self.requests:
+            wanted.append((self.requests, 1))
+        if self.tokens:
+            wanted.append((self.tokens, token_estimate))
+        if not wanted:
+            return
+        async with self._lock:
+            try:
+                self.waits += await self.governor.acquire(wanted, deadline_at)
+            except RateLimitWaitExceeded:
+                self.rejections += 1
+                raise
+
+    async def settle(self, token_estimate: int, actual_tokens: Optional[int]):
+        if self.tokens is not None and actual_tokens:
+            await self.governor.adjust(self.tokens, actual_tokens - token_estimate)
+
+    async def throttled(self):
+        """The upstream answered 429: empty the request budget so every worker backs off together"""
+        if self.requests is not None:
+            await self.governor.cap(self.requests, 0)
+
+def parse_model_rate_limits(spec: str) -> dict:
+    """Parse LLM_RATE_LIMITS, e.g. "gemini-2.5-flash=1000:1000000,gemini-2.5-pro=150:2000000" (rpm:tpm)"""
+    limits = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, _, values = item.partition("=")
+        rpm, _, tpm = values.partition(":")
+        try:
+            limits[name.strip()] = (float(rpm or 0), float(tpm or 0))
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid LLM_RATE_LIMITS entry: {item}")
+    return limits
+
+class GeminiModelRouter:
+    """
+    Routes prompts across the configured Gemini models.
+    Model objects are built once and reused; models that keep failing are skipped by a
+    circuit breaker; each request gets one overall deadline, and without hedging each attempt
+    gets a share of it so a hung model still leaves time to fall back; optionally a second
+    model is launched once the first exceeds its p95 latency (hedging).
+    """
+
+    def __init__(self, model_names: list):
+        self.model_names = model_names
+        self.deadline = env_float("LLM_DEADLINE_SECONDS", 60.0)
+        self.hedge_enabled = env_bool("LLM_HEDGE_ENABLED", False)
+        self.hedge_default_delay = env_float("LLM_HEDGE_DEFAULT_DELAY_SECONDS", 8.0)
+        self.hedge_min_delay = env_float("LLM_HEDGE_MIN_DELAY_SECONDS", 1.0)
+        self.hedge_max_delay = env_float("LLM_HEDGE_MAX_DELAY_SECONDS", 20.0)
+        self.attempt_timeout_max = env_float("LLM_ATTEMPT_TIMEOUT_SECONDS", 30.0)
+        self.attempt_timeout_p95_factor = env_float("LLM_ATTEMPT_TIMEOUT_P95_FACTOR", 2.0)
+        self._models = {}
+        self.health = {
+            name: ModelHealth(
+                name,
+                failure_threshold=env_int("LLM_BREAKER_FAILURE_THRESHOLD", 3),
+                cooldown=env_float("LLM_BREAKER_COOLDOWN_SECONDS", 30.0),
+                max_cooldown=env_float("LLM_BREAKER_MAX_COOLDOWN_SECONDS", 3600.0),
+            )
+            for name in model_names
+        }
+        self.hedges = 0
+        self.deadline_exceeded = 0
+        self.expected_output_tokens = env_int("LLM_EXPECTED_OUTPUT_TOKENS", 1024)
+        self.concurrency = env_int("LLM_MAX_CONCURRENCY", 16)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        default_limits = (env_float("LLM_DEFAULT_RPM", 0), env_float("LLM_DEFAULT_TPM", 0))
+        model_limits = parse_model_rate_limits(os.getenv("LLM_RATE_LIMITS", ""))
+        self.limiters = {
+            name: ModelRateLimiter(name, *model_limits.get(name, default_limits)) for name in model_names
+        }
+        self.in_flight = 0
+
+    def model(self, name: str):
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = get_genai().GenerativeModel(name)
+        return model
+
+    async def model_async(self, name: str):
+        """Like model(), but a first use before warmup imports the SDK off the event loop"""
+        model = self._models.get(name)
+        if model is None:
+            model = await asyncio.to_thread(self.model, name)
+        return model
+
+    def candidates(self, prefer: Optional[str] = None) -> list:
+        """Models to try, in preference order (`prefer` first), skipping those whose circuit is open"""
+        now = time.monotonic()
+        available = [name for name in self.model_names if self.health[name].available(now)]
+        if available:
+            if prefer in available:
+                available.remove(prefer)
+                available.insert(0, prefer)
+            return available
+        # Every circuit is open: try the one that reopens first rather than failing outright
+        return sorted(self.model_names, key=lambda name: self.health[name].opened_until)[:1]
+
+    def hedge_delay(self, name: str) -> float:
+        p95 = self.health[name].percentile(0.95) if len(self.health[name].latencies) >= 5 else None
+        delay = p95 if p95 is not None else self.hedge_default_delay
+        return max(self.hedge_min_delay, min(self.hedge_max_delay, delay))
+
+    def attempt_timeout(self, name: str, remaining: float, attempts_left: int) -> float:
+        """
+        Time one attempt may take when hedging is off: an even share of what is left of the
+        deadline, stretched to a multiple of the model's p95 latency, capped at LLM_ATTEMPT_TIMEOUT_SECONDS
+        """
+        timeout = remaining / max(1, attempts_left)
+        if len(self.health[name].latencies) >= 5:
+            timeout = max(timeout, self.health[name].percentile(0.95) * self.attempt_timeout_p95_factor)
+        return min(remaining, self.attempt_timeout_max, timeout)
+
+    async def _attempt(
+        self,
+        name: str,
+        prompt: str,
+        deadline_at: float,
+        generation_config: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        health = self.health[name]
+        limiter = self.limiters[name]
+        token_estimate = estimate_tokens(prompt) + self.expected_output_tokens
+        endpoint = request_endpoint.get()
+        queued = time.perf_counter()
+        # Quota first: a call waiting on one model's budget must not hold a concurrency slot
+        # that a call to another model could use
+        try:
+            await limiter.acquire(token_estimate, deadline_at)
+        except RateLimitWaitExceeded as e:
+            logger.warning(f"🚦 Skipping {name}: {str(e)}")
+            LLM_ATTEMPTS.inc(endpoint, name, "rate_limited")
+            record_stage("llm_queue", queued, name)
+            raise
+        async with self._semaphore:
+            record_stage("llm_queue", queued, name)
+            health.begin(time.monotonic())
+            started = time.monotonic()
+            attempt_started = time.perf_counter()
+            self.in_flight += 1
+            try:
+                logger.info(f"🤖 Calling Gemini API (model: {name})")
+                # Native async call: cancelling this task cancels the upstream request
+                model = await self.model_async(name)
+                # The timeout runs from here, so time spent queueing for quota does not count against it
+                try:
+                    response = await asyncio.wait_for(
+                        model.generate_content_async(
+                            prompt, generation_config=generation_config, request_options=gemini_request_options()
+                        ),
+                        timeout,
+                    )
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"No response within {timeout:.1f}s") from None
+
+                # Check if response has text
+                if hasattr(response, 'text') and response.text:
+                    text = response.text
+                elif hasattr(response, 'candidates') and response.candidates:
+                    text = response.candidates[0].content.parts[0].text
+                else:
+                    raise ValueError("Empty response from model")
+            except asyncio.CancelledError:
+                health.record_cancelled()
+                LLM_ATTEMPTS.inc(endpoint, name, "cancelled")
+                raise
+            except Exception as e:
+                health.record_failure(e, time.monotonic())
+                LLM_ATTEMPTS.inc(endpoint, name, "failure")
+                logger.warning(f"⚠️ Model {name} failed: {str(e)}")
+                if getattr(e, "code", None) == 429:
+                    await limiter.throttled()
+                raise
+            finally:
+                self.in_flight -= 1
+                record_stage("llm_attempt", attempt_started, name)
+        health.record_success(time.monotonic() - started)
+        LLM_ATTEMPTS.inc(endpoint, name, "success")
+        usage = getattr(response, "usage_metadata", None)
+        await limiter.settle(token_estimate, getattr(usage, "total_token_count", None))
+        logger.info(f"✅ Successful response from {name}")
+        return text
+
+    async def generate(
+        self,
+        prompt: str,
+        max_rounds: int = 3,
+        deadline: Optional[float] = None,
+        generation_config: Optional[dict] = None,
+        prefer: Optional[str] = None,
+    ) -> str:
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + (deadline or self.deadline)
+
+        for round_number in range(max_rounds):
+            queue = self.candidates(prefer)
+            pending = {}
+            try:
+                while queue or pending:
+                    remaining = deadline_at - loop.time()
+                    if remaining <= 0:
+                        break
+                    if not pending:
+                        name = queue.pop(0)
+                        attempt_timeout = (
+                            None if self.hedge_enabled else self.attempt_timeout(name, remaining, len(queue) + 1)
+                        )
+                        pending[
+                            asyncio.create_task(
+                                self._attempt(name, prompt, deadline_at, generation_config, attempt_timeout)
+                            )
+                        ] = name
+
+                    hedge_delay = None
+                    if self.hedge_enabled and queue and len(pending) == 1:
+                        hedge_delay = self.hedge_delay(next(iter(pending.values())))
+                    timeout = min(remaining, hedge_delay) if hedge_delay is not None else remaining
+
+                    done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        if hedge_delay is not None and loop.time() < deadline_at:
+                            name = queue.pop(0)
+                            self.hedges += 1
+                            LLM_HEDGES.inc(request_endpoint.get(), name)
+                            logger.info(f"🪁 Hedging with {name} after {hedge_delay:.1f}s")
+                            pending[asyncio.create_task(self._attempt(name, prompt, deadline_at, generation_config))] = name
+                        continue
+                    for task in done:
+                        failed_name = pending.pop(task)
+                        if not task.exception():
+                            return task.result()
+                        if queue:
+                            LLM_FALLBACKS.inc(request_endpoint.get(), failed_name)
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    # Wait for the cancellations so no upstream call outlives its request
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+            if loop.time() >= deadline_at:
+                break
+            # If all models failed for this round, log and continue to the next round
+            logger.error(f"❌ All models failed on attempt {round_number + 1}")
+            if round_number < max_rounds - 1:
+                LLM_RETRIES.inc(request_endpoint.get())
+                await asyncio.sleep(min(1.0, max(0.0, deadline_at - loop.time())))
+
+        if loop.time() >= deadline_at:
+            self.deadline_exceeded += 1
+            logger.error("⏰ LLM deadline budget exhausted")
+            raise LLMUnavailableError(status_code=504, detail="LLM service timed out. Please try again.")
+        raise LLMUnavailableError(
+            status_code=500, detail="LLM service unavailable. Please check your API key and try again."
+        )
+
+    async def stream(self, prompt: str, deadline: Optional[float] = None, generation_config: Optional[dict] = None):
+        """
+        Yield text chunks from the first model that starts answering. A model that fails before
+        its first chunk is skipped for the next candidate; once text has been yielded a failure
+        is raised to the caller, since the partial output cannot be taken back.
+        """
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + (deadline or self.deadline)
+
+        endpoint = request_endpoint.get()
+        for name in self.candidates():
+            health = self.health[name]
+            limiter = self.limiters[name]
+            token_estimate = estimate_tokens(prompt) + self.expected_output_tokens
+            yielded = False
+            queued = time.perf_counter()
+            # Quota before the concurrency slot, as in _attempt()
+            try:
+                await limiter.acquire(token_estimate, deadline_at)
+            except RateLimitWaitExceeded as e:
+                logger.warning(f"🚦 Skipping {name}: {str(e)}")
+                LLM_ATTEMPTS.inc(endpoint, name, "rate_limited")
+                LLM_FALLBACKS.inc(endpoint, name)
+                record_stage("llm_queue", queued, name)
+                continue
+            async with self._semaphore:
+                record_stage("llm_queue", queued, name)
+                health.begin(time.monotonic())
+                started = time.monotonic()
+                attempt_started = time.perf_counter()
+                self.in_flight += 1
+                try:
+                    logger.info(f"🤖 Streaming from Gemini API (model: {name})")
+                    model = await self.model_async(name)
+                    response = await asyncio.wait_for(
+                        model.generate_content_async(
+                            prompt,
+                            generation_config=generation_config,
+                            stream=True,
+                            request_options=gemini_request_options(),
+                        ),
+                        timeout=max(0.0, deadline_at - loop.time()),
+                    )
+                    chunks = response.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(0.0, deadline_at - loop.time()))
+                        except StopAsyncIteration:
+                            break
+                        text = response_parts_text(chunk)
+                        if text:
+                            if not yielded:
+                                record_stage("llm_first_chunk", attempt_started, name)
+                            yielded = True
+                            yield text
+                except asyncio.CancelledError:
+                    health.record_cancelled()
+                    LLM_ATTEMPTS.inc(endpoint, name, "cancelled")
+                    raise
+                except Exception as e:
+                    health.record_failure(e, time.monotonic())
+                    LLM_ATTEMPTS.inc(endpoint, name, "failure")
+                    if getattr(e, "code", None) == 429:
+                        await limiter.throttled()
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.deadline_exceeded += 1
+                        logger.error("⏰ LLM deadline budget exhausted while streaming")
+                        raise LLMUnavailableError(status_code=504, detail="LLM service timed out. Please try again.")
+                    logger.warning(f"⚠️ Model {name} failed while streaming: {str(e)}")
+                    if yielded:
+                        raise
+                    LLM_FALLBACKS.inc(endpoint, name)
+                    continue
+                finally:
+                    self.in_flight -= 1
+                    record_stage("llm_attempt", attempt_started, name)
+            health.record_success(time.monotonic() - started)
+            LLM_ATTEMPTS.inc(endpoint, name, "success")
+            usage = getattr(response, "usage_metadata", None)
+            await limiter.settle(token_estimate, getattr(usage, "total_token_count", None))
+            logger.info(f"✅ Streamed response from {name}")
+            return
+
+        raise LLMUnavailableError(
+            status_code=500, detail="LLM service unavailable. Please check your API key and try again."
+        )
+
+    def stats(self) -> dict:
+        return {
+            "deadlineSeconds": self.deadline,
+            "hedging": self.hedge_enabled,
+            "hedges": self.hedges,
+            "deadlineExceeded": self.deadline_exceeded,
+            "maxConcurrency": self.concurrency,
+            "inFlight": self.in_flight,
+            "models": {
+                name: {
+                    **health.stats(),
+                    "rateLimitWaits": self.limiters[name].waits,
+                    "rateLimitRejections": self.limiters[name].rejections,
+                }
+                for name, health in self.health.items()
+            },
+        }
+
+gemini_router = GeminiModelRouter(GEMINI_MODEL_NAMES)
+
+async def call_gemini(
+    prompt: str, max_retries: int = 3, response_schema: Optional[dict] = None, prefer: Optional[str] = None
+) -> str:
+    """
+    Call Gemini through the model router (circuit breakers, deadline budget, optional hedging).
+    With a response_schema the model is constrained to emit JSON matching it; `prefer` moves
+    one model to the front of the router's preference order.
+    """
+
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+
+    generation_config = None
+    if response_schema is not None:
+        generation_config = {"response_mime_type": "application/json", "response_schema": response_schema}
+    return await gemini_router.generate(
+        prompt, max_rounds=max_retries, generation_config=generation_config, prefer=prefer
+    )
+
+STRUCTURED_OUTPUT_ENABLED = env_bool("LLM_STRUCTURED_OUTPUT", True)
+_llm_output_models = {}
+
+# Response fields the server fills in itself; never part of what the LLM is asked for
+LOCAL_RESPONSE_FIELDS = {"analysisMode"}
+
+def llm_output_model(model_cls, fields: Optional[list] = None):
+    """Pydantic model with just the fields the LLM is asked to produce (all fields by default)"""
+    key = (model_cls, tuple(fields or ()))
+    output_model = _llm_output_models.get(key)
+    if output_model is None:
+        names = fields or [name for name in model_cls.model_fields if name not in LOCAL_RESPONSE_FIELDS]
+        output_model = create_model(
+            f"{model_cls.__name__}LLMOutput",
+            **{name: (model_cls.model_fields[name].annotation, ...) for name in names},
+        )
+        _llm_output_models[key] = output_model
+    return output_model
+
+def gemini_response_schema(model_cls, fields: Optional[list] = None) -> dict:
+    """Translate a Pydantic model's JSON schema into the OpenAPI subset Gemini accepts"""
+    schema = llm_output_model(model_cls, fields).model_json_schema()
+    definitions = schema.get("$defs", {})
+
+    def convert(node: dict) -> dict:
+        if "$ref" in node:
+            node = definitions[node["$ref"].rsplit("/", 1)[-1]]
+        if "anyOf" in node:
+            options = [option for option in node["anyOf"] if option.get("type") != "null"]
+            converted = convert(options[0]) if options else {"type": "string"}
+            converted["nullable"] = True
+            return converted
+        node_type = node.get("type", "string")
+        converted = {"type": node_type}
+        if node_type == "object":
+            converted["properties"] = {name: convert(child) for name, child in node.get("properties", {}).items()}
+            if node.get("required"):
+                converted["required"] = list(node["required"])
+        elif node_type == "array":
+            converted["items"] = convert(node.get("items", {}))
+        return converted
+
+    return convert(schema)
+
+async def generate_json(prompt: str, model_cls, fields: Optional[list] = None, prefer: Optional[str] = None) -> dict:
+    """
+    Get a JSON object for `model_cls` (or the listed subset of its fields) from the LLM.
+    In structured-output mode the schema travels with the request and the reply is validated
+    directly; anything that does not validate falls back to the legacy cleanup/repair path.
+    """
+    if not STRUCTURED_OUTPUT_ENABLED:
+        llm_json_stats["legacyParses"] += 1
+        return await extract_clean_json(await call_gemini(prompt, prefer=prefer))
+
+    response_text = await call_gemini(prompt, response_schema=gemini_response_schema(model_cls, fields), prefer=prefer)
+    try:
+        with stage_timer("validation"):
+            data = json.loads(response_text)
+            llm_output_model(model_cls, fields).model_validate(data)
+        llm_json_stats["structuredDirect"] += 1
+        return data
+    except (ValueError, ValidationError) as e:
+        llm_json_stats["structuredFallbacks"] += 1
+        STRUCTURED_OUTPUT_FALLBACKS.inc(request_endpoint.get())
+        logger.warning(f"⚠️ Structured output did not validate, using legacy JSON cleanup: {str(e)[:200]}")
+        return await extract_clean_json(response_text)
+
+class IncrementalJSONFieldParser:
+    """
+    Pull complete top-level members out of a JSON object that is still being generated.
+    feed() returns the (key, value) pairs that became complete with the new text; a
+    leading markdown fence or chatter before the opening brace is skipped.
+    """
+
+    _decoder = json.JSONDecoder()
+    _literal_end = re.compile(r"[,}\s]")
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = None  # index just after "{" once the object has started
+        self.done = False
+
+    def _skip(self, pos: int, characters: str) -> int:
+        while pos < len(self.buffer) and self.buffer[pos] in characters:
+            pos += 1
+        return pos
+
+    def feed(self, text: str) -> list:
+        self.buffer += text
+        fields = []
+        if self.position is None:
+            start = self.buffer.find("{")
+            if start < 0:
+                return fields
+            self.position = start + 1
+
+        while not self.done:
+            pos = self._skip(self.position, " \t\r\n,")
+            if pos >= len(self.buffer):
+                break
+            if self.buffer[pos] == "}":
+                self.done = True
+                break
+            try:
+                key, pos = self._decoder.raw_decode(self.buffer, pos)
+            except json.JSONDecodeError:
+                break
+            pos = self._skip(pos, " \t\r\n")
+            if pos >= len(self.buffer):
+                break
+            if self.buffer[pos] != ":":
+                raise ValueError(f"Expected ':' after key {key!r}")
+            pos = self._skip(pos + 1, " \t\r\n")
+            if pos >= len(self.buffer):
+                break
+            if self.buffer[pos] not in "\"{[":
+                # Numbers and literals are only complete once something follows them
+                if not self._literal_end.search(self.buffer, pos):
+                    break
+            try:
+                value, pos = self._decoder.raw_decode(self.buffer, pos)
+            except json.JSONDecodeError:
+                break
+            fields.append((key, value))
+            self.position = pos
+        return fields
+
+def parse_json_response(text: str) -> dict:
+    """Parse JSON response from LLM output and ensure all values are strings"""
+    try:
+        logger.info("🔍 Parsing JSON response from LLM")
+        
+        # Find JSON content between ```json and ``` or just parse directly
+        if "```json" in text:
+            start = text.find("```json") + 7
+            end = text.find("```", start)
+            json_text = text[start:end].strip()
+        else:
+            json_text = text.strip()
+        
+        data = json.loads(json_text)
+        
+        # Convert any list values to comma-separated strings
+        for key, value in data.items():
+            if isinstance(value, list):
+                data[key] = ", ".join(str(item) for item in value)
+            elif not isinstance(value, (str, int, float)):
+                data[key] = str(value)
+        
+        logger.info("✅ Successfully parsed JSON response")
+        return data
+    except Exception as e:
+        logger.error(f"❌ Failed to parse JSON from LLM response: {str(e)}")
+        logger.error(f"Response text preview: {text[:500]}...")
+        raise HTTPException(status_code=500, detail="Failed to parse LLM response")
+
+# Prompt budgeting: documents embedded in prompts are measured with the offline token estimate
+# and deterministically trimmed section by section when they exceed the endpoint's budget
+DEFAULT_PROMPT_TOKEN_BUDGETS = {
+    "resume-job-description": 6000,
+    "job-description": 1500,
+    "resume-comprehensive": 6000,
+    "linkedin-optimizer": 5000,
+    "github-profile": 3000,
+    "github-repository": 5000,
+}
+
+def parse_prompt_token_budgets(spec: str) -> dict:
+    """Parse "endpoint=tokens,..." (0 disables trimming for that endpoint)"""
+    budgets = {}
+    for entry in spec.split(","):
+        if "=" not in entry:
+            continue
+        name, _, value = entry.partition("=")
+        try:
+            budgets[name.strip()] = int(value)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid prompt token budget: {entry.strip()}")
+    return budgets
+
+PROMPT_TOKEN_BUDGETS = {**DEFAULT_PROMPT_TOKEN_BUDGETS, **parse_prompt_token_budgets(os.getenv("PROMPT_TOKEN_BUDGETS", ""))}
+
+prompt_budget_stats = {"documents": 0, "trimmed": 0, "tokensSaved": 0}
+# Per-request tally of tokens saved; a mutable holder so analyses running in child tasks report back
+prompt_budget_report = contextvars.ContextVar("prompt_budget_report", default=None)
+
+def record_prompt_budget(original_tokens: int, final_tokens: int):
+    saved = max(0, original_tokens - final_tokens)
+    prompt_budget_stats["documents"] += 1
+    prompt_budget_stats["tokensSaved"] += saved
+    if saved:
+        prompt_budget_stats["trimmed"] += 1
+    report = prompt_budget_report.get()
+    if report is not None:
+        report["budgeted"] = True
+        report["saved"] += saved
+
+# Section headings as they appear in resumes and LinkedIn PDF exports -> (section, priority)
+# Higher priority sections keep more of their text when a document has to be trimmed
+RESUME_SECTION_HEADINGS = {
+    "summary": ("summary", 3), "professional summary": ("summary", 3), "profile": ("summary", 3),
+    "objective": ("summary", 3), "about": ("summary", 3), "about me": ("summary", 3),
+    "experience": ("experience", 5), "work experience": ("experience", 5), "professional experience": ("experience", 5),
+    "employment history": ("experience", 5), "work history": ("experience", 5), "internships": ("experience", 5),
+    "skills": ("skills", 5), "technical skills": ("skills", 5), "top skills": ("skills", 5),
+    "core competencies": ("skills", 5), "tools": ("skills", 5),
+    "projects": ("projects", 4), "personal projects": ("projects", 4), "academic projects": ("projects", 4),
+    "education": ("education", 3), "academic background": ("education", 3),
+    "certifications": ("certifications", 2), "certificates": ("certifications", 2), "licenses": ("certifications", 2),
+    "achievements": ("achievements", 2), "awards": ("achievements", 2), "honors": ("achievements", 2),
+    "honors-awards": ("achievements", 2), "accomplishments": ("achievements", 2),
+    "publications": ("publications", 2), "research": ("publications", 2),
+    "leadership": ("leadership", 2), "activities": ("leadership", 2), "extracurricular activities": ("leadership", 2),
+    "volunteer": ("volunteering", 1), "volunteering": ("volunteering", 1), "volunteer experience": ("volunteering", 1),
+    "languages": ("languages", 1), "interests": ("interests", 0), "hobbies": ("interests", 0),
+    "references": ("references", 0),
+}
+RESUME_HEADING_PATTERN = re.compile(r"^[#*•\-\s]*([a-z][a-z &\-]{1,40}?)\s*[:\-–]?\s*$")
+
+def resume_heading(line: str) -> Optional[tuple]:
+    """(section, priority) when the line is a recognizable section heading"""
+    match = RESUME_HEADING_PATTERN.match(line.strip().lower()) if len(line) < 48 else None
+    return RESUME_SECTION_HEADINGS.get(match.group(1).strip()) if match else None
+
+def split_resume_sections(text: str) -> list:
+    """
+    Split extracted resume/profile text at recognizable section headings.
+    Returns [title, body, priority] lists; text before the first heading (name, contact,
+    headline) comes first, untitled.
+    """
+    sections = [["", [], 4]]
+    for line in text.split("\n"):
+        heading = resume_heading(line)
+        if heading is not None:
+            sections.append([line.strip(), [], heading[1]])
+        else:
+            sections[-1][1].append(line)
+    return [[title, "\n".join(lines), priority] for title, lines, priority in sections if title or any(lines)]
+
+README_SECTION_PRIORITIES = (
+    (re.compile(r"install|setup|getting started|quick ?start|requirements|prerequisites"), 4),
+    (re.compile(r"usage|example|feature|api|configuration|how it works|overview|architecture"), 4),
+    (re.compile(r"contribut|test|development|roadmap"), 3),
+    (re.compile(r"licen[cs]e|support|contact|faq"), 1),
+    (re.compile(r"changelog|change log|history|release|acknowledg|credit|sponsor|contributors|backers|star"), 0),
+)
+README_NOISE_PATTERN = re.compile(r"<!--.*?-->|^\s*\[?!\[[^\]]*\]\([^)]*\)\]?(?:\([^)]*\))?\s*$", re.MULTILINE | re.DOTALL)
+
+def split_markdown_sections(text: str) -> list:
+    """Split a README at its markdown headings (ignoring "#" lines inside code fences)"""
+    sections = [["", [], 5]]
+    in_fence = False
+    for line in text.split("\n"):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and line.startswith("#"):
+            title = line.strip()
+            lowered = title.lower()
+            priority = next((value for pattern, value in README_SECTION_PRIORITIES if pattern.search(lowered)), 2)
+            sections.append([title, [], priority])
+        else:
+            sections[-1][1].append(line)
+    return [[title, "\n".join(lines), priority] for title, lines, priority in sections if title or any(lines)]
+
+def compact_whitespace(text: str) -> str:
+    """Collapse runs of spaces and blank lines that PDF extraction and markdown leave behind"""
+    lines = [" ".join(line.split()) for line in text.split("\n")]
+    compacted = []
+    for line in lines:
+        if line or (compacted and compacted[-1]):
+            compacted.append(line)
+    return "\n".join(compacted).strip()
+
+def trim_to_tokens(body: str, allowance: int) -> str:
+    """Keep whole leading lines of a section while they fit; the most recent/important come first"""
+    kept = []
+    used = 0
+    lines = body.split("\n")
+    for line in lines:
+        cost = estimate_tokens(line)
+        if used + cost > allowance:
+            if not kept and allowance > 8:
+                kept.append(line[: allowance * 3] + "…")
+            break
+        kept.append(line)
+        used += cost
+    omitted = len(lines) - len(kept)
+    if omitted > 0:
+        kept.append(f"[{omitted} more line(s) omitted to fit the prompt budget]")
+    return "\n".join(kept)
+
+def fit_sections_to_budget(sections: list, budget: int) -> str:
+    """
+    Deterministically shrink [title, body, priority] sections to about `budget` tokens:
+    drop priority-0 sections first, then share the budget by priority (water-filling, so
+    sections smaller than their share stay whole and the rest is redistributed).
+    """
+    sizes = [estimate_tokens(body) for _, body, _ in sections]
+    if sum(sizes) + sum(estimate_tokens(title) for title, _, _ in sections) <= budget:
+        return "\n".join(f"{title}\n{body}" if title else body for title, body, _ in sections)
+
+    keep = [index for index, (_, _, priority) in enumerate(sections) if priority > 0] or list(range(len(sections)))
+    remaining = budget - sum(estimate_tokens(sections[index][0]) for index in keep)
+    allowances = {}
+    pending = list(keep)
+    while pending and remaining > 0:
+        weight_total = sum(sections[index][2] or 1 for index in pending)
+        shares = {index: remaining * (sections[index][2] or 1) / weight_total for index in pending}
+        fits = [index for index in pending if sizes[index] <= shares[index]]
+        if not fits:
+            allowances.update({index: int(shares[index]) for index in pending})
+            break
+        for index in fits:
+            allowances[index] = sizes[index]
+            remaining -= sizes[index]
+            pending.remove(index)
+
+    parts = []
+    for index in keep:
+        title, body, _ = sections[index]
+        allowance = allowances.get(index, 0)
+        body = body if allowance >= sizes[index] else trim_to_tokens(body, allowance)
+        parts.append(f"{title}\n{body}" if title else body)
+    dropped = [sections[index][0] for index in range(len(sections)) if index not in keep]
+    if dropped:
+        parts.append(f"[Sections omitted to fit the prompt budget: {', '.join(dropped)}]")
+    return "\n".join(parts)
+
+def budget_document(text: str, endpoint: str, kind: str = "resume") -> str:
+    """
+    Fit a resume/profile ("resume"), README ("markdown") or plain text ("text") into the
+    endpoint's token budget and record how many tokens that saved.
+    """
+    original_tokens = estimate_tokens(text or "")
+    budget = PROMPT_TOKEN_BUDGETS.get(endpoint, 0)
+    fitted = compact_whitespace(README_NOISE_PATTERN.sub("", text or "") if kind == "markdown" else (text or ""))
+    if budget > 0 and estimate_tokens(fitted) > budget:
+        if kind == "resume":
+            sections = split_resume_sections(fitted)
+        elif kind == "markdown":
+            sections = split_markdown_sections(fitted)
+        else:
+            sections = [["", fitted, 1]]
+        fitted = fit_sections_to_budget(sections, budget)
+        logger.info(f"✂️ Trimmed {endpoint} document from ~{original_tokens} to ~{estimate_tokens(fitted)} tokens")
+    record_prompt_budget(original_tokens, estimate_tokens(fitted))
+    return fitted
+
+def compact_repo_table(repo_data: list, endpoint: str = "github-profile") -> str:
+    """
+    Serialize repository metadata as a pipe-separated table instead of indented JSON, keeping
+    the most starred / most recently updated repositories when the list exceeds the budget.
+    """
+    original_tokens = estimate_tokens(json.dumps(repo_data, indent=2))
+    budget = PROMPT_TOKEN_BUDGETS.get(endpoint, 0)
+    ranked = sorted(repo_data, key=lambda repo: (repo["stars"], repo["updated_at"]), reverse=True)
+    lines = ["name | language | stars | forks | created | updated | description"]
+    used = estimate_tokens(lines[0])
+    omitted = []
+    for repo in ranked:
+        description = " ".join(str(repo["description"]).split())[:160].replace("|", "/")
+        line = (
+            f"{repo['name']} | {repo['language'] or '-'} | {repo['stars']} | {repo['forks']} | "
+            f"{repo['created_at'][:10]} | {repo['updated_at'][:10]} | {description}"
+        )
+        cost = estimate_tokens(line)
+        if budget > 0 and used + cost > budget:
+            omitted.append(repo)
+            continue
+        lines.append(line)
+        used += cost
+    if omitted:
+        languages = Counter(repo["language"] for repo in omitted if repo["language"])
+        summary = ", ".join(f"{language} {count}" for language, count in languages.most_common(8))
+        lines.append(f"... and {len(omitted)} more repositories (languages: {summary or 'none'})")
+    table = "\n".join(lines)
+    record_prompt_budget(original_tokens, estimate_tokens(table))
+    return table
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_RAW_URL = os.getenv("GITHUB_RAW_URL", "https://raw.githubusercontent.com").rstrip("/")
+
+def github_api_headers() -> dict:
+    """Default headers for GitHub REST API calls, authenticated when GITHUB_TOKEN is set"""
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    github_token = os.getenv("GITHUB_TOKEN")
+    if github_token:
+        headers["Authorization"] = f"token {github_token}"
+    traceparent = current_traceparent()
+    if traceparent:
+        headers["traceparent"] = traceparent
+    return headers
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class HostConnectionMetrics:
+    """Per-host request, error, latency and new-connection counters for an httpx client"""
+
+    def __init__(self):
+        self.hosts = {}
+
+    def _host(self, host: str) -> dict:
+        metrics = self.hosts.get(host)
+        if metrics is None:
+            metrics = self.hosts[host] = {
+                "requests": 0,
+                "errors": 0,
+                "newConnections": 0,
+                "tlsHandshakes": 0,
+                "totalLatencyMs": 0.0,
+                "httpVersions": {},
+            }
+        return metrics
+
+    def trace_for(self, host: str):
+        """httpcore trace callback counting TCP connects and TLS handshakes (i.e. pool misses)"""
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                self._host(host)["newConnections"] += 1
+            elif event_name == "connection.start_tls.complete":
+                self._host(host)["tlsHandshakes"] += 1
+        return trace
+
+    async def on_request(self, request: httpx.Request):
+        request.extensions["trace"] = self.trace_for(request.url.host)
+        request.extensions["careerai_started"] = time.perf_counter()
+
+    async def on_response(self, response: httpx.Response):
+        request = response.request
+        metrics = self._host(request.url.host)
+        metrics["requests"] += 1
+        if response.status_code >= 400:
+            metrics["errors"] += 1
+        started = request.extensions.get("careerai_started")
+        if started is not None:
+            metrics["totalLatencyMs"] += (time.perf_counter() - started) * 1000
+        versions = metrics["httpVersions"]
+        versions[response.http_version] = versions.get(response.http_version, 0) + 1
+
+    def snapshot(self) -> dict:
+        result = {}
+        for host, metrics in self.hosts.items():
+            requests = metrics["requests"]
+            result[host] = {
+                **metrics,
+                "totalLatencyMs": round(metrics["totalLatencyMs"], 1),
+                "avgLatencyMs": round(metrics["totalLatencyMs"] / requests, 1) if requests else 0.0,
+                "connectionReuseRate": round(1 - metrics["newConnections"] / requests, 4) if requests else 0.0,
+            }
+        return result
+
+class GitHubHTTPClient:
+    """
+    Application-scoped httpx client for api.github.com and raw.githubusercontent.com.
+    Opened at startup and closed at shutdown so connections (and TLS sessions) are reused
+    across requests instead of being rebuilt for every analysis.
+    """
+
+    def __init__(self):
+        self.http2 = env_bool("GITHUB_HTTP2", True)
+        self.limits = httpx.Limits(
+            max_connections=env_int("GITHUB_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=env_int("GITHUB_MAX_KEEPALIVE_CONNECTIONS", 20),
+            keepalive_expiry=env_float("GITHUB_KEEPALIVE_EXPIRY_SECONDS", 30.0),
+        )
+        self.timeout = httpx.Timeout(
+            env_float("GITHUB_TIMEOUT_SECONDS", 10.0),
+            connect=env_float("GITHUB_CONNECT_TIMEOUT_SECONDS", 5.0),
+            pool=env_float("GITHUB_POOL_TIMEOUT_SECONDS", 5.0),
+        )
+        self.metrics = HostConnectionMetrics()
+        self._client = None
+
+    def start(self) -> httpx.AsyncClient:
+        if self._client is None:
+            use_http2 = self.http2 and http2_available()
+            if self.http2 and not use_http2:
+                logger.warning("⚠️ GITHUB_HTTP2 requested but the h2 package is not installed, using HTTP/1.1")
+            self._client = httpx.AsyncClient(
+                http2=use_http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={"request": [self.metrics.on_request], "response": [self.metrics.on_response]},
+            )
+            logger.info(f"🌐 GitHub HTTP client ready (HTTP/2: {'on' if use_http2 else 'off'})")
+        return self._client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client if self._client is not None else self.start()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "open": self._client is not None,
+            "http2": bool(self._client is not None and self.http2 and http2_available()),
+            "maxConnections": self.limits.max_connections,
+            "maxKeepaliveConnections": self.limits.max_keepalive_connections,
+            "hosts": self.metrics.snapshot(),
+        }
+
+github_http = GitHubHTTPClient()
+
+GITHUB_REPOS_PER_PAGE = 100
+GITHUB_MAX_REPOS = env_int("GITHUB_MAX_REPOS", 1000)
+GITHUB_PAGE_CONCURRENCY = env_int("GITHUB_PAGE_CONCURRENCY", 4)
+
+# Last successful response per GitHub URL: (etag, payload, link header) for If-None-Match revalidation
+github_etag_cache = TTLCache(
+    max_entries=env_int("GITHUB_ETAG_CACHE_MAX_ENTRIES", 2048),
+    max_bytes=env_int("GITHUB_ETAG_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+)
+
+GITHUB_RATE_LIMIT_PER_HOUR = env_float("GITHUB_RATE_LIMIT_PER_HOUR", 0)
+_github_budgets = {}
+
+def github_quota_budget() -> QuotaBudget:
+    """Hourly request budget of the GitHub credentials in use: one per token, shared by all workers"""
+    token = os.getenv("GITHUB_TOKEN") or ""
+    budget = _github_budgets.get(token)
+    if budget is None:
+        key = "github:" + (hashlib.sha256(token.encode()).hexdigest()[:16] if token else "anonymous")
+        limit = GITHUB_RATE_LIMIT_PER_HOUR or (5000 if token else 60)
+        budget = _github_budgets[token] = quota_governor.budget(key, limit, 3600.0)
+    return budget
+
+async def github_api_get(url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> httpx.Response:
+    """
+    GET from the GitHub REST API within the shared hourly budget. Sheds the request with a 429
+    when the budget is spent, and keeps the budget in line with GitHub's rate-limit headers.
+    """
+    budget = github_quota_budget()
+    try:
+        await quota_governor.acquire([(budget, 1)], deadline_at=float("inf"))
+    except RateLimitWaitExceeded as e:
+        logger.warning(f"🚦 GitHub quota exhausted, shedding request: {str(e)}")
+        raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded. Please try again later.")
+
+    response = await github_http.client.get(url, params=params, headers=headers)
+    if response.status_code == 304:
+        # Conditional requests answered from the ETag do not count against GitHub's limit
+        await quota_governor.adjust(budget, -1)
+    remaining = response.headers.get("x-ratelimit-remaining", "")
+    if remaining.isdigit():
+        limit = response.headers.get("x-ratelimit-limit", "")
+        limit = int(limit) if limit.isdigit() else budget.limit
+        await quota_governor.cap(budget, int(remaining) - limit * quota_governor.headroom)
+    return response
+
+def is_github_rate_limited(response: httpx.Response) -> bool:
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        response.headers.get("x-ratelimit-remaining") == "0" or "rate limit" in response.text.lower()
+    )
+
+async def github_get_json(url: str, params: Optional[dict] = None) -> tuple:
+    """
+    GET a GitHub API resource as JSON, revalidating against the stored ETag.
+    Returns (response, payload, link header); on a 304 the payload and links come from
+    the ETag cache, so unchanged resources cost no rate-limit quota.
+    """
+    cache_key = str(httpx.URL(url, params=params))
+    cached = github_etag_cache.get(cache_key)
+    headers = github_api_headers()
+    if cached is not None:
+        headers["If-None-Match"] = cached[0]
+
+    response = await github_api_get(url, params=params, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        return response, cached[1], cached[2]
+    link_header = response.headers.get("link", "")
+    if response.status_code != 200:
+        return response, None, link_header
+
+    payload = response.json()
+    etag = response.headers.get("etag")
+    if etag:
+        github_etag_cache.set(cache_key, (etag, payload, link_header), size=len(response.content))
+    return response, payload, link_header
+
+def github_last_page(link_header: str) -> int:
+    """Read the page count from a Link header (1 when there is no rel="last")"""
+    match = re.search(r'<([^>]+)>;\s*rel="last"', link_header or "")
+    if not match:
+        return 1
+    try:
+        return int(httpx.URL(match.group(1)).params.get("page", 1))
+    except ValueError:
+        return 1
+
+async def fetch_github_user_repos(username: str) -> list:
+    """
+    Fetch all user repositories from GitHub API with optional authentication.
+    The first page reveals the page count; remaining pages are fetched concurrently,
+    up to GITHUB_MAX_REPOS repositories.
+    """
+    try:
+        logger.info(f"🐙 Fetching GitHub repos for user: {username}")
+        url = f"{GITHUB_API_URL}/users/{username}/repos"
+
+        async def fetch_page(page: int) -> tuple:
+            response, payload, link_header = await github_get_json(
+                url, params={"per_page": GITHUB_REPOS_PER_PAGE, "page": page}
+            )
+
+            if is_github_rate_limited(response):
+                GITHUB_RATE_LIMITED.inc(request_endpoint.get())
+                logger.error("❌ GitHub API rate limit reached")
+                raise HTTPException(
+                    status_code=429,
+                    detail="GitHub API rate limit exceeded. Please try again later."
+                )
+
+            if response.status_code == 404:
+                raise HTTPException(status_code=404, detail="GitHub user not found")
+
+            if payload is None:
+                response.raise_for_status()
+            return response, payload, link_header
+
+        first_response, repos, link_header = await fetch_page(1)
+        last_page = github_last_page(link_header)
+        max_pages = max(1, -(-GITHUB_MAX_REPOS // GITHUB_REPOS_PER_PAGE))
+        if last_page > max_pages:
+            logger.warning(f"✂️ {username} has ~{last_page * GITHUB_REPOS_PER_PAGE} repositories, fetching the first {GITHUB_MAX_REPOS}")
+            last_page = max_pages
+
+        if last_page > 1:
+            semaphore = asyncio.Semaphore(GITHUB_PAGE_CONCURRENCY)
+
+            async def bounded_fetch(page: int) -> list:
+                async with semaphore:
+                    _, payload, _ = await fetch_page(page)
+                    return payload
+
+            pages = await asyncio.gather(*(bounded_fetch(page) for page in range(2, last_page + 1)))
+            repos = list(repos)
+            for page_repos in pages:
+                repos.extend(page_repos)
+
+        repos = repos[:GITHUB_MAX_REPOS]
+        revalidated = " (revalidated)" if first_response.status_code == 304 else ""
+        logger.info(f"✅ Fetched {len(repos)} repositories from {last_page} page(s){revalidated}")
+        return repos
+
+    except httpx.HTTPStatusError as e:
+        logger.error(f"❌ GitHub API error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch GitHub data")
+
+# Byte-weighted language distribution from each repository's /languages endpoint
+GITHUB_LANGUAGE_BYTES_ENABLED = env_bool("GITHUB_LANGUAGE_BYTES_ENABLED", True)
+GITHUB_LANGUAGE_CONCURRENCY = env_int("GITHUB_LANGUAGE_CONCURRENCY", 32)
+GITHUB_LANGUAGE_MAX_REPOS = env_int("GITHUB_LANGUAGE_MAX_REPOS", 200)
+GITHUB_LANGUAGE_INCLUDE_FORKS = env_bool("GITHUB_LANGUAGE_INCLUDE_FORKS", False)
+GITHUB_LANGUAGE_INCLUDE_ARCHIVED = env_bool("GITHUB_LANGUAGE_INCLUDE_ARCHIVED", False)
+# /languages calls draw on the same hourly budget as the repository listings: one analysis may
+# spend this share of what is left above the reserve, which stays for the listings
+GITHUB_LANGUAGE_BUDGET_SHARE = env_float("GITHUB_LANGUAGE_BUDGET_SHARE", 0.1)
+GITHUB_LANGUAGE_BUDGET_RESERVE = env_float("GITHUB_LANGUAGE_BUDGET_RESERVE", 0.5)
+
+# Language byte counts per repository, keyed on its full name and pushed_at: a repository
+# nobody has pushed to since the last analysis is never fetched again
+github_language_cache = TTLCache(
+    max_entries=env_int("GITHUB_LANGUAGE_CACHE_MAX_ENTRIES", 50000),
+    ttl=env_float("GITHUB_LANGUAGE_CACHE_TTL_SECONDS", 7 * 24 * 3600),
+)
+github_language_stats = {"cacheHits": 0, "fetched": 0, "failed": 0, "estimated": 0, "skipped": 0, "overBudget": 0}
+
+async def fetch_github_repo_languages(repo: dict) -> dict:
+    """Bytes of code per language for one repository"""
+    response, payload, _ = await github_get_json(f"{GITHUB_API_URL}/repos/{repo['full_name']}/languages")
+    if is_github_rate_limited(response):
+        GITHUB_RATE_LIMITED.inc(request_endpoint.get())
+        raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded. Please try again later.")
+    if payload is None:
+        response.raise_for_status()
+    return {language: int(size) for language, size in payload.items()}
+
+async def github_language_allowance() -> int:
+    """
+    How many uncached /languages calls one analysis may make: none without GITHUB_TOKEN, since
+    the anonymous budget of 60 an hour cannot spare them; otherwise GITHUB_LANGUAGE_BUDGET_SHARE
+    of the budget left above GITHUB_LANGUAGE_BUDGET_RESERVE, at most GITHUB_LANGUAGE_MAX_REPOS.
+    """
+    if not os.getenv("GITHUB_TOKEN"):
+        return 0
+    budget = github_quota_budget()
+    spare = await quota_governor.level(budget) - budget.capacity * GITHUB_LANGUAGE_BUDGET_RESERVE
+    return max(0, min(GITHUB_LANGUAGE_MAX_REPOS, int(spare * GITHUB_LANGUAGE_BUDGET_SHARE)))
+
+async def github_language_bytes(repos: list) -> Counter:
+    """
+    Bytes of code per language across a user's repositories, skipping forks and archived ones
+    unless configured. The GITHUB_LANGUAGE_MAX_REPOS most recently pushed repositories are read
+    from /languages with bounded concurrency (cached until their next push), as far as the
+    GitHub budget allows. Any others, and those whose fetch fails, count their repository size
+    under their primary language.
+    """
+    eligible = [
+        repo for repo in repos
+        if (GITHUB_LANGUAGE_INCLUDE_FORKS or not repo.get("fork"))
+        and (GITHUB_LANGUAGE_INCLUDE_ARCHIVED or not repo.get("archived"))
+    ]
+    github_language_stats["skipped"] += len(repos) - len(eligible)
+    eligible.sort(key=lambda repo: repo.get("pushed_at") or "", reverse=True)
+    semaphore = asyncio.Semaphore(GITHUB_LANGUAGE_CONCURRENCY)
+    rate_limited = False
+    allowance = await github_language_allowance()
+
+    async def repo_languages(repo: dict) -> Optional[dict]:
+        nonlocal rate_limited, allowance
+        cache_key = f"{repo['full_name']}@{repo.get('pushed_at')}"
+        cached = github_language_cache.get(cache_key)
+        if cached is not None:
+            github_language_stats["cacheHits"] += 1
+            return cached
+        if allowance <= 0:
+            github_language_stats["overBudget"] += 1
+            return None
+        allowance -= 1
+        async with semaphore:
+            # Once GitHub's budget is gone, estimate the rest instead of queueing behind it
+            if rate_limited:
+                return None
+            try:
+                languages = await fetch_github_repo_languages(repo)
+            except HTTPException as e:
+                if e.status_code == 429 and not rate_limited:
+                    rate_limited = True
+                    logger.warning("🚦 GitHub rate limit reached, estimating remaining languages from repository sizes")
+                github_language_stats["failed"] += 1
+                return None
+            except httpx.HTTPError as e:
+                logger.warning(f"⚠️ Could not fetch languages for {repo['full_name']}: {str(e)}")
+                github_language_stats["failed"] += 1
+                return None
+        github_language_cache.set(cache_key, languages)
+        github_language_stats["fetched"] += 1
+        return languages
+
+    fetched = eligible[:GITHUB_LANGUAGE_MAX_REPOS]
+    results = await asyncio.gather(*(repo_languages(repo) for repo in fetched))
+    results += [None] * (len(eligible) - len(fetched))
+
+    totals = Counter()
+    for repo, languages in zip(eligible, results):
+        if languages is not None:
+            totals.update(languages)
+        elif repo.get("language"):
+            github_language_stats["estimated"] += 1
+            totals[repo["language"]] += (repo.get("size") or 0) * 1024
+    return +totals
+
+def normalize_score(raw_score: float) -> float:
+    try:
+        raw_score = float(raw_score)
+    except (ValueError, TypeError):
+        return 75.0  # fallback
+
+    if raw_score >= 90:
+        return min(100, raw_score)  # Excellent → keep up to 100
+    elif raw_score >= 80:
+        return 75 + (raw_score - 80)  # Good → map 80–89 to 75–85
+    elif raw_score >= 70:
+        return 65 + (raw_score - 70)  # Average → map 70–79 to 65–74
+    else:
+        return raw_score  # Poor → keep as-is
+
+# ATS keyword matching: normalizing tokenizer, single-pass phrase lexicon, BM25 weighting
+# Keeps tech tokens intact ("c++", "c#", "node.js", ".net"); stray dots are trimmed per unique token
+KEYWORD_TOKEN_PATTERN = re.compile(r"[a-z0-9.+#]+")
+KEYWORD_LETTER_PATTERN = re.compile(r"[a-z]")
+
+KEYWORD_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each etc few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most my
+myself no nor not of off on once only or other our ours ourselves out over own per same she should so
+some such than that the their theirs them themselves then there these they this those through to too
+under until up upon us very via was we were what when where which while who whom why will with within
+without would you your yours yourself yourselves
+""".split())
+
+# Words every job description and resume uses; they count, but far less than a real skill
+KEYWORD_GENERIC_WORDS = """
+ability candidate collaborate communication company develop environment excellent experience familiarity
+good great help ideal job knowledge looking new plus preferred professional project required requirements
+responsibilities role skills strong successful team understanding work years
+""".split()
+
+# Canonical skill -> surface forms. Multi-word forms and aliases all count as the canonical skill.
+KEYWORD_SKILL_LEXICON = {
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning"],
+    "natural language processing": ["natural language processing", "nlp"],
+    "computer vision": ["computer vision"],
+    "artificial intelligence": ["artificial intelligence", "ai"],
+    "large language models": ["large language models", "large language model", "llm", "llms"],
+    "data science": ["data science"],
+    "data analysis": ["data analysis", "data analytics"],
+    "data engineering": ["data engineering"],
+    "data visualization": ["data visualization"],
+    "data structures": ["data structures", "data structures and algorithms", "dsa"],
+    "big data": ["big data"],
+    "javascript": ["javascript", "js", "ecmascript"],
+    "typescript": ["typescript"],
+    "node.js": ["node.js", "nodejs", "node js"],
+    "react": ["react", "react.js", "reactjs"],
+    "next.js": ["next.js", "nextjs"],
+    "vue.js": ["vue", "vue.js", "vuejs"],
+    "angular": ["angular", "angularjs", "angular.js"],
+    "express": ["express.js", "expressjs"],
+    "golang": ["golang", "go lang"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp"],
+    ".net": [".net", "dotnet", "asp.net"],
+    "postgresql": ["postgresql", "postgres", "psql"],
+    "mysql": ["mysql"],
+    "mongodb": ["mongodb", "mongo"],
+    "sql": ["sql"],
+    "nosql": ["nosql"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "docker": ["docker", "containerization"],
+    "amazon web services": ["amazon web services", "aws"],
+    "google cloud platform": ["google cloud platform", "google cloud", "gcp"],
+    "microsoft azure": ["microsoft azure", "azure"],
+    "ci/cd": ["ci/cd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "rest api": ["rest api", "rest apis", "restful api", "restful apis", "restful"],
+    "graphql": ["graphql"],
+    "microservices": ["microservices", "microservice", "micro services"],
+    "distributed systems": ["distributed systems", "distributed system"],
+    "system design": ["system design"],
+    "object oriented programming": ["object oriented programming", "object-oriented programming", "oop"],
+    "unit testing": ["unit testing", "unit tests", "unit test"],
+    "test driven development": ["test driven development", "test-driven development", "tdd"],
+    "version control": ["version control", "git", "github", "gitlab"],
+    "agile": ["agile", "scrum", "kanban"],
+    "project management": ["project management"],
+    "product management": ["product management"],
+    "scikit-learn": ["scikit-learn", "scikit learn", "sklearn"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch", "torch"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "power bi": ["power bi", "powerbi"],
+    "tableau": ["tableau"],
+    "microsoft excel": ["microsoft excel", "ms excel"],
+    "html": ["html", "html5"],
+    "css": ["css", "css3"],
+    "tailwind css": ["tailwind css", "tailwindcss", "tailwind"],
+    "fastapi": ["fastapi", "fast api"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "spring boot": ["spring boot", "springboot"],
+    "apache spark": ["apache spark", "spark", "pyspark"],
+    "apache kafka": ["apache kafka", "kafka"],
+    "airflow": ["airflow", "apache airflow"],
+    "linux": ["linux", "unix"],
+    "terraform": ["terraform"],
+    "user experience": ["user experience", "ux"],
+    "user interface": ["user interface", "ui"],
+    "search engine optimization": ["search engine optimization", "seo"],
+}
+
+KEYWORD_SKILL_WEIGHT = env_float("KEYWORD_SKILL_WEIGHT", 2.0)
+KEYWORD_GENERIC_WEIGHT = env_float("KEYWORD_GENERIC_WEIGHT", 0.25)
+KEYWORD_BM25_K1 = env_float("KEYWORD_BM25_K1", 1.2)
+KEYWORD_BM25_B = env_float("KEYWORD_BM25_B", 0.75)
+KEYWORD_AVERAGE_RESUME_TERMS = env_float("KEYWORD_AVERAGE_RESUME_TERMS", 450.0)
+
+_KEYWORD_STEM_SUFFIXES = (("ies", "y"), ("ied", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", ""))
+
+def keyword_term(raw_token: str) -> str:
+    """Normalize one raw token: trim sentence dots (keeping ".net"), then stem"""
+    token = raw_token.strip(".")
+    if raw_token.startswith(".") and not raw_token.startswith("..") and token.isalpha():
+        token = "." + token
+    return stem_keyword(token)
+
+def stem_keyword(token: str) -> str:
+    """
+    Light suffix stripper: conflates plurals and -ing/-ed/-e forms ("manage", "managed",
+    "managing" -> "manag") and leaves tokens with digits or symbols ("c++", "node.js") alone.
+    """
+    if not token.isalpha() or len(token) <= 4 or token.endswith("ss"):
+        return token
+    for suffix, replacement in _KEYWORD_STEM_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[: -len(suffix)] + replacement
+            break
+    return token[:-1] if token.endswith("e") and len(token) > 4 else token
+
+class PhraseLexicon:
+    """
+    Aho-Corasick automaton over token sequences. One left-to-right pass over a token stream
+    reports every lexicon phrase it contains (overlaps included) in O(tokens + matches).
+    """
+
+    def __init__(self, phrases: dict):
+        # phrases: tuple of tokens -> canonical term
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for tokens, canonical in phrases.items():
+            state = 0
+            for token in tokens:
+                next_state = self.goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][token] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append((len(tokens), canonical))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self.goto[state].items():
+                queue.append(next_state)
+                if state:
+                    fallback = self.fail[state]
+                    while fallback and token not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[next_state] = self.goto[fallback].get(token, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+        self.goto_tokens = frozenset(token for transitions in self.goto for token in transitions)
+
+    def matches(self, tokens: list) -> list:
+        """(start index, token length, canonical term) for every phrase occurrence"""
+        found = []
+        goto, fail, output, vocabulary = self.goto, self.fail, self.output, self.goto_tokens
+        state = 0
+        previous = -2
+        # Only tokens that occur in some phrase can advance the automaton; any other token resets it
+        for index in [index for index, token in enumerate(tokens) if token in vocabulary]:
+            if index != previous + 1:
+                state = 0
+            previous = index
+            token = tokens[index]
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, canonical in output[state]:
+                found.append((index - length + 1, length, canonical))
+        return found
+
+class KeywordMatcher:
+    """
+    ATS-style keyword matcher. Text becomes a bag of terms: stemmed non-stopword tokens plus
+    canonical skills found by the phrase lexicon (a matched phrase replaces its tokens, so
+    "machine learning" counts once as a skill rather than as two generic words). The resume is
+    scored with BM25 against the job description's terms, each weighted by a prior IDF
+    (skills high, generic hiring vocabulary low), and normalized to 0-100.
+    """
+
+    def __init__(self, lexicon: dict):
+        phrases = {}
+        self.skill_terms = set()
+        self.generic_terms = frozenset(stem_keyword(word) for word in KEYWORD_GENERIC_WORDS)
+        for canonical, surface_forms in lexicon.items():
+            self.skill_terms.add(canonical)
+            for form in surface_forms:
+                tokens = tuple(keyword_term(token) for token in KEYWORD_TOKEN_PATTERN.findall(form.lower()))
+                if tokens:
+                    phrases[tokens] = canonical
+        self.lexicon = PhraseLexicon(phrases)
+        self._stems = {}  # raw token -> term
+        self._ignored = set()  # terms that never count on their own
+        self._queries = OrderedDict()
+        # The resume index calls in from worker threads while endpoints use it on the event loop
+        self._lock = threading.Lock()
+
+    def terms(self, text: str) -> Counter:
+        raw_tokens = KEYWORD_TOKEN_PATTERN.findall(text.lower())
+        with self._lock:
+            stems = self._stems
+            unseen = set(raw_tokens).difference(stems)
+            if unseen:
+                if len(stems) + len(unseen) > 100000:
+                    stems.clear()
+                    self._ignored.clear()
+                for token in unseen:
+                    term = stems[token] = keyword_term(token)
+                    if not self.countable(term):
+                        self._ignored.add(term)
+            tokens = list(map(stems.__getitem__, raw_tokens))
+            ignored = self._ignored.intersection(tokens)
+
+        # A matched phrase replaces its tokens: "machine learning" is one skill, not two words
+        matches = self.lexicon.matches(tokens)
+        if matches:
+            covered = {index for start, length, _ in matches for index in range(start, start + length)}
+            tokens = [token for index, token in enumerate(tokens) if index not in covered]
+            tokens.extend(canonical for _, _, canonical in matches)
+        counts = Counter(tokens)
+        for token in ignored:
+            del counts[token]
+        return counts
+
+    def countable(self, term: str) -> bool:
+        """Stopwords, single characters and pure numbers ("2019", "3.5") are not keywords"""
+        return len(term) > 1 and term not in KEYWORD_STOPWORDS and KEYWORD_LETTER_PATTERN.search(term) is not None
+
+    def term_weight(self, term: str) -> float:
+        if term in self.skill_terms:
+            return KEYWORD_SKILL_WEIGHT
+        if term in self.generic_terms:
+            return KEYWORD_GENERIC_WEIGHT
+        return 1.0
+
+    def query(self, job_desc: str) -> dict:
+        """Weighted query terms for a job description; cached since batches reuse one description"""
+        key = hashlib.sha256(job_desc.encode("utf-8")).digest()
+        with self._lock:
+            query = self._queries.get(key)
+            if query is not None:
+                self._queries.move_to_end(key)
+                return query
+        query = {
+            # Repeated requirements matter more, with diminishing returns
+            term: self.term_weight(term) * (1.0 + math.log(count))
+            for term, count in self.terms(job_desc).items()
+        }
+        with self._lock:
+            self._queries[key] = query
+            if len(self._queries) > 256:
+                self._queries.popitem(last=False)
+        return query
+
+    def analyze(self, resume_text: str, job_desc: str) -> dict:
+        query = self.query(job_desc or "")
+        if not query:
+            return {"score": 0.0, "matched": [], "missing": []}
+        resume_terms = self.terms(resume_text or "")
+        length_norm = 1.0 - KEYWORD_BM25_B + KEYWORD_BM25_B * (sum(resume_terms.values()) / KEYWORD_AVERAGE_RESUME_TERMS)
+        k1 = KEYWORD_BM25_K1
+        achieved = 0.0
+        possible = 0.0
+        matched = []
+        missing = []
+        for term, weight in query.items():
+            # The best a resume can do per term is saturation; normalize against that
+            possible += weight
+            tf = resume_terms.get(term, 0)
+            if tf:
+                achieved += weight * (tf * (k1 + 1)) / (tf + k1 * length_norm) / (k1 + 1)
+                matched.append(term)
+            else:
+                missing.append(term)
+        # Half weighted coverage, half BM25 (which only approaches full credit with repetition)
+        coverage = sum(query[term] for term in matched)
+        score = 100.0 * (0.5 * coverage + 0.5 * achieved) / possible
+        return {
+            "score": round(min(score, 100.0), 2),
+            "matched": sorted(matched, key=lambda term: -query[term]),
+            "missing": sorted(missing, key=lambda term: -query[term]),
+        }
+
+keyword_matcher = KeywordMatcher(KEYWORD_SKILL_LEXICON)
+
+def keyword_match_score(resume_text: str, job_desc: str) -> float:
+    return keyword_matcher.analyze(resume_text, job_desc)["score"]
+
+# Lite mode: a deterministic, rule-based review that needs no LLM. Used on request (mode=lite)
+# and in place of an error when no model answers within the deadline budget
+LITE_FALLBACK_ENABLED = env_bool("LITE_FALLBACK_ENABLED", True)
+LITE_ANALYSES = metrics.counter("careerai_lite_analyses_total", "Rule-based analyses by endpoint and reason", ("endpoint", "reason"))
+lite_stats = {"requested": 0, "fallbacks": 0}
+
+ACTION_VERBS = frozenset("""
+accelerated achieved analyzed architected automated boosted built championed coached collaborated
+completed consolidated coordinated created cut decreased delivered deployed designed developed
+directed drove eliminated enabled engineered established expanded facilitated founded generated
+grew guided implemented improved increased initiated integrated introduced launched led
+maintained managed mentored migrated modernized negotiated optimized orchestrated organized
+owned pioneered planned produced published rebuilt redesigned reduced refactored resolved
+restructured revamped saved scaled secured shipped simplified spearheaded streamlined
+supervised taught tested trained transformed upgraded won wrote
+""".split())
+# Measurable results: percentages, multipliers, money, magnitudes, counts of two or more digits
+# (calendar years excluded)
+QUANTIFIED_PATTERN = re.compile(
+    r"[$€£₹]\s?\d|\d\s?(?:%|percent\b|x\b|k\b|m\b|\+)|\b(?!(?:19|20)\d\d\b)\d{2,}(?:[.,]\d+)?\b",
+    re.IGNORECASE,
+)
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d ()\-.]{7,}\d")
+PROFILE_LINK_PATTERN = re.compile(r"linkedin\.com|github\.com|https?://|www\.", re.IGNORECASE)
+BULLET_PREFIX = "•●▪◦‣*-–· \t"
+# Single-token languages and tools the phrase lexicon leaves to plain keyword matching; together
+# with the lexicon's canonical skills they are what lite mode recognizes as technical skills
+LITE_SKILL_TOKENS = """
+python java kotlin scala ruby rust perl php swift haskell elixir erlang clojure dart lua matlab
+bash powershell solidity flutter svelte redux jquery bootstrap sass webpack jest cypress playwright
+selenium pytest junit laravel rails symfony keras opencv scipy matplotlib seaborn xgboost langchain
+redis elasticsearch cassandra dynamodb sqlite snowflake bigquery hadoop dbt looker jenkins ansible
+helm nginx rabbitmq grpc prometheus grafana figma jira
+""".split()
+LITE_SKILL_NAMES = {keyword_term(name): name for name in LITE_SKILL_TOKENS}
+
+def lite_text_profile(text: str) -> dict:
+    """Counts the lite rules score: sections, length, action verbs, quantified results, skills, contact"""
+    sections = resume_section_texts(text or "")
+    achievement_sections = [name for name in ("experience", "projects") if name in sections]
+    lines = [
+        line.strip(BULLET_PREFIX)
+        for name in achievement_sections
+        for line in sections[name].split("\n")[1:]
+    ] if achievement_sections else [line.strip(BULLET_PREFIX) for line in (text or "").split("\n")]
+    statements = [line for line in lines if len(line.split()) >= 4]
+    terms = keyword_matcher.terms(text or "")
+    # Words under each section's headings, not counting the headings themselves
+    section_words = {}
+    for section, _, body in resume_section_parts(text or ""):
+        section_words[section] = section_words.get(section, 0) + len(body.split())
+    return {
+        "sections": sections,
+        "sectionWords": section_words,
+        "words": len((text or "").split()),
+        "statements": len(statements),
+        "actionVerbs": sum(1 for line in statements if line.split()[0].lower().strip(",.:;") in ACTION_VERBS),
+        "quantified": sum(1 for line in statements if QUANTIFIED_PATTERN.search(line)),
+        "denseLines": sum(1 for line in statements if len(line.split()) > 35),
+        "skills": [
+            LITE_SKILL_NAMES.get(term, term) for term in sorted(terms, key=lambda term: -terms[term])
+            if term in keyword_matcher.skill_terms or term in LITE_SKILL_NAMES
+        ],
+        "email": EMAIL_PATTERN.search(text or "") is not None,
+        "phone": PHONE_PATTERN.search(text or "") is not None,
+        "link": PROFILE_LINK_PATTERN.search(text or "") is not None,
+    }
+
+def lite_ratio(part: int, whole: int) -> float:
+    return part / whole if whole else 0.0
+
+def lite_length_credit(words: int, low: int, high: int) -> float:
+    if words < low:
+        return words / low
+    if words > high:
+        return max(0.0, 1.0 - (words - high) / high)
+    return 1.0
+
+def lite_score(
+    profile: dict, core_sections: tuple, length_range: tuple, contact: tuple = ("email", "phone", "link")
+) -> tuple:
+    """0-100 score and the per-rule credits (0-1) it was built from"""
+    credits = {
+        "sections": lite_ratio(sum(1 for name in core_sections if name in profile["sections"]), len(core_sections)),
+        "quantified": min(1.0, lite_ratio(profile["quantified"], profile["statements"]) / 0.5),
+        "actionVerbs": min(1.0, lite_ratio(profile["actionVerbs"], profile["statements"]) / 0.7),
+        "length": lite_length_credit(profile["words"], *length_range),
+        "skills": min(1.0, len(profile["skills"]) / 10),
+        "contact": sum(profile[kind] for kind in contact) / len(contact),
+    }
+    weights = {"sections": 25, "quantified": 20, "actionVerbs": 15, "length": 15, "skills": 15, "contact": 10}
+    return round(sum(weights[rule] * credit for rule, credit in credits.items()), 1), credits
+
+LITE_ADVICE = {
+    "sections": "add the missing standard sections so ATS parsers can find your information",
+    "quantified": "attach a measurable result (%, time saved, revenue, users) to more of your bullet points",
+    "actionVerbs": "start each bullet with a strong past-tense action verb (led, built, reduced, shipped)",
+    "length": "bring the length to one or two pages of focused content",
+    "skills": "list more of your concrete tools and technologies in a dedicated skills section",
+    "contact": "make sure your email, phone number and a LinkedIn or portfolio link are at the top",
+}
+
+def lite_weakest_advice(credits: dict, count: int = 3) -> str:
+    weakest = [rule for rule, credit in sorted(credits.items(), key=lambda item: item[1]) if credit < 0.9][:count]
+    if not weakest:
+        return "The resume already follows the main ATS conventions; tailor the wording to each role you apply for."
+    return "Priorities: " + "; ".join(f"{index}. {LITE_ADVICE[rule]}" for index, rule in enumerate(weakest, 1)) + "."
+
+def lite_section_feedback(profile: dict, name: str, label: str, missing_advice: str) -> str:
+    text = profile["sections"].get(name)
+    if not text:
+        return f"No {label} section was detected. {missing_advice}"
+    return f"{label[0].upper()}{label[1:]} section found ({profile['sectionWords'].get(name, 0)} words)."
+
+def lite_statement_feedback(profile: dict) -> str:
+    statements = profile["statements"]
+    if not statements:
+        return "No experience or project statements were detected; describe each role with 3–5 bullet points."
+    feedback = (
+        f"{profile['quantified']} of {statements} statements ({lite_ratio(profile['quantified'], statements):.0%}) "
+        f"include a measurable result and {profile['actionVerbs']} ({lite_ratio(profile['actionVerbs'], statements):.0%}) "
+        f"start with an action verb."
+    )
+    if profile["denseLines"]:
+        feedback += f" {profile['denseLines']} statement(s) run over 35 words; split them into shorter bullets."
+    return feedback
+
+def record_lite_analysis(analysis_mode: str):
+    fallback = analysis_mode == "lite-fallback"
+    lite_stats["fallbacks" if fallback else "requested"] += 1
+    LITE_ANALYSES.inc(request_endpoint.get(), "fallback" if fallback else "requested")
+
+def lite_notice(analysis_mode: str) -> str:
+    if analysis_mode == "lite-fallback":
+        return "The AI analysis is temporarily unavailable, so this is a quick rule-based review. "
+    return "Quick rule-based review. "
+
+def lite_resume_feedback(profile: dict) -> dict:
+    skills = profile["skills"]
+    summary = lite_section_feedback(
+        profile, "summary", "summary",
+        "Add 2–3 lines at the top naming your target role, years of experience and strongest skills.",
+    )
+    if profile["sectionWords"].get("summary", 0) > 80:
+        summary += " It is long; tighten it to 2–3 lines."
+    skills_feedback = lite_section_feedback(
+        profile, "skills", "skills", "Add a dedicated skills section listing your tools and technologies."
+    )
+    skills_feedback += (
+        f" Recognized skills: {', '.join(skills[:12])}." if skills
+        else " No recognized technical skills were found in the text."
+    )
+    projects = lite_section_feedback(
+        profile, "projects", "projects", "Add 1–3 projects that show the skills your target roles ask for."
+    )
+    return {
+        "summaryFeedback": summary,
+        "skillsFeedback": skills_feedback,
+        "experienceFeedback": lite_section_feedback(
+            profile, "experience", "work experience", "List your roles with employer, dates and achievements."
+        ) + " " + lite_statement_feedback(profile),
+        "educationFeedback": lite_section_feedback(
+            profile, "education", "education", "Add your degree, institution and graduation year."
+        ),
+        "projectFeedback": projects,
+        "jobRoleSuggestions": (
+            f"Target roles whose requirements lead with {', '.join(skills[:5])}, and mirror their wording."
+            if skills else "Name the role you are targeting in your summary and list the skills it requires."
+        ),
+    }
+
+def lite_comprehensive_analysis(resume_text: str, analysis_mode: str = "lite") -> ResumeAnalysisComprehensiveResponse:
+    """Rule-based comprehensive analysis; flagged through analysisMode"""
+    record_lite_analysis(analysis_mode)
+    with stage_timer("lite_score"):
+        profile = lite_text_profile(resume_text)
+        score, credits = lite_score(profile, tuple(RESUME_SECTION_FEEDBACK_FIELDS), (350, 900))
+        found = [name for name in RESUME_SECTION_FEEDBACK_FIELDS if name in profile["sections"]]
+        return ResumeAnalysisComprehensiveResponse(
+            score=score,
+            comprehensiveAnalysis=(
+                f"{lite_notice(analysis_mode)}The resume has {profile['words']} words, "
+                f"{len(found)} of {len(RESUME_SECTION_FEEDBACK_FIELDS)} standard sections "
+                f"({', '.join(found) or 'none recognized'}) and {len(profile['skills'])} recognized skills. "
+                + lite_statement_feedback(profile)
+            ),
+            overallSuggestions=lite_notice(analysis_mode) + lite_weakest_advice(credits),
+            analysisMode=analysis_mode,
+            **lite_resume_feedback(profile),
+        )
+
+def lite_job_description_analysis(resume_text: str, job_description: str, analysis_mode: str = "lite") -> ResumeAnalysisJobResponse:
+    """Rule-based fit against a job description: resume quality blended with keyword coverage"""
+    record_lite_analysis(analysis_mode)
+    with stage_timer("lite_score"):
+        profile = lite_text_profile(resume_text)
+        quality, credits = lite_score(profile, tuple(RESUME_SECTION_FEEDBACK_FIELDS), (350, 900))
+        keywords = keyword_matcher.analyze(resume_text, job_description)
+        feedback = lite_resume_feedback(profile)
+        matched, missing = keywords["matched"][:10], keywords["missing"][:10]
+        feedback["skillsFeedback"] += (
+            f" Job keywords covered: {', '.join(matched) or 'none'}."
+            f" Missing: {', '.join(missing) or 'none'}."
+        )
+        feedback["jobRoleSuggestions"] = (
+            f"Work the missing job keywords ({', '.join(missing[:5])}) into your summary and experience where they are true for you."
+            if missing else "The resume already covers the job's main keywords; lead with the most relevant achievements."
+        )
+        return ResumeAnalysisJobResponse(
+            score=round(0.4 * quality + 0.6 * keywords["score"], 2),
+            overallSuggestions=lite_notice(analysis_mode) + lite_weakest_advice(credits),
+            analysisMode=analysis_mode,
+            **feedback,
+        )
+
+def lite_linkedin_analysis(profile_text: str, analysis_mode: str = "lite") -> LinkedInOptimizerResponse:
+    """Rule-based LinkedIn profile review; flagged through analysisMode"""
+    record_lite_analysis(analysis_mode)
+    with stage_timer("lite_score"):
+        profile = lite_text_profile(profile_text)
+        # LinkedIn exports carry no phone number
+        score, credits = lite_score(
+            profile, ("summary", "experience", "skills", "education"), (300, 1500), contact=("email", "link")
+        )
+        # The headline is the first line under the name that is not contact information
+        header = [line.strip() for line in profile["sections"].get("other", "").split("\n") if line.strip()]
+        headline = next((
+            line for line in header[1:]
+            if not (EMAIL_PATTERN.search(line) or PHONE_PATTERN.search(line) or PROFILE_LINK_PATTERN.search(line))
+        ), "")
+        skills = profile["skills"]
+        return LinkedInOptimizerResponse(
+            profileStrengthScore=score,
+            headlineFeedback=(
+                f"Headline detected: \"{headline[:120]}\". "
+                + ("It is short; add your specialty and 2–3 key skills." if len(headline.split()) < 5
+                   else "Make sure it names your role and the skills recruiters search for.")
+                if headline else "No headline was detected under your name; add one naming your role and key skills."
+            ),
+            summaryFeedback=lite_section_feedback(
+                profile, "summary", "About", "Add an About section that tells your story and names your specialties."
+            ),
+            experienceFeedback=lite_section_feedback(
+                profile, "experience", "experience", "Add your positions with a short description of each."
+            ) + " " + lite_statement_feedback(profile),
+            skillsFeedback=lite_section_feedback(
+                profile, "skills", "skills", "Add your top skills so they show up in recruiter searches."
+            ) + (f" Recognized skills: {', '.join(skills[:12])}." if skills else ""),
+            activityFeedback="Posts and engagement are not part of the PDF export, so activity was not assessed.",
+            keywordSuggestions=", ".join(skills[:10]) if skills else "",
+            overallSuggestions=lite_notice(analysis_mode) + lite_weakest_advice(credits),
+            analysisMode=analysis_mode,
+        )
+
+async def analysis_or_lite_fallback(cache_key: str, analyze, lite, cache_result: bool = True):
+    """
+    coalesced_analysis(), except that when no model answers within the deadline budget the
+    caller gets lite("lite-fallback") instead of an error. The fallback is not cached, so the
+    next request for the same input tries the LLM again.
+    """
+    try:
+        return await coalesced_analysis(cache_key, analyze, cache_result)
+    except LLMUnavailableError as e:
+        if not LITE_FALLBACK_ENABLED:
+            raise
+        logger.warning(f"🪫 No model answered ({e.detail}); returning a rule-based analysis")
+        return lite("lite-fallback")
+
+# Persistent resume term index: every extracted resume becomes a row of term counts on disk,
+# so new job descriptions can be ranked against the whole pool without re-uploading or the LLM
+RESUME_INDEX_ENABLED = env_bool("RESUME_INDEX_ENABLED", True)
+RESUME_INDEX_DIR = os.getenv("RESUME_INDEX_DIR", "resume_index")
+RESUME_INDEX_COMPACT_POSTINGS = env_int("RESUME_INDEX_COMPACT_POSTINGS", 500000)
+RESUME_SEARCH_MAX_TOP_K = env_int("RESUME_SEARCH_MAX_TOP_K", 500)
+# When set, /api/resume-index/search requires it in the X-API-Key header
+RESUME_SEARCH_API_KEY = os.getenv("RESUME_SEARCH_API_KEY", "")
+
+_numpy_module = None
+
+def get_numpy():
+    """numpy, imported on first use (the resume index loads in the warmup task) to keep it off the import path"""
+    global _numpy_module
+    if _numpy_module is None:
+        import numpy
+        _numpy_module = numpy
+    return _numpy_module
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process lock, so run a single worker there
+    fcntl = None
+
+class ResumeTermIndex:
+    """
+    Append-friendly sparse term matrix (documents x terms) on disk.
+
+    Layout of the index directory:
+    - vocabulary.txt: one term per line; the line number is the term id
+    - documents.jsonl: one line per document (sha256, filename, term count); committed last,
+      so a crash mid-append leaves at most trailing postings that are ignored on load
+    - log.bin: recently appended postings as (term id, doc id, tf) uint32 triples
+    - segment_*.npy: compacted postings sorted by term (CSR: offsets, doc ids, tfs),
+      memory-mapped so only the rows a query touches are paged in
+
+    Every uvicorn worker shares the directory: appends and compactions hold an exclusive flock
+    on index.lock, and each worker reads what the others appended before writing or searching.
+
+    New documents go to the log; once it holds RESUME_INDEX_COMPACT_POSTINGS postings it is
+    merged into a new segment. A search reads each query term's posting list straight out of
+    the segment by offset, so scoring 100k documents is a handful of vectorized numpy ops.
+    """
+
+    def __init__(self, directory: str, matcher: KeywordMatcher, compact_postings: int):
+        self.directory = directory
+        self.matcher = matcher
+        self.compact_postings = compact_postings
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._loaded = False
+        self.vocabulary = {}
+        self.documents = []  # (sha256, filename) by doc id
+        self.doc_ids = {}  # sha256 -> doc id
+        # numpy arrays, created by load() so importing numpy stays off the startup path
+        self.doc_lengths = None
+        self.segment_offsets = None
+        self.segment_docs = None
+        self.segment_tfs = None
+        self.log = None
+        # Appends are buffered and concatenated lazily so adding a document stays O(its terms)
+        self._pending_postings = []
+        self._pending_lengths = []
+        self._log_postings = 0
+        self._sorted_log = None  # log ordered by term id, rebuilt after appends for searchsorted lookups
+        # How far each shared file has been read, so other workers' appends can be picked up
+        self._read_offsets = {"vocabulary.txt": 0, "documents.jsonl": 0, "log.bin": 0}
+        self._segment_stamp = None
+        self.compactions = 0
+        self.searches = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """
+        Inter-process lock over the index files (caller holds self._lock). Every uvicorn worker
+        appends to the same files, so ids are only handed out under the exclusive lock, after
+        catching up with the other workers' appends.
+        """
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _segment_file_stamp(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self._path("segment_offsets.npy"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _read_new(self, name: str, unit: bytes = b"\n", size: int = 0) -> bytes:
+        """Complete lines (or `size`-byte records) appended to a shared file since the last read"""
+        try:
+            with open(self._path(name), "rb") as handle:
+                handle.seek(self._read_offsets[name])
+                data = handle.read()
+        except FileNotFoundError:
+            return b""
+        complete = len(data) - len(data) % size if size else data.rfind(unit) + 1
+        return data[:complete]
+
+    def load(self):
+        np = get_numpy()
+
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._lock_file = open(self._path("index.lock"), "a+b")
+            self.segment_offsets = np.zeros(1, dtype=np.int64)
+            self.segment_docs = np.zeros(0, dtype=np.uint32)
+            self.segment_tfs = np.zeros(0, dtype=np.uint32)
+            self.log = np.zeros((0, 3), dtype=np.uint32)
+            self.doc_lengths = np.zeros(0, dtype=np.float32)
+            with self._file_lock(exclusive=False):
+                self._refresh()
+            self._loaded = True
+        logger.info(f"🗂️ Resume index loaded ({len(self.documents)} documents, {len(self.vocabulary)} terms)")
+
+    def _refresh(self):
+        """
+        Catch up with what this and other workers appended or compacted since the last read
+        (caller holds self._lock and the file lock). Only complete lines and postings are taken.
+        """
+        np = get_numpy()
+
+        stamp = self._segment_file_stamp()
+        if stamp != self._segment_stamp:
+            if stamp is not None:
+                self.segment_offsets = np.load(self._path("segment_offsets.npy"), mmap_mode="r")
+                self.segment_docs = np.load(self._path("segment_docs.npy"), mmap_mode="r")
+                self.segment_tfs = np.load(self._path("segment_tfs.npy"), mmap_mode="r")
+            # A compaction moved every logged posting into the new segment and emptied the log
+            self._segment_stamp = stamp
+            self.log = np.zeros((0, 3), dtype=np.uint32)
+            self._pending_postings = []
+            self._read_offsets["log.bin"] = 0
+            self._log_postings = 0
+            self._sorted_log = None
+
+        data = self._read_new("vocabulary.txt")
+        self._read_offsets["vocabulary.txt"] += len(data)
+        for term in data.decode("utf-8").split("\n"):
+            if term:
+                self.vocabulary[term] = len(self.vocabulary)
+
+        data = self._read_new("documents.jsonl")
+        self._read_offsets["documents.jsonl"] += len(data)
+        for line in data.decode("utf-8").splitlines():
+            document = json.loads(line)
+            self.doc_ids[document["sha256"]] = len(self.documents)
+            self.documents.append((document["sha256"], document.get("filename")))
+            self._pending_lengths.append(document["terms"])
+
+        data = self._read_new("log.bin", size=12)
+        if data:
+            postings = np.frombuffer(data, dtype=np.uint32).reshape(-1, 3)
+            # Postings of a document whose metadata line never landed (a crashed append) are
+            # trailing; stop before them so the next writer can truncate them away
+            orphaned = np.flatnonzero(postings[:, 1] >= len(self.documents))
+            if len(orphaned):
+                postings = postings[: orphaned[0]]
+            self._read_offsets["log.bin"] += postings.nbytes
+            if len(postings):
+                self._pending_postings.append(postings)
+                self._log_postings += len(postings)
+
+    def _truncate_torn_tails(self):
+        """Drop the partial writes of a crashed append before appending (caller holds the exclusive lock)"""
+        for name, offset in self._read_offsets.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > offset:
+                os.truncate(path, offset)
+
+    def add(self, sha256: str, filename: Optional[str], text: str) -> bool:
+        """Index one resume's text; returns False if this exact file is already indexed"""
+        np = get_numpy()
+
+        if not self._loaded:
+            self.load()
+        if sha256 in self.doc_ids:
+            return False
+        counts = self.matcher.terms(text)
+        if not counts:
+            return False
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            if sha256 in self.doc_ids:
+                return False
+            self._truncate_torn_tails()
+            doc_id = len(self.documents)
+            new_terms = [term for term in counts if term not in self.vocabulary]
+            if new_terms:
+                data = "".join(f"{term}\n" for term in new_terms).encode("utf-8")
+                with open(self._path("vocabulary.txt"), "ab") as handle:
+                    handle.write(data)
+                self._read_offsets["vocabulary.txt"] += len(data)
+                for term in new_terms:
+                    self.vocabulary[term] = len(self.vocabulary)
+            postings = np.array(
+                [(self.vocabulary[term], doc_id, count) for term, count in counts.items()], dtype=np.uint32
+            )
+            with open(self._path("log.bin"), "ab") as handle:
+                handle.write(postings.tobytes())
+            self._read_offsets["log.bin"] += postings.nbytes
+            length = int(sum(counts.values()))
+            data = (json.dumps({
+                "sha256": sha256, "filename": filename, "terms": length, "indexedAt": datetime.now().isoformat(),
+            }) + "\n").encode("utf-8")
+            with open(self._path("documents.jsonl"), "ab") as handle:
+                handle.write(data)
+            self._read_offsets["documents.jsonl"] += len(data)
+            self.documents.append((sha256, filename))
+            self.doc_ids[sha256] = doc_id
+            self._pending_lengths.append(length)
+            self._pending_postings.append(postings)
+            self._log_postings += len(postings)
+            if self._log_postings >= self.compact_postings:
+                self._compact()
+        return True
+
+    def _materialize(self):
+        """Fold buffered appends into the in-memory arrays (caller holds the lock)"""
+        np = get_numpy()
+
+        if self._pending_postings:
+            self.log = np.concatenate([self.log, *self._pending_postings])
+            self.doc_lengths = np.concatenate([self.doc_lengths, np.asarray(self._pending_lengths, dtype=np.float32)])
+            self._pending_postings = []
+            self._pending_lengths = []
+            self._sorted_log = None
+
+    def _log_by_term(self):
+        """Term-sorted view of the log (caller holds the lock)"""
+        np = get_numpy()
+
+        if self._sorted_log is None:
+            log = self.log[np.argsort(self.log[:, 0], kind="stable")]
+            self._sorted_log = (log[:, 0], log[:, 1], log[:, 2])
+        return self._sorted_log
+
+    def _compact(self):
+        """Merge the log into a new term-sorted segment (caller holds the lock)"""
+        np = get_numpy()
+
+        started = time.perf_counter()
+        self._materialize()
+        segment_terms = np.repeat(
+            np.arange(len(self.segment_offsets) - 1, dtype=np.uint32), np.diff(self.segment_offsets)
+        )
+        terms = np.concatenate([segment_terms, self.log[:, 0]])
+        docs = np.concatenate([np.asarray(self.segment_docs), self.log[:, 1]])
+        tfs = np.concatenate([np.asarray(self.segment_tfs), self.log[:, 2]])
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+        offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(self.vocabulary)), out=offsets[1:])
+
+        for name, array in (("segment_docs", docs), ("segment_tfs", tfs), ("segment_offsets", offsets)):
+            np.save(self._path(f"{name}.tmp.npy"), array)
+        # Offsets are replaced last: a reader never sees offsets that point past the data
+        for name in ("segment_docs", "segment_tfs", "segment_offsets"):
+            os.replace(self._path(f"{name}.tmp.npy"), self._path(f"{name}.npy"))
+        open(self._path("log.bin"), "wb").close()
+
+        self.segment_offsets = np.load(self._path("segment_offsets.npy"), mmap_mode="r")
+        self.segment_docs = np.load(self._path("segment_docs.npy"), mmap_mode="r")
+        self.segment_tfs = np.load(self._path("segment_tfs.npy"), mmap_mode="r")
+        self._segment_stamp = self._segment_file_stamp()
+        self.log = np.zeros((0, 3), dtype=np.uint32)
+        self._read_offsets["log.bin"] = 0
+        self._log_postings = 0
+        self._sorted_log = None
+        self.compactions += 1
+        logger.info(f"🗜️ Compacted resume index: {len(docs)} postings in {time.perf_counter() - started:.2f}s")
+
+    def postings(self, term_id: int, segment_offsets, segment_docs, segment_tfs, log) -> tuple:
+        np = get_numpy()
+
+        docs = []
+        tfs = []
+        if term_id + 1 < len(segment_offsets):
+            start, end = int(segment_offsets[term_id]), int(segment_offsets[term_id + 1])
+            if end > start:
+                docs.append(np.asarray(segment_docs[start:end]))
+                tfs.append(np.asarray(segment_tfs[start:end]))
+        log_terms, log_docs, log_tfs = log
+        start, end = np.searchsorted(log_terms, [term_id, term_id + 1])
+        if end > start:
+            docs.append(log_docs[start:end])
+            tfs.append(log_tfs[start:end])
+        if not docs:
+            return None, None
+        return np.concatenate(docs), np.concatenate(tfs).astype(np.float32)
+
+    def search(self, job_desc: str, top_k: int = 20) -> dict:
+        """BM25 over the whole pool, with the matcher's skill/generic priors on top of corpus IDF"""
+        np = get_numpy()
+
+        if not self._loaded:
+            self.load()
+        started = time.perf_counter()
+        with self._lock:
+            with self._file_lock(exclusive=False):
+                self._refresh()
+            # Snapshot: appends only ever extend these, so scoring can run without the lock
+            self._materialize()
+            documents = len(self.documents)
+            doc_lengths = self.doc_lengths
+            segment = (self.segment_offsets, self.segment_docs, self.segment_tfs)
+            log = self._log_by_term()
+        query = self.matcher.query(job_desc)
+        self.searches += 1
+        if not documents or not query:
+            return {"documents": documents, "results": [], "tookMs": 0.0, "matchedTerms": 0}
+
+        scores = np.zeros(documents, dtype=np.float32)
+        norms = KEYWORD_BM25_K1 * (1.0 - KEYWORD_BM25_B + KEYWORD_BM25_B * doc_lengths / max(float(doc_lengths.mean()), 1.0))
+        matched_terms = 0
+        for term, weight in query.items():
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            docs, tfs = self.postings(term_id, *segment, log)
+            if docs is None:
+                continue
+            matched_terms += 1
+            idf = math.log(1.0 + (documents - len(docs) + 0.5) / (len(docs) + 0.5))
+            # Each document appears at most once per term, so plain fancy-index addition is exact
+            scores[docs] += (weight * idf) * tfs * (KEYWORD_BM25_K1 + 1.0) / (tfs + norms[docs])
+
+        top_k = max(1, min(top_k, documents))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        results = []
+        for rank, doc_id in enumerate(ranked, start=1):
+            if scores[doc_id] <= 0:
+                break
+            # Filenames stay in documents.jsonl: they usually name the candidate
+            sha256, _ = self.documents[doc_id]
+            results.append({
+                "rank": rank,
+                "documentId": int(doc_id),
+                "sha256": sha256,
+                "score": round(float(scores[doc_id]), 4),
+            })
+        return {
+            "documents": documents,
+            "matchedTerms": matched_terms,
+            "results": results,
+            "tookMs": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "enabled": RESUME_INDEX_ENABLED,
+            "documents": len(self.documents),
+            "terms": len(self.vocabulary),
+            "segmentPostings": len(self.segment_docs) if self.segment_docs is not None else 0,
+            "logPostings": self._log_postings,
+            "compactions": self.compactions,
+            "searches": self.searches,
+        }
+
+resume_index = ResumeTermIndex(RESUME_INDEX_DIR, keyword_matcher, RESUME_INDEX_COMPACT_POSTINGS)
+
+async def index_resume_text(sha256: str, filename: Optional[str], text: str):
+    """Add extracted resume text to the term index; indexing problems never fail the request"""
+    if not RESUME_INDEX_ENABLED or not text:
+        return
+    try:
+        await asyncio.to_thread(resume_index.add, sha256, filename, text)
+    except Exception as e:
+        logger.error(f"❌ Failed to index resume: {str(e)}")
+
+REQUIRED_KEYS_COMPREHENSIVE = [
+    "score", "comprehensiveAnalysis", "summaryFeedback", "skillsFeedback",
+    "experienceFeedback", "educationFeedback", "projectFeedback",
+    "jobRoleSuggestions", "overallSuggestions"
+]
+
+REQUIRED_KEYS_JOB = [
+    "score", "summaryFeedback", "skillsFeedback", "experienceFeedback",
+    "educationFeedback", "projectFeedback", "jobRoleSuggestions", "overallSuggestions"
+]
+
+REQUIRED_KEYS_LINKEDIN = [
     "profileStrengthScore", "headlineFeedback", "summaryFeedback",
     "experienceFeedback", "skillsFeedback", "activityFeedback",
     "keywordSuggestions", "overallSuggestions"
@@ -398,41 +3745,139 @@ REQUIRED_KEYS_REPO = [
     "overallSuggestions"
 ]
 
+# Chart fields of the profile response are computed locally; the LLM only writes these
+GITHUB_PROFILE_LLM_FIELDS = ["techStack", "codeQualityInsights", "overallSuggestions"]
+
 def ensure_all_keys(data: dict, required_keys: list):
     for key in required_keys:
         if key not in data or data[key] is None:
             data[key] = "" if key != "score" and key != "profileStrengthScore" else 0.0
     return data
 
+README_NOT_FOUND = "No README file found in the repository."
+README_FALLBACK_NAMES = ["README.md", "readme.md", "README.rst", "README", "readme"]
+
+# Resolved README bodies keyed by owner/repo; None records a confirmed "no README"
+readme_cache = TTLCache(
+    max_entries=env_int("README_CACHE_MAX_ENTRIES", 512),
+    max_bytes=env_int("README_CACHE_MAX_BYTES", 16 * 1024 * 1024),
+    ttl=env_float("README_CACHE_TTL_SECONDS", 600.0),
+)
+README_NEGATIVE_CACHE_TTL = env_float("README_NEGATIVE_CACHE_TTL_SECONDS", 300.0)
+
+def parse_github_repo_url(repo_url: str) -> tuple:
+    """Return (owner, repo) from a repository URL such as https://github.com/owner/repo/tree/main or owner/repo"""
+    url = repo_url.strip().rstrip("/")
+    url = re.sub(r"^(https?://)?(www\.)?github\.com/", "", url, flags=re.IGNORECASE)
+    parts = [part for part in url.split("/") if part]
+    if len(parts) < 2:
+        raise HTTPException(status_code=400, detail="Invalid repository URL")
+    if "://" in repo_url and not re.search(r"github\.com", repo_url, re.IGNORECASE):
+        # Unknown host: keep the original behaviour of using the last two path segments
+        owner, repo = parts[-2], parts[-1]
+    else:
+        owner, repo = parts[0], parts[1]
+    if repo.endswith(".git"):
+        repo = repo[:-4]
+    return owner, repo
+
+async def first_completed_result(coroutines: list):
+    """
+    Run coroutines concurrently and return the first non-None result, cancelling the rest.
+    None means every coroutine returned None; when none produced a result and some raised,
+    the first error is re-raised instead.
+    """
+    tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+    errors = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                result = await next_done
+            except Exception as e:
+                errors.append(e)
+                continue
+            if result is not None:
+                return result
+        if errors:
+            raise errors[0]
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def _probe_raw_readme(owner: str, repo: str, readme_name: str) -> Optional[str]:
+    # HEAD resolves to the repository's default branch, whatever it is called
+    traceparent = current_traceparent()
+    response = await github_http.client.get(
+        f"{GITHUB_RAW_URL}/{owner}/{repo}/HEAD/{readme_name}",
+        headers={"traceparent": traceparent} if traceparent else None,
+    )
+    if response.status_code == 200:
+        logger.info(f"✅ Found README via raw probe: {readme_name}")
+        return response.text
+    if response.status_code == 404:
+        return None
+    # Anything else says nothing about whether the README exists
+    response.raise_for_status()
+    raise httpx.HTTPStatusError(
+        f"Unexpected status {response.status_code}", request=response.request, response=response
+    )
+
 async def fetch_github_readme(repo_url: str) -> str:
-    """Fetch README content from GitHub repository"""
+    """
+    Fetch README content from GitHub repository.
+    Uses the contents API, which resolves the README of the default branch in one request;
+    if the API is unavailable (e.g. rate limited), raw probes run concurrently and the first hit wins.
+    """
     try:
         logger.info(f"📖 Fetching README for: {repo_url}")
-        
-        # Extract owner and repo from URL
-        parts = repo_url.rstrip('/').split('/')
-        if len(parts) < 2:
-            raise HTTPException(status_code=400, detail="Invalid repository URL")
-        
-        owner = parts[-2]
-        repo = parts[-1]
-        
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Try different README variations
-            for readme_name in ["README.md", "readme.md", "README", "readme"]:
-                for branch in ["main", "master"]:
-                    try:
-                        response = await client.get(
-                            f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{readme_name}"
-                        )
-                        if response.status_code == 200:
-                            logger.info(f"✅ Found README: {readme_name} on {branch}")
-                            return response.text
-                    except:
-                        continue
-        
-        logger.info("📝 No README file found")
-        return "No README file found in the repository."
+        owner, repo = parse_github_repo_url(repo_url)
+        cache_key = f"{owner}/{repo}".lower()
+
+        cached = readme_cache.get(cache_key, _MISSING)
+        if cached is not _MISSING:
+            logger.info("⚡ Using cached README lookup")
+            return cached if cached is not None else README_NOT_FOUND
+
+        content = _MISSING
+        try:
+            response = await github_api_get(
+                f"{GITHUB_API_URL}/repos/{owner}/{repo}/readme",
+                headers={**github_api_headers(), "Accept": "application/vnd.github.raw"},
+            )
+            if response.status_code == 200:
+                logger.info("✅ Found README via contents API")
+                content = response.text
+            elif response.status_code == 404:
+                content = None
+            else:
+                if is_github_rate_limited(response):
+                    GITHUB_RATE_LIMITED.inc(request_endpoint.get())
+                logger.warning(f"⚠️ README API returned {response.status_code}, falling back to raw probes")
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ README API request failed ({str(e)}), falling back to raw probes")
+        except HTTPException as e:
+            if e.status_code != 429:
+                raise
+            # Out of API quota: raw.githubusercontent.com does not count against it
+            logger.warning("⚠️ README API quota exhausted, falling back to raw probes")
+
+        if content is _MISSING:
+            # None only when every probe got a 404; a failed probe raises, so an outage or a
+            # spent quota is never remembered as "no README"
+            content = await first_completed_result(
+                [_probe_raw_readme(owner, repo, name) for name in README_FALLBACK_NAMES]
+            )
+
+        if content is None:
+            logger.info("📝 No README file found")
+            readme_cache.set(cache_key, None, size=1, ttl=README_NEGATIVE_CACHE_TTL)
+            return README_NOT_FOUND
+
+        readme_cache.set(cache_key, content, size=len(content))
+        return content
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error fetching README: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch repository README")
@@ -444,9 +3889,52 @@ async def health_check():
     return {
         "status": "healthy", 
         "timestamp": datetime.now().isoformat(),
-        "gemini_configured": bool(GEMINI_API_KEY)
+        "gemini_configured": bool(GEMINI_API_KEY),
+        "ready": service_warmup.ready,
+    }
+
+@app.get("/livez")
+async def liveness_probe():
+    """Liveness: the process is up and its event loop is responding"""
+    return {"status": "alive", "uptimeSeconds": round(time.monotonic() - service_warmup.started_at, 3)}
+
+@app.get("/readyz")
+async def readiness_probe():
+    """Readiness: 200 once warmup has finished, 503 while it is still running or has failed"""
+    return JSONResponse(status_code=200 if service_warmup.ready else 503, content=service_warmup.status())
+
+@app.get("/stats")
+async def service_stats():
+    """Runtime statistics for caches and shared resources"""
+    return {
+        "resultCache": result_cache.stats(),
+        "singleFlight": analysis_flights.stats(),
+        "incrementalAnalysis": {**incremental_stats, "lineages": resume_lineages.stats()},
+        "fanout": {"defaultMode": ANALYSIS_MODE, "model": FANOUT_MODEL, **fanout_stats},
+        "lite": {"fallbackEnabled": LITE_FALLBACK_ENABLED, **lite_stats},
+        "quota": await asyncio.to_thread(quota_governor.stats),
+        "pdfPool": pdf_pool.stats(),
+        "githubClient": github_http.stats(),
+        "githubLanguages": {
+            "byteWeighted": GITHUB_LANGUAGE_BYTES_ENABLED,
+            "cachedRepositories": len(github_language_cache),
+            **github_language_stats,
+        },
+        "llmRouter": gemini_router.stats(),
+        "llmJson": {"structuredOutput": STRUCTURED_OUTPUT_ENABLED, **llm_json_stats},
+        "resumeIndex": resume_index.stats(),
+        "promptBudget": {"budgets": PROMPT_TOKEN_BUDGETS, **prompt_budget_stats},
+        "warmup": service_warmup.status(),
+        "jobs": {**job_workers.stats(), "queue": await asyncio.to_thread(job_store.counts)},
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage latency histograms and event counters in the Prometheus text format (this worker only)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -464,7 +3952,7 @@ async def list_available_models():
         if not GEMINI_API_KEY:
             return {"error": "Gemini API key not configured"}
             
-        models = genai.list_models()
+        models = await asyncio.to_thread(lambda: list(get_genai().list_models()))
         available_models = []
         for model in models:
             if 'generateContent' in model.supported_generation_methods:
@@ -479,309 +3967,1255 @@ async def list_available_models():
         return {"error": "Could not fetch available models", "detail": str(e)}
 
 # API Endpoints
+async def run_job_description_analysis(resume_text: str, job_description: str) -> ResumeAnalysisJobResponse:
+    """Score a resume's extracted text against a job description (LLM score blended with keyword match)"""
+    with stage_timer("keyword_score"):
+        keyword_score = keyword_match_score(resume_text, job_description)
+    
+    # Create prompt for LLM
+    prompt_started = time.perf_counter()
+    prompt = f"""
+    You are an expert ATS (Applicant Tracking System) evaluator and career coach. 
+    Analyze the following resume against the provided job description and give detailed, constructive feedback.
+
+    Scoring guidance:
+    - Use the FULL range from 0 to 100.
+    - Exceptional quality resumes: 90–100.
+    - Strong resumes: 80–89.
+    - Good resumes: 75–79.
+    - Average resumes: 65–74.
+    - Below average resumes: below 65.
+    - Be fair – if a resume is truly outstanding, do not hesitate to score above 90.
+    - Avoid clustering all scores in a narrow range.
+    
+    RESUME TEXT:
+    {budget_document(resume_text, "resume-job-description")}
+
+    JOB DESCRIPTION:
+    {budget_document(job_description, "job-description", kind="text")}
+
+    Return the result in EXACTLY this JSON format (keep the same keys as shown):
+    {{
+        "score": <number between 0-100>,
+        "summaryFeedback": "<feedback on the summary/objective>",
+        "skillsFeedback": "<feedback on skills alignment with job requirements>",
+        "experienceFeedback": "<feedback on work experience relevance>",
+        "educationFeedback": "<feedback on education background>",
+        "projectFeedback": "<feedback on projects and achievements>",
+        "jobRoleSuggestions": "<suggestions for better job role positioning>",
+        "overallSuggestions": "<overall recommendations for improvement>"
+    }}
+    IMPORTANT: 
+    - The score must be a raw number between 0 and 100 (integer or float) without a percent sign.
+    - If the resume is a perfect match for the job description, do not hesitate to score above 90.
+    """
+    record_stage("prompt_build", prompt_started)
+    
+    # Get response from Gemini
+    response_data = await generate_json(prompt, ResumeAnalysisJobResponse)
+
+    # Ensure all required keys are present
+    response_data = ensure_all_keys(response_data, REQUIRED_KEYS_JOB) 
+    response_data = ensure_string_values(response_data)       
+    base_score = normalize_score(response_data["score"])
+    boosted_score = (base_score * 0.85) + (keyword_score * 0.15)
+    response_data["score"] = round(boosted_score, 2)
+
+    with stage_timer("validation"):
+        return ResumeAnalysisJobResponse(**response_data)
+
 @app.post("/api/resume-analyzer/job-description", response_model=ResumeAnalysisJobResponse)
 async def analyze_resume_job_description(
     resume: UploadFile = File(...),
-    jobDescription: str = Form(...)
+    jobDescription: str = Form(...),
+    mode: Optional[str] = Form(None),
 ):
-    """Analyze resume against a specific job description"""
+    """Analyze resume against a specific job description (`mode=lite` for the rule-based check)"""
     try:
         logger.info("📊 Starting resume analysis with job description")
+        mode = resolve_analysis_mode(mode, JOB_DESCRIPTION_MODES)
         
         # Extract text from resume PDF
-        resume_content = await resume.read()
-        resume_text = extract_text_from_pdf(resume_content)
-        
-        keyword_score = keyword_match_score(resume_text, jobDescription)
+        upload = await spool_upload(resume)
+        try:
+            cache_key = result_cache.make_key(
+                "resume-job-description", upload.sha256, normalize_text_input(jobDescription)
+            )
+            cached = await result_cache.get(cache_key) if mode != "lite" else None
+            if cached is not None:
+                logger.info("⚡ Returning cached resume analysis")
+                return ResumeAnalysisJobResponse(**cached)
+
+            resume_text = await pdf_pool.extract(upload.source)
+            await index_resume_text(upload.sha256, resume.filename, resume_text)
+        finally:
+            upload.cleanup()
         
-        # Create prompt for LLM
-        prompt = f"""
-        You are an expert ATS (Applicant Tracking System) evaluator and career coach. 
-        Analyze the following resume against the provided job description and give detailed, constructive feedback.
-
-        Scoring guidance:
-        - Use the FULL range from 0 to 100.
-        - Exceptional quality resumes: 90–100.
-        - Strong resumes: 80–89.
-        - Good resumes: 75–79.
-        - Average resumes: 65–74.
-        - Below average resumes: below 65.
-        - Be fair – if a resume is truly outstanding, do not hesitate to score above 90.
-        - Avoid clustering all scores in a narrow range.
+        if mode == "lite":
+            return lite_job_description_analysis(resume_text, jobDescription)
+        result = await analysis_or_lite_fallback(
+            cache_key,
+            lambda: run_job_description_analysis(resume_text, jobDescription),
+            lambda analysis_mode: lite_job_description_analysis(resume_text, jobDescription, analysis_mode),
+        )
+        logger.info("✅ Resume analysis completed successfully")
+        return result
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error in resume analysis (job description): {str(e)}")
+        raise HTTPException(status_code=500, detail="Error processing your request")
+
+BATCH_MAX_ITEMS = env_int("BATCH_MAX_ITEMS", 2000)
+BATCH_MAX_CONCURRENCY = env_int("BATCH_MAX_CONCURRENCY", 8)
+BATCH_MAX_ARCHIVE_BYTES = env_int("BATCH_MAX_ARCHIVE_BYTES", 512 * 1024 * 1024)
+BATCH_EXTRACT_RETRIES = 3
+
+class ResumeSearchRequest(BaseModel):
+    jobDescription: str
+    topK: int = 20
+
+@app.post("/api/resume-index/search")
+async def search_resume_index(request: ResumeSearchRequest, x_api_key: Optional[str] = Header(None)):
+    """Rank every indexed resume against a job description (keyword BM25, no LLM call)"""
+    try:
+        if not RESUME_INDEX_ENABLED:
+            raise HTTPException(status_code=404, detail="Resume index is disabled")
+        if RESUME_SEARCH_API_KEY and not secrets.compare_digest(
+            (x_api_key or "").encode(), RESUME_SEARCH_API_KEY.encode()
+        ):
+            raise HTTPException(status_code=401, detail="Invalid or missing API key")
+        if not request.jobDescription.strip():
+            raise HTTPException(status_code=400, detail="Job description is empty")
+        top_k = max(1, min(request.topK, RESUME_SEARCH_MAX_TOP_K))
+        result = await asyncio.to_thread(resume_index.search, request.jobDescription, top_k)
+        logger.info(f"🔎 Ranked {result['documents']} indexed resumes in {result['tookMs']}ms")
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error searching resume index: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error processing your request")
+
+class BatchItem:
+    """One resume of a batch: either an already spooled upload or a member of a spooled zip archive"""
+
+    def __init__(
+        self,
+        index: int,
+        filename: str,
+        upload: Optional[SpooledUpload] = None,
+        archive: Optional[zipfile.ZipFile] = None,
+        member: Optional[zipfile.ZipInfo] = None,
+    ):
+        self.index = index
+        self.filename = filename
+        self.upload = upload
+        self.archive = archive
+        self.member = member
+
+    async def load(self) -> SpooledUpload:
+        if self.upload is None:
+            self.upload = await asyncio.to_thread(spool_zip_member, self.archive, self.member)
+        return self.upload
+
+    def cleanup(self):
+        if self.upload is not None:
+            self.upload.cleanup()
+
+async def extract_with_backoff(source: Union[bytes, str]) -> str:
+    """Batch items wait out a full extraction queue instead of failing with 503"""
+    for attempt in range(BATCH_EXTRACT_RETRIES):
+        try:
+            return await pdf_pool.extract(source)
+        except HTTPException as e:
+            if e.status_code != 503 or attempt == BATCH_EXTRACT_RETRIES - 1:
+                raise
+            await asyncio.sleep(pdf_pool.retry_after)
+
+async def analyze_batch_item(item: BatchItem, job_description: str, mode: str = "monolithic") -> ResumeAnalysisJobResponse:
+    upload = await item.load()
+    try:
+        cache_key = result_cache.make_key("resume-job-description", upload.sha256, normalize_text_input(job_description))
+        cached = await result_cache.get(cache_key) if mode != "lite" else None
+        if cached is not None:
+            return ResumeAnalysisJobResponse(**cached)
+        resume_text = await extract_with_backoff(upload.source)
+        await index_resume_text(upload.sha256, item.filename, resume_text)
+    finally:
+        item.cleanup()
+    if mode == "lite":
+        return lite_job_description_analysis(resume_text, job_description)
+    return await analysis_or_lite_fallback(
+        cache_key,
+        lambda: run_job_description_analysis(resume_text, job_description),
+        lambda analysis_mode: lite_job_description_analysis(resume_text, job_description, analysis_mode),
+    )
+
+def ndjson_line(payload: dict) -> bytes:
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+@app.post("/api/resume-analyzer/batch")
+async def screen_resumes_batch(
+    jobDescription: str = Form(...),
+    resumes: List[UploadFile] = File(default=[]),
+    archive: Optional[UploadFile] = File(None),
+    mode: Optional[str] = Form(None),
+):
+    """
+    Screen many resumes (PDF uploads and/or a zip of PDFs) against one job description.
+    Streams NDJSON: one "result" or "error" line per resume as it completes (with its rank so far),
+    then a "summary" line with the final ranking by blended score. `mode=lite` pre-screens
+    without the LLM.
+    """
+    items = []
+    archive_upload = None
+    zip_file = None
+    try:
+        logger.info("📚 Starting batch resume screening")
+        mode = resolve_analysis_mode(mode, JOB_DESCRIPTION_MODES)
+        # Copy uploads to our own spool files now: the request's form files are closed once streaming starts
+        for upload_file in resumes:
+            if len(items) >= BATCH_MAX_ITEMS:
+                raise HTTPException(status_code=413, detail=f"A batch may contain at most {BATCH_MAX_ITEMS} resumes")
+            upload = await spool_upload(upload_file, spool_threshold=0)
+            items.append(BatchItem(len(items), upload_file.filename or f"resume-{len(items) + 1}.pdf", upload=upload))
+
+        if archive is not None:
+            archive_upload = await spool_upload(archive, max_bytes=BATCH_MAX_ARCHIVE_BYTES, spool_threshold=0)
+            try:
+                zip_file = zipfile.ZipFile(archive_upload.path)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail="Archive is not a valid zip file")
+            for info in zip_file.infolist():
+                name = info.filename
+                if info.is_dir() or not name.lower().endswith(".pdf") or name.startswith("__MACOSX/"):
+                    continue
+                if len(items) >= BATCH_MAX_ITEMS:
+                    raise HTTPException(status_code=413, detail=f"A batch may contain at most {BATCH_MAX_ITEMS} resumes")
+                items.append(BatchItem(len(items), name, archive=zip_file, member=info))
+
+        if not items:
+            raise HTTPException(status_code=400, detail="No PDF resumes were provided")
+    except BaseException:
+        for item in items:
+            item.cleanup()
+        if zip_file is not None:
+            zip_file.close()
+        if archive_upload is not None:
+            archive_upload.cleanup()
+        raise
+
+    logger.info(f"📚 Screening {len(items)} resumes with concurrency {BATCH_MAX_CONCURRENCY}")
+
+    async def stream_results():
+        completed = asyncio.Queue()
+        semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+        async def process(item: BatchItem):
+            async with semaphore:
+                try:
+                    result = await analyze_batch_item(item, jobDescription, mode)
+                    await completed.put((item, result, None))
+                except HTTPException as e:
+                    await completed.put((item, None, e.detail))
+                except Exception as e:
+                    logger.error(f"❌ Batch item {item.filename} failed: {str(e)}")
+                    await completed.put((item, None, "Error processing this resume"))
+
+        tasks = [asyncio.create_task(process(item)) for item in items]
+        scores = []
+        failed = 0
+        try:
+            for _ in range(len(items)):
+                item, result, error = await completed.get()
+                if error is not None:
+                    failed += 1
+                    yield ndjson_line({"type": "error", "index": item.index, "filename": item.filename, "detail": error})
+                    continue
+                scores.append((result.score, item.index, item.filename))
+                rank = 1 + sum(1 for score, _, _ in scores if score > result.score)
+                yield ndjson_line({
+                    "type": "result",
+                    "index": item.index,
+                    "filename": item.filename,
+                    "score": result.score,
+                    "rankSoFar": rank,
+                    "analysis": result.model_dump(),
+                })
+
+            scores.sort(key=lambda entry: (-entry[0], entry[1]))
+            # Headers are long gone by now, so the batch reports its savings in the summary line
+            budget_report = prompt_budget_report.get()
+            yield ndjson_line({
+                "type": "summary",
+                "total": len(items),
+                "succeeded": len(scores),
+                "failed": failed,
+                "promptTokensSaved": budget_report["saved"] if budget_report else 0,
+                "ranking": [
+                    {"rank": rank, "index": index, "filename": filename, "score": score}
+                    for rank, (score, index, filename) in enumerate(scores, start=1)
+                ],
+            })
+            logger.info(f"✅ Batch screening completed ({len(scores)} succeeded, {failed} failed)")
+        finally:
+            # Client disconnects cancel the outstanding work
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for item in items:
+                item.cleanup()
+            if zip_file is not None:
+                zip_file.close()
+            if archive_upload is not None:
+                archive_upload.cleanup()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+def comprehensive_analysis_prompt(resume_text: str) -> str:
+    prompt_started = time.perf_counter()
+    prompt = f"""
+    You are an expert ATS (Applicant Tracking System) evaluator and career coach. 
+    Analyze the resume carefully and give constructive, actionable feedback.
+
+    Scoring guidance:
+    - Use the FULL range from 0 to 100.
+    - Exceptional quality resumes: 90–100.
+    - Strong resumes: 80–89.
+    - Good resumes: 75–79.
+    - Average resumes: 65–74.
+    - Below average resumes: below 65.
+    - Be fair – if a resume is truly outstanding, do not hesitate to score above 90.
+    - Avoid clustering all scores in a narrow range.
+
+    RESUME TEXT:
+    {budget_document(resume_text, "resume-comprehensive")}
+
+    Return the result in EXACTLY this JSON format (keys and structure must match exactly):
+    {{
+        "score": <number between 0-100>,
+        "comprehensiveAnalysis": "<detailed overall analysis of the resume>",
+        "summaryFeedback": "<feedback on the summary/objective>",
+        "skillsFeedback": "<feedback on skills relevance and presentation>",
+        "experienceFeedback": "<feedback on work experience relevance and impact>",
+        "educationFeedback": "<feedback on education background>",
+        "projectFeedback": "<feedback on projects and achievements>",
+        "jobRoleSuggestions": "<suggestions for better job role positioning>",
+        "overallSuggestions": "<overall recommendations for improvement>"
+    }}
+    IMPORTANT:
+    - The score must be a raw number between 0 and 100 (integer or float) without a percent sign.
+    """
+    record_stage("prompt_build", prompt_started)
+    return prompt
+
+async def run_comprehensive_analysis(resume_text: str, mode: str = "monolithic") -> ResumeAnalysisComprehensiveResponse:
+    """Comprehensive, job-independent analysis of a resume's extracted text"""
+    if mode == "fanout":
+        response_data = await fanout_json("resume-comprehensive", resume_text, ResumeAnalysisComprehensiveResponse)
+    else:
+        prompt = comprehensive_analysis_prompt(resume_text)
+
+        # Get response from Gemini
+        response_data = await generate_json(prompt, ResumeAnalysisComprehensiveResponse)
+
+    # Ensure all required keys are present
+    response_data = ensure_all_keys(response_data, REQUIRED_KEYS_COMPREHENSIVE)
+    response_data = ensure_string_values(response_data)
+    response_data["score"] = normalize_score(response_data["score"])
+    
+    with stage_timer("validation"):
+        return ResumeAnalysisComprehensiveResponse(**response_data)
+
+# Resume sections whose feedback field can be refreshed on its own; all other text is grouped as "other"
+RESUME_SECTION_FEEDBACK_FIELDS = {
+    "summary": "summaryFeedback",
+    "skills": "skillsFeedback",
+    "experience": "experienceFeedback",
+    "education": "educationFeedback",
+    "projects": "projectFeedback",
+}
+RESUME_INCREMENTAL_ENABLED = env_bool("RESUME_INCREMENTAL_ENABLED", True)
+RESUME_INCREMENTAL_MAX_CHANGE_RATIO = env_float("RESUME_INCREMENTAL_MAX_CHANGE_RATIO", 0.5)
+RESUME_INCREMENTAL_MAX_CHAIN = env_int("RESUME_INCREMENTAL_MAX_CHAIN", 5)
+LINEAGE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{8,128}$")
+RESUME_SECTIONS_ANALYZED = metrics.counter(
+    "careerai_resume_sections_total", "Resume sections per comprehensive analysis by outcome", ("outcome",)
+)
+
+# Section fingerprints and the last result of each revision chain (lineage), per lineage id
+resume_lineages = ResultCache(
+    ttl=env_float("RESUME_LINEAGE_TTL_SECONDS", 7 * 24 * 3600),
+    max_entries=env_int("RESUME_LINEAGE_MAX_ENTRIES", 4096),
+    max_bytes=env_int("RESUME_LINEAGE_MAX_BYTES", 32 * 1024 * 1024),
+    db_path=os.getenv("RESUME_LINEAGE_DB_PATH"),
+    enabled=RESUME_INCREMENTAL_ENABLED,
+)
+incremental_stats = {"full": 0, "incremental": 0, "reused": 0, "sectionsReanalyzed": 0, "sectionsReused": 0}
+
+def resume_section_parts(resume_text: str):
+    """(feedback section, heading, body) for each titled part of a resume"""
+    for title, body, _ in split_resume_sections(compact_whitespace(resume_text)):
+        heading = resume_heading(title) if title else None
+        yield heading[0] if heading and heading[0] in RESUME_SECTION_FEEDBACK_FIELDS else "other", title, body
+
+def resume_section_texts(resume_text: str) -> dict:
+    """Group a resume's text by the feedback section it belongs to"""
+    grouped = {}
+    for section, title, body in resume_section_parts(resume_text):
+        grouped.setdefault(section, []).append(f"{title}\n{body}" if title else body)
+    return {section: "\n".join(parts) for section, parts in grouped.items()}
+
+def section_fingerprint(text: str) -> str:
+    return hashlib.sha256(normalize_text_input(text).encode("utf-8")).hexdigest()[:32]
+
+def plan_incremental_analysis(lineage: Optional[dict], sections: dict) -> Optional[list]:
+    """
+    Sections that changed since the lineage's last revision, or None when a full analysis is
+    due: no usable lineage, a changed prompt, too many revisions in a row, or so much changed
+    text that re-analyzing it piecemeal would not save anything.
+    """
+    if not lineage or lineage.get("version") != PROMPT_TEMPLATE_VERSIONS["resume-comprehensive"]:
+        return None
+    if lineage.get("chain", 0) >= RESUME_INCREMENTAL_MAX_CHAIN:
+        return None
+    previous = lineage["fingerprints"]
+    changed = sorted(
+        name for name in set(previous) | set(sections)
+        if previous.get(name) != section_fingerprint(sections.get(name, ""))
+    )
+    total_tokens = sum(estimate_tokens(text) for text in sections.values())
+    changed_tokens = sum(estimate_tokens(sections.get(name, "")) for name in changed)
+    if not total_tokens or changed_tokens > total_tokens * RESUME_INCREMENTAL_MAX_CHANGE_RATIO:
+        return None
+    return changed
+
+def incremental_analysis_fields(changed: list) -> list:
+    # The overall narrative goes with the score: kept as it was, it would describe the earlier revision
+    return [
+        "score",
+        "comprehensiveAnalysis",
+        *[RESUME_SECTION_FEEDBACK_FIELDS[name] for name in changed if name in RESUME_SECTION_FEEDBACK_FIELDS],
+        "overallSuggestions",
+    ]
+
+def incremental_analysis_prompt(sections: dict, changed: list, previous: dict) -> str:
+    prompt_started = time.perf_counter()
+    revised_text = "\n\n".join(
+        f"=== {name.upper()} ===\n{sections.get(name) or '(section removed)'}" for name in changed
+    )
+    earlier_feedback = "\n".join(
+        f"- {field}: {previous.get(field, '')}"
+        for field in incremental_analysis_fields(changed)
+        if field != "score"
+    )
+    output_fields = ",\n        ".join(
+        '"score": <number between 0-100>' if field == "score" else f'"{field}": "<updated feedback>"'
+        for field in incremental_analysis_fields(changed)
+    )
+    prompt = f"""
+    You are an expert ATS (Applicant Tracking System) evaluator and career coach.
+    You already reviewed an earlier version of this resume and scored it {previous.get("score", 0)}/100.
+    The candidate has since revised only the sections below; everything else is unchanged.
+
+    YOUR EARLIER FEEDBACK:
+    {earlier_feedback}
+
+    REVISED SECTIONS:
+    {budget_document(revised_text, "resume-comprehensive")}
+
+    Re-evaluate the revised sections and return the updated overall score on the same
+    scale as your earlier score: move it only as far as the revision warrants, and keep
+    it unchanged if the revision makes no real difference. Rewrite comprehensiveAnalysis
+    so it describes the resume as it is now, including the revised and removed sections.
+
+    Return the result in EXACTLY this JSON format (keys and structure must match exactly):
+    {{
+        {output_fields}
+    }}
+    IMPORTANT:
+    - The score must be a raw number between 0 and 100 (integer or float) without a percent sign.
+    """
+    record_stage("prompt_build", prompt_started)
+    return prompt
+
+async def run_incremental_comprehensive_analysis(sections: dict, changed: list, previous: dict) -> ResumeAnalysisComprehensiveResponse:
+    """Re-analyze only the changed sections and merge the answer into the previous result"""
+    response_data = dict(previous)
+    if changed:
+        fields = incremental_analysis_fields(changed)
+        updates = await generate_json(incremental_analysis_prompt(sections, changed, previous), ResumeAnalysisComprehensiveResponse, fields=fields)
+        updates = ensure_string_values(ensure_all_keys({key: updates.get(key) for key in fields}, fields))
+        response_data.update(updates)
+        # The earlier score was already normalized and the model answers on that scale
+        try:
+            response_data["score"] = min(100.0, max(0.0, float(updates["score"])))
+        except (ValueError, TypeError):
+            response_data["score"] = previous.get("score", 0.0)
+
+    with stage_timer("validation"):
+        return ResumeAnalysisComprehensiveResponse(**response_data)
+
+# "monolithic" asks one model call for every field; "fanout" runs per-section sub-analyses
+# concurrently; "lite" is the rule-based analysis without any model call
+ANALYSIS_MODES = ("monolithic", "fanout", "lite")
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "monolithic").strip().lower()
+if ANALYSIS_MODE not in ANALYSIS_MODES:
+    logger.warning(f"⚠️ Unknown ANALYSIS_MODE {ANALYSIS_MODE!r}, using monolithic")
+    ANALYSIS_MODE = "monolithic"
+# Job-description screening is a single short answer, so it has no fan-out mode
+JOB_DESCRIPTION_MODES = ("monolithic", "lite")
+FANOUT_MODEL = os.getenv("LLM_FANOUT_MODEL", "gemini-2.5-flash").strip()
+FANOUT_PART_FAILURES = metrics.counter(
+    "careerai_fanout_part_failures_total", "Fan-out sub-analyses that failed", ("endpoint", "part")
+)
+fanout_stats = {"analyses": 0, "partial": 0, "partFailures": 0}
+
+# Fan-out sub-analyses per endpoint: (part, sections it reads or None for the whole document, fields it writes)
+FANOUT_PLANS = {
+    "resume-comprehensive": {
+        "role": "You are an expert ATS (Applicant Tracking System) evaluator and career coach.",
+        "document": "resume",
+        "scoreField": "score",
+        "scoring": (
+            "Score the whole resume using the FULL range from 0 to 100: exceptional 90–100, strong 80–89, "
+            "good 75–79, average 65–74, below average under 65. Avoid clustering scores in a narrow range."
+        ),
+        "fields": {
+            "score": "<number between 0-100>",
+            "comprehensiveAnalysis": "<detailed overall analysis of the resume>",
+            "summaryFeedback": "<feedback on the summary/objective>",
+            "skillsFeedback": "<feedback on skills relevance and presentation>",
+            "experienceFeedback": "<feedback on work experience relevance and impact>",
+            "educationFeedback": "<feedback on education background>",
+            "projectFeedback": "<feedback on projects and achievements>",
+            "jobRoleSuggestions": "<suggestions for better job role positioning>",
+            "overallSuggestions": "<overall recommendations for improvement>",
+        },
+        "parts": [
+            ("summary", ("summary", "other"), ["summaryFeedback"]),
+            ("skills", ("skills",), ["skillsFeedback"]),
+            ("experience", ("experience",), ["experienceFeedback"]),
+            ("education", ("education",), ["educationFeedback"]),
+            ("projects", ("projects",), ["projectFeedback"]),
+            ("overview", None, ["score", "comprehensiveAnalysis"]),
+            ("positioning", None, ["jobRoleSuggestions", "overallSuggestions"]),
+        ],
+    },
+    "linkedin-optimizer": {
+        "role": "You are a LinkedIn branding expert and career coach.",
+        "document": "LinkedIn profile",
+        "scoreField": "profileStrengthScore",
+        "scoring": (
+            "Score the whole profile using the FULL range from 0 to 100: exceptional 90–100, strong 80–89, "
+            "good 75–79, average 65–74, weak below 65. Reward excellence and penalize weak points."
+        ),
+        "fields": {
+            "profileStrengthScore": "<number between 0-100>",
+            "headlineFeedback": "<feedback on profile headline optimization>",
+            "summaryFeedback": "<feedback on profile summary/about section>",
+            "experienceFeedback": "<feedback on experience section descriptions>",
+            "skillsFeedback": "<feedback on skills section and endorsements>",
+            "activityFeedback": "<feedback on posts, articles, and engagement>",
+            "keywordSuggestions": "<comma-separated keywords to include for SEO>",
+            "overallSuggestions": "<overall recommendations for profile optimization>",
+        },
+        "parts": [
+            ("headline", ("other", "summary"), ["headlineFeedback", "summaryFeedback"]),
+            ("experience", ("experience",), ["experienceFeedback"]),
+            ("skills", ("skills",), ["skillsFeedback", "keywordSuggestions"]),
+            ("overview", None, ["profileStrengthScore", "activityFeedback", "overallSuggestions"]),
+        ],
+    },
+}
+
+def resolve_analysis_mode(mode: Optional[str], supported: tuple = ANALYSIS_MODES) -> str:
+    """The requested mode, or the configured default when none was asked for (if the endpoint supports it)"""
+    if not mode:
+        return ANALYSIS_MODE if ANALYSIS_MODE in supported else "monolithic"
+    mode = mode.strip().lower()
+    if mode not in supported:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(supported)}")
+    return mode
+
+def document_analysis_key(endpoint: str, sha256: str, mode: str) -> str:
+    """Result-cache and single-flight key of a document analysis; fan-out results are kept apart from monolithic ones"""
+    if mode == "fanout":
+        return result_cache.make_key(endpoint, sha256, mode)
+    return result_cache.make_key(endpoint, sha256)
+
+def fanout_part_prompt(endpoint: str, part: str, text: str, whole_document: bool, fields: list) -> str:
+    prompt_started = time.perf_counter()
+    plan = FANOUT_PLANS[endpoint]
+    score_field = plan["scoreField"]
+    if whole_document:
+        focus = f"Evaluate the {plan['document']} below"
+    else:
+        focus = f"Evaluate only the {part} section of a {plan['document']}, shown below,"
+    output_fields = ",\n        ".join(
+        f'"{field}": {plan["fields"][field]}' if field == score_field else f'"{field}": "{plan["fields"][field]}"'
+        for field in fields
+    )
+    scoring = f"\n    {plan['scoring']}\n" if score_field in fields else ""
+    prompt = f"""
+    {plan["role"]}
+    {focus} and give constructive, actionable feedback.
+    {scoring}
+    {plan["document"].upper()} TEXT:
+    {budget_document(text, endpoint)}
+
+    Return the result in EXACTLY this JSON format (keys and structure must match exactly):
+    {{
+        {output_fields}
+    }}
+    """
+    if score_field in fields:
+        prompt += f"""IMPORTANT:
+    - {score_field} must be a raw number between 0 and 100 (integer or float) without a percent sign.
+    """
+    record_stage("prompt_build", prompt_started)
+    return prompt
+
+async def fanout_json(endpoint: str, document_text: str, model_cls) -> dict:
+    """
+    Run an endpoint's sub-analyses concurrently on the fan-out model and merge their fields.
+    Output length, and with it latency, is bounded by the largest part instead of the sum. A
+    failed part only replaces its own fields with FANOUT_SECTION_UNAVAILABLE; the analysis
+    fails only when the part writing the score does, and then the other parts are cancelled.
+    """
+    plan = FANOUT_PLANS[endpoint]
+    sections = resume_section_texts(document_text)
+
+    async def run_part(part: str, section_names: Optional[tuple], fields: list) -> dict:
+        text = "\n".join(sections[name] for name in section_names or () if name in sections)
+        # A section that is missing or under an unrecognized heading is looked for in the whole document
+        whole_document = not text.strip()
+        prompt = fanout_part_prompt(endpoint, part, document_text if whole_document else text, whole_document, fields)
+        return await generate_json(prompt, model_cls, fields=fields, prefer=FANOUT_MODEL)
+
+    fanout_stats["analyses"] += 1
+    tasks = {asyncio.create_task(run_part(*part)): part for part in plan["parts"]}
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None and plan["scoreField"] in tasks[task][2]:
+                    raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    merged = {}
+    failed = 0
+    for task, (part, _, fields) in tasks.items():
+        if task.exception() is not None:
+            failed += 1
+            FANOUT_PART_FAILURES.inc(endpoint, part)
+            logger.warning(f"⚠️ Fan-out part {part} failed, returning the other sections: {str(task.exception())}")
+            merged.update({field: FANOUT_SECTION_UNAVAILABLE for field in fields})
+        else:
+            merged.update({field: task.result().get(field) for field in fields})
+    if failed:
+        fanout_stats["partial"] += 1
+        fanout_stats["partFailures"] += failed
+    return merged
+
+@app.post("/api/resume-analyzer/comprehensive", response_model=ResumeAnalysisComprehensiveResponse)
+async def analyze_resume_comprehensive(
+    response: Response,
+    resume: UploadFile = File(...),
+    lineageId: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
+):
+    """
+    Provide comprehensive analysis of resume without specific job description.
+    Pass the X-Resume-Lineage header of a previous analysis as `lineageId` when uploading a
+    revision: only the sections that changed are re-analyzed. `mode=fanout` analyzes the
+    sections in parallel sub-prompts, `mode=lite` runs the rule-based check only.
+    """
+    try:
+        logger.info("📊 Starting comprehensive resume analysis")
+        mode = resolve_analysis_mode(mode)
+        lineage_id = lineageId if RESUME_INCREMENTAL_ENABLED and lineageId and LINEAGE_ID_PATTERN.match(lineageId) else None
         
-        RESUME TEXT:
-        {resume_text}
+        # Extract text from resume PDF
+        upload = await spool_upload(resume)
+        try:
+            cache_key = document_analysis_key("resume-comprehensive", upload.sha256, mode)
+            cached = await result_cache.get(cache_key) if mode != "lite" else None
+            if cached is not None and lineage_id is None:
+                logger.info("⚡ Returning cached comprehensive resume analysis")
+                return ResumeAnalysisComprehensiveResponse(**cached)
+
+            resume_text = await pdf_pool.extract(upload.source)
+            if cached is None:
+                await index_resume_text(upload.sha256, resume.filename, resume_text)
+        finally:
+            upload.cleanup()
+
+        if mode == "lite":
+            return lite_comprehensive_analysis(resume_text)
+        lite_fallback = lambda analysis_mode: lite_comprehensive_analysis(resume_text, analysis_mode)
+        sections = resume_section_texts(resume_text)
+        lineage = await resume_lineages.get(f"resume-lineage:{lineage_id}") if lineage_id else None
+        changed = plan_incremental_analysis(lineage, sections)
+        chain = 0
+        if cached is not None:
+            logger.info("⚡ Returning cached comprehensive resume analysis")
+            result = ResumeAnalysisComprehensiveResponse(**cached)
+        elif changed is None:
+            incremental_stats["full"] += 1
+            result = await analysis_or_lite_fallback(
+                cache_key, lambda: run_comprehensive_analysis(resume_text, mode), lite_fallback
+            )
+        else:
+            chain = lineage.get("chain", 0) + (1 if changed else 0)
+            reused = sum(1 for name in sections if name not in changed)
+            incremental_stats["incremental" if changed else "reused"] += 1
+            incremental_stats["sectionsReanalyzed"] += len(changed)
+            incremental_stats["sectionsReused"] += reused
+            RESUME_SECTIONS_ANALYZED.inc("reanalyzed", amount=len(changed))
+            RESUME_SECTIONS_ANALYZED.inc("reused", amount=reused)
+            logger.info(f"♻️ Re-analyzing {len(changed)} changed resume section(s): {', '.join(changed) or 'none'}")
+            # The result depends on the lineage, so it neither joins nor fills the document's cache entry
+            result = await analysis_or_lite_fallback(
+                f"{cache_key}|lineage:{lineage_id}",
+                lambda: run_incremental_comprehensive_analysis(sections, changed, lineage["result"]),
+                lite_fallback,
+                cache_result=False,
+            )
+
+        if RESUME_INCREMENTAL_ENABLED and result.analysisMode == "llm" and not is_partial_result(result):
+            lineage_id = lineage_id or secrets.token_urlsafe(16)
+            await resume_lineages.set(f"resume-lineage:{lineage_id}", {
+                "version": PROMPT_TEMPLATE_VERSIONS["resume-comprehensive"],
+                "fingerprints": {name: section_fingerprint(text) for name, text in sections.items()},
+                "result": result.model_dump(),
+                "chain": chain,
+            })
+            response.headers["X-Resume-Lineage"] = lineage_id
+        logger.info("✅ Comprehensive resume analysis completed successfully")
+        return result
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error in comprehensive resume analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error processing your request")
+
+def comprehensive_field_value(key: str, value):
+    """Normalize one streamed field the same way the full response is normalized"""
+    if key == "score":
+        return normalize_score(value)
+    return ensure_string_values({key: value})[key]
+
+async def stream_comprehensive_analysis(prompt: str, cache_key: str):
+    """
+    SSE events for a comprehensive analysis: one `field` event per top-level field as soon as
+    the model has finished writing it, then `complete` with the validated response.
+    """
+    parser = IncrementalJSONFieldParser()
+    response_text = ""
+    raw_fields = {}
+    sent = {}
+    try:
+        if not GEMINI_API_KEY:
+            raise HTTPException(status_code=500, detail="Gemini API key not configured")
+        generation_config = None
+        if STRUCTURED_OUTPUT_ENABLED:
+            generation_config = {
+                "response_mime_type": "application/json",
+                "response_schema": gemini_response_schema(ResumeAnalysisComprehensiveResponse),
+            }
+
+        async for chunk in gemini_router.stream(prompt, generation_config=generation_config):
+            response_text += chunk
+            try:
+                fields = parser.feed(chunk)
+            except ValueError:
+                # Not parseable incrementally; the complete text still goes through the legacy cleanup below
+                fields = []
+            for key, value in fields:
+                if key in ResumeAnalysisComprehensiveResponse.model_fields and key not in sent:
+                    raw_fields[key] = value
+                    sent[key] = comprehensive_field_value(key, value)
+                    yield sse_event("field", {"field": key, "value": sent[key]})
+
+        if not parser.done:
+            llm_json_stats["structuredFallbacks" if STRUCTURED_OUTPUT_ENABLED else "legacyParses"] += 1
+            if STRUCTURED_OUTPUT_ENABLED:
+                STRUCTURED_OUTPUT_FALLBACKS.inc(request_endpoint.get())
+            response_data = await extract_clean_json(response_text)
+        else:
+            response_data = dict(raw_fields)
+            if STRUCTURED_OUTPUT_ENABLED:
+                llm_json_stats["structuredDirect"] += 1
+            else:
+                llm_json_stats["legacyParses"] += 1
+
+        response_data = ensure_all_keys(response_data, REQUIRED_KEYS_COMPREHENSIVE)
+        response_data = ensure_string_values(response_data)
+        response_data["score"] = normalize_score(response_data["score"])
+        for key, value in response_data.items():
+            # Fields recovered only by the fallback path (or filled with defaults) still get their event
+            if key not in sent:
+                yield sse_event("field", {"field": key, "value": value})
+
+        with stage_timer("validation"):
+            result = ResumeAnalysisComprehensiveResponse(**response_data)
+        await result_cache.set(cache_key, result.model_dump())
+        logger.info("✅ Streamed comprehensive resume analysis completed successfully")
+        yield sse_event("complete", result.model_dump())
+    except HTTPException as e:
+        yield sse_event("error", {"status": e.status_code, "detail": e.detail})
+    except Exception as e:
+        logger.error(f"❌ Error in streamed comprehensive resume analysis: {str(e)}")
+        yield sse_event("error", {"status": 500, "detail": "Error processing your request"})
 
-        JOB DESCRIPTION:
-        {jobDescription}
+@app.post("/api/resume-analyzer/comprehensive/stream")
+async def analyze_resume_comprehensive_stream(resume: UploadFile = File(...)):
+    """Comprehensive resume analysis streamed as Server-Sent Events, one event per section"""
+    try:
+        logger.info("📊 Starting streamed comprehensive resume analysis")
 
-        Return the result in EXACTLY this JSON format (keep the same keys as shown):
-        {{
-            "score": <number between 0-100>,
-            "summaryFeedback": "<feedback on the summary/objective>",
-            "skillsFeedback": "<feedback on skills alignment with job requirements>",
-            "experienceFeedback": "<feedback on work experience relevance>",
-            "educationFeedback": "<feedback on education background>",
-            "projectFeedback": "<feedback on projects and achievements>",
-            "jobRoleSuggestions": "<suggestions for better job role positioning>",
-            "overallSuggestions": "<overall recommendations for improvement>"
-        }}
-        IMPORTANT: 
-        - The score must be a raw number between 0 and 100 (integer or float) without a percent sign.
-        - If the resume is a perfect match for the job description, do not hesitate to score above 90.
-        """
-        
-        # Get response from Gemini
-        response_text = await call_gemini(prompt)
-        response_data = await extract_clean_json(response_text)
+        upload = await spool_upload(resume)
+        try:
+            cache_key = result_cache.make_key("resume-comprehensive", upload.sha256)
+            cached = await result_cache.get(cache_key)
+            if cached is None:
+                resume_text = await pdf_pool.extract(upload.source)
+                await index_resume_text(upload.sha256, resume.filename, resume_text)
+        finally:
+            upload.cleanup()
 
-        # Ensure all required keys are present
-        response_data = ensure_all_keys(response_data, REQUIRED_KEYS_JOB) 
-        response_data = ensure_string_values(response_data)       
-        base_score = normalize_score(response_data["score"])
-        boosted_score = (base_score * 0.85) + (keyword_score * 0.15)
-        response_data["score"] = round(boosted_score, 2)
+        if cached is not None:
+            logger.info("⚡ Streaming cached comprehensive resume analysis")
+
+            async def cached_events():
+                # Same events as a live stream: the analysis fields one by one, metadata such as
+                # analysisMode only in `complete`
+                for key in REQUIRED_KEYS_COMPREHENSIVE:
+                    if key in cached:
+                        yield sse_event("field", {"field": key, "value": cached[key]})
+                yield sse_event("complete", cached)
+
+            events = cached_events()
+        else:
+            # Built before the response starts so budgeting is reported in the headers
+            events = stream_comprehensive_analysis(comprehensive_analysis_prompt(resume_text), cache_key)
+
+        return StreamingResponse(
+            events,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-        logger.info("✅ Resume analysis completed successfully")
-        return ResumeAnalysisJobResponse(**response_data)
-    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error in resume analysis (job description): {str(e)}")
+        logger.error(f"❌ Error in streamed comprehensive resume analysis: {str(e)}")
         raise HTTPException(status_code=500, detail="Error processing your request")
 
-@app.post("/api/resume-analyzer/comprehensive", response_model=ResumeAnalysisComprehensiveResponse)
-async def analyze_resume_comprehensive(resume: UploadFile = File(...)):
-    """Provide comprehensive analysis of resume without specific job description"""
+async def run_linkedin_analysis(profile_text: str, mode: str = "monolithic") -> LinkedInOptimizerResponse:
+    """Optimization feedback for a LinkedIn profile's extracted text"""
+    if mode == "fanout":
+        response_data = await fanout_json("linkedin-optimizer", profile_text, LinkedInOptimizerResponse)
+    else:
+        response_data = await generate_json(linkedin_analysis_prompt(profile_text), LinkedInOptimizerResponse)
+    # Ensure all required keys are present
+    response_data = ensure_all_keys(response_data, REQUIRED_KEYS_LINKEDIN)
+    response_data = ensure_string_values(response_data)
+    # Convert profileStrengthScore to float if it's a string
+    response_data["profileStrengthScore"] = normalize_score(response_data["profileStrengthScore"])
+
+    with stage_timer("validation"):
+        return LinkedInOptimizerResponse(**response_data)
+
+def linkedin_analysis_prompt(profile_text: str) -> str:
+    # Create prompt for LLM
+    prompt_started = time.perf_counter()
+    prompt = f"""
+    You are a LinkedIn branding expert and career coach.
+    Evaluate the LinkedIn profile content and provide constructive, improvement-focused feedback.
+
+    Scoring guidance:
+    - Use the FULL range from 0 to 100.
+    - Exceptional profiles: 90–100.
+    - Strong profiles: 80–89.
+    - Good profiles: 75–79.
+    - Average profiles: 65–74.
+    - Weak profiles: below 65.
+    - Avoid clustering all scores between 70 and 79 – reward excellence, penalize weak points.
+
+    LINKEDIN PROFILE TEXT:
+    {budget_document(profile_text, "linkedin-optimizer")}
+
+    Return the result in EXACTLY this JSON format (all values must be strings except profileStrengthScore which must be a float):
+    {{
+        "profileStrengthScore": <number between 0-100>,
+        "headlineFeedback": "<feedback on profile headline optimization>",
+        "summaryFeedback": "<feedback on profile summary/about section>",
+        "experienceFeedback": "<feedback on experience section descriptions>",
+        "skillsFeedback": "<feedback on skills section and endorsements>",
+        "activityFeedback": "<feedback on posts, articles, and engagement>",
+        "keywordSuggestions": "<comma-separated keywords to include for SEO>",
+        "overallSuggestions": "<overall recommendations for profile optimization>"
+    }}
+    IMPORTANT:
+    - profileStrengthScore must be a raw number between 0 and 100 (integer or float) without a percent sign.
+    """
+    record_stage("prompt_build", prompt_started)
+    return prompt
+
+@app.post("/api/linkedin-optimizer", response_model=LinkedInOptimizerResponse)
+async def optimize_linkedin_profile(profile: UploadFile = File(...), mode: Optional[str] = Form(None)):
+    """
+    Analyze LinkedIn profile PDF and provide optimization feedback
+    (`mode=fanout` for parallel sub-prompts, `mode=lite` for the rule-based check)
+    """
     try:
-        logger.info("📊 Starting comprehensive resume analysis")
-        
-        # Extract text from resume PDF
-        resume_content = await resume.read()
-        resume_text = extract_text_from_pdf(resume_content)
-        
-        # Create prompt for LLM
-        prompt = f"""
-        You are an expert ATS (Applicant Tracking System) evaluator and career coach. 
-        Analyze the resume carefully and give constructive, actionable feedback.
-
-        Scoring guidance:
-        - Use the FULL range from 0 to 100.
-        - Exceptional quality resumes: 90–100.
-        - Strong resumes: 80–89.
-        - Good resumes: 75–79.
-        - Average resumes: 65–74.
-        - Below average resumes: below 65.
-        - Be fair – if a resume is truly outstanding, do not hesitate to score above 90.
-        - Avoid clustering all scores in a narrow range.
-
-        RESUME TEXT:
-        {resume_text}
-
-        Return the result in EXACTLY this JSON format (keys and structure must match exactly):
-        {{
-            "score": <number between 0-100>,
-            "comprehensiveAnalysis": "<detailed overall analysis of the resume>",
-            "summaryFeedback": "<feedback on the summary/objective>",
-            "skillsFeedback": "<feedback on skills relevance and presentation>",
-            "experienceFeedback": "<feedback on work experience relevance and impact>",
-            "educationFeedback": "<feedback on education background>",
-            "projectFeedback": "<feedback on projects and achievements>",
-            "jobRoleSuggestions": "<suggestions for better job role positioning>",
-            "overallSuggestions": "<overall recommendations for improvement>"
-        }}
-        IMPORTANT:
-        - The score must be a raw number between 0 and 100 (integer or float) without a percent sign.
-        """
+        logger.info("💼 Starting LinkedIn profile optimization")
+        mode = resolve_analysis_mode(mode)
         
-        # Get response from Gemini
-        response_text = await call_gemini(prompt)
-        response_data = await extract_clean_json(response_text)
+        # Extract text from LinkedIn profile PDF
+        upload = await spool_upload(profile)
+        try:
+            cache_key = document_analysis_key("linkedin-optimizer", upload.sha256, mode)
+            cached = await result_cache.get(cache_key) if mode != "lite" else None
+            if cached is not None:
+                logger.info("⚡ Returning cached LinkedIn profile optimization")
+                return LinkedInOptimizerResponse(**cached)
 
-        # Ensure all required keys are present
-        response_data = ensure_all_keys(response_data, REQUIRED_KEYS_COMPREHENSIVE)
-        response_data = ensure_string_values(response_data)
-        response_data["score"] = normalize_score(response_data["score"])
+            profile_text = await pdf_pool.extract(upload.source)
+        finally:
+            upload.cleanup()
         
-        logger.info("✅ Comprehensive resume analysis completed successfully")
-        return ResumeAnalysisComprehensiveResponse(**response_data)
+        if mode == "lite":
+            return lite_linkedin_analysis(profile_text)
+        result = await analysis_or_lite_fallback(
+            cache_key,
+            lambda: run_linkedin_analysis(profile_text, mode),
+            lambda analysis_mode: lite_linkedin_analysis(profile_text, analysis_mode),
+        )
+        logger.info("✅ LinkedIn profile optimization completed successfully")
+        return result
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error in comprehensive resume analysis: {str(e)}")
+        logger.error(f"❌ Error in LinkedIn optimization: {str(e)}")
         raise HTTPException(status_code=500, detail="Error processing your request")
 
-@app.post("/api/linkedin-optimizer", response_model=LinkedInOptimizerResponse)
-async def optimize_linkedin_profile(profile: UploadFile = File(...)):
-    """Analyze LinkedIn profile PDF and provide optimization feedback"""
+# Analyses the multi endpoint can run on one upload: requested name -> (result cache endpoint,
+# MultiAnalysisResponse field, supported modes)
+MULTI_ANALYSES = {
+    "comprehensive": ("resume-comprehensive", "comprehensive", ANALYSIS_MODES),
+    "job-description": ("resume-job-description", "jobDescription", JOB_DESCRIPTION_MODES),
+    "linkedin": ("linkedin-optimizer", "linkedin", ANALYSIS_MODES),
+}
+
+def requested_multi_analyses(analyses: str, job_description: Optional[str]) -> list:
+    """Parse the comma-separated `analyses` field, keeping the requested order"""
+    requested = list(dict.fromkeys(name.strip().lower() for name in analyses.split(",") if name.strip()))
+    if not requested or any(name not in MULTI_ANALYSES for name in requested):
+        raise HTTPException(
+            status_code=400,
+            detail=f"analyses must be a comma-separated list of: {', '.join(MULTI_ANALYSES)}",
+        )
+    if "job-description" in requested and not (job_description or "").strip():
+        raise HTTPException(status_code=400, detail="jobDescription is required for the job-description analysis")
+    return requested
+
+def multi_analysis_mode(name: str, mode: Optional[str]) -> str:
+    """The request's mode for one analysis; fan-out falls back to monolithic where it is not supported"""
+    supported = MULTI_ANALYSES[name][2]
+    if not mode:
+        return resolve_analysis_mode(None, supported)
+    return mode if mode in supported else "monolithic"
+
+async def prepare_multi_analyses(
+    upload_file: UploadFile, requested: list, job_description: Optional[str], mode: Optional[str]
+) -> dict:
+    """
+    Spool the upload and extract its text once (only when some analysis is not cached), then
+    return one coroutine factory per requested analysis. Each one follows its single endpoint:
+    same cache keys, single-flight and lite fallback.
+    """
+    mode = resolve_analysis_mode(mode) if mode else None
+    upload = await spool_upload(upload_file)
     try:
-        logger.info("💼 Starting LinkedIn profile optimization")
-        
-        # Extract text from LinkedIn profile PDF
-        profile_content = await profile.read()
-        profile_text = extract_text_from_pdf(profile_content)
-        
-        # Create prompt for LLM
-        prompt = f"""
-        You are a LinkedIn branding expert and career coach.
-        Evaluate the LinkedIn profile content and provide constructive, improvement-focused feedback.
-
-        Scoring guidance:
-        - Use the FULL range from 0 to 100.
-        - Exceptional profiles: 90–100.
-        - Strong profiles: 80–89.
-        - Good profiles: 75–79.
-        - Average profiles: 65–74.
-        - Weak profiles: below 65.
-        - Avoid clustering all scores between 70 and 79 – reward excellence, penalize weak points.
-
-        LINKEDIN PROFILE TEXT:
-        {profile_text}
-
-        Return the result in EXACTLY this JSON format (all values must be strings except profileStrengthScore which must be a float):
-        {{
-            "profileStrengthScore": <number between 0-100>,
-            "headlineFeedback": "<feedback on profile headline optimization>",
-            "summaryFeedback": "<feedback on profile summary/about section>",
-            "experienceFeedback": "<feedback on experience section descriptions>",
-            "skillsFeedback": "<feedback on skills section and endorsements>",
-            "activityFeedback": "<feedback on posts, articles, and engagement>",
-            "keywordSuggestions": "<comma-separated keywords to include for SEO>",
-            "overallSuggestions": "<overall recommendations for profile optimization>"
-        }}
-        IMPORTANT:
-        - profileStrengthScore must be a raw number between 0 and 100 (integer or float) without a percent sign.
-        """
-        
-        # Get response from Gemini
-        response_text = await call_gemini(prompt)
-        response_data = await extract_clean_json(response_text)
-        # Ensure all required keys are present
-        response_data = ensure_all_keys(response_data, REQUIRED_KEYS_LINKEDIN)
-        response_data = ensure_string_values(response_data)
-        # Convert profileStrengthScore to float if it's a string
-        response_data["profileStrengthScore"] = normalize_score(response_data["profileStrengthScore"])
+        cache_keys, modes, cached = {}, {}, {}
+        for name in requested:
+            endpoint = MULTI_ANALYSES[name][0]
+            modes[name] = multi_analysis_mode(name, mode)
+            if name == "job-description":
+                cache_keys[name] = result_cache.make_key(endpoint, upload.sha256, normalize_text_input(job_description))
+            else:
+                cache_keys[name] = document_analysis_key(endpoint, upload.sha256, modes[name])
+            cached[name] = await result_cache.get(cache_keys[name]) if modes[name] != "lite" else None
+
+        text = None
+        missing = [name for name in requested if cached[name] is None]
+        if missing:
+            text = await pdf_pool.extract(upload.source)
+            if any(name != "linkedin" for name in missing):
+                await index_resume_text(upload.sha256, upload_file.filename, text)
+    finally:
+        upload.cleanup()
+
+    def analysis(name: str):
+        if name == "comprehensive":
+            model = ResumeAnalysisComprehensiveResponse
+            run = lambda: run_comprehensive_analysis(text, modes[name])
+            lite = lambda analysis_mode="lite": lite_comprehensive_analysis(text, analysis_mode)
+        elif name == "job-description":
+            model = ResumeAnalysisJobResponse
+            run = lambda: run_job_description_analysis(text, job_description)
+            lite = lambda analysis_mode="lite": lite_job_description_analysis(text, job_description, analysis_mode)
+        else:
+            model = LinkedInOptimizerResponse
+            run = lambda: run_linkedin_analysis(text, modes[name])
+            lite = lambda analysis_mode="lite": lite_linkedin_analysis(text, analysis_mode)
+
+        async def analyze():
+            if cached[name] is not None:
+                return model(**cached[name])
+            if modes[name] == "lite":
+                return lite()
+            return await analysis_or_lite_fallback(cache_keys[name], run, lite)
+
+        return analyze
+
+    return {name: analysis(name) for name in requested}
+
+def multi_analysis_error(name: str, error: BaseException) -> HTTPException:
+    if isinstance(error, HTTPException):
+        return error
+    logger.error(f"❌ Error in multi analysis ({name}): {str(error)}")
+    return HTTPException(status_code=500, detail="Error processing your request")
+
+@app.post("/api/resume-analyzer/multi", response_model=MultiAnalysisResponse)
+async def analyze_resume_multi(
+    resume: UploadFile = File(...),
+    analyses: str = Form(...),
+    jobDescription: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
+):
+    """
+    Run several analyses (comma-separated `analyses`: comprehensive, job-description, linkedin)
+    on one uploaded PDF. The text is extracted once and the analyses run concurrently; one that
+    fails is reported under `errors` while the others are still returned.
+    """
+    try:
+        logger.info("📊 Starting multi analysis")
+        requested = requested_multi_analyses(analyses, jobDescription)
+        analysis_runs = await prepare_multi_analyses(resume, requested, jobDescription, mode)
+        outcomes = await asyncio.gather(*(analyze() for analyze in analysis_runs.values()), return_exceptions=True)
+
+        result = MultiAnalysisResponse()
+        errors = {}
+        for name, outcome in zip(requested, outcomes):
+            if isinstance(outcome, BaseException):
+                errors[name] = multi_analysis_error(name, outcome)
+            else:
+                setattr(result, MULTI_ANALYSES[name][1], outcome)
+        if len(errors) == len(requested):
+            raise next(iter(errors.values()))
+        result.errors = {name: error.detail for name, error in errors.items()}
+        logger.info(f"✅ Multi analysis completed ({len(requested) - len(errors)}/{len(requested)} succeeded)")
+        return result
 
-        logger.info("✅ LinkedIn profile optimization completed successfully")
-        return LinkedInOptimizerResponse(**response_data)
-    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error in LinkedIn optimization: {str(e)}")
+        logger.error(f"❌ Error in multi analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error processing your request")
+
+async def stream_multi_analyses(requested: list, analysis_runs: dict):
+    """SSE events for a multi analysis: one `analysis` (or `error`) event per analysis as it finishes, then `complete`"""
+    tasks = {asyncio.create_task(analyze()): name for name, analyze in analysis_runs.items()}
+    result = MultiAnalysisResponse()
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                if task.exception() is not None:
+                    error = multi_analysis_error(name, task.exception())
+                    result.errors[name] = error.detail
+                    yield sse_event("error", {"analysis": name, "status": error.status_code, "detail": error.detail})
+                else:
+                    setattr(result, MULTI_ANALYSES[name][1], task.result())
+                    yield sse_event("analysis", {"analysis": name, "result": task.result().model_dump()})
+        logger.info(f"✅ Streamed multi analysis completed ({len(requested) - len(result.errors)}/{len(requested)} succeeded)")
+        yield sse_event("complete", result.model_dump())
+    finally:
+        # The client went away mid-stream: stop the analyses it will never read
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+@app.post("/api/resume-analyzer/multi/stream")
+async def analyze_resume_multi_stream(
+    resume: UploadFile = File(...),
+    analyses: str = Form(...),
+    jobDescription: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
+):
+    """Multi analysis streamed as Server-Sent Events, one event per analysis in completion order"""
+    try:
+        logger.info("📊 Starting streamed multi analysis")
+        requested = requested_multi_analyses(analyses, jobDescription)
+        analysis_runs = await prepare_multi_analyses(resume, requested, jobDescription, mode)
+        return StreamingResponse(
+            stream_multi_analyses(requested, analysis_runs),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error in streamed multi analysis: {str(e)}")
         raise HTTPException(status_code=500, detail="Error processing your request")
 
+async def run_github_profile_analysis(username: str) -> GitHubProfileResponse:
+    """Fetch a user's repositories and analyze their tech stack and development practices"""
+    # Fetch user repositories
+    with stage_timer("github_fetch"):
+        repos = await fetch_github_user_repos(username)
+        language_bytes = await github_language_bytes(repos) if GITHUB_LANGUAGE_BYTES_ENABLED else Counter()
+    
+    # Prepare repository data for analysis
+    repo_data = []
+    languages = {}
+    creation_dates = []
+    
+    for repo in repos:
+        repo_info = {
+            "name": repo["name"],
+            "description": repo["description"] or "No description",
+            "language": repo["language"],
+            "created_at": repo["created_at"],
+            "updated_at": repo["updated_at"],
+            "stars": repo["stargazers_count"],
+            "forks": repo["forks_count"]
+        }
+        repo_data.append(repo_info)
+        
+        # Count languages
+        if repo["language"]:
+            languages[repo["language"]] = languages.get(repo["language"], 0) + 1
+        
+        # Track creation dates for activity chart
+        creation_dates.append(repo["created_at"][:7])  # YYYY-MM format
+    
+    # Weigh languages by bytes of code; repository counts by primary language only without them
+    if language_bytes:
+        languages = dict(language_bytes)
+
+    # Create Mermaid charts with simpler, more compatible syntax
+    # Prepare language distribution for charts
+    language_distribution_array = []
+    language_chart = "pie\n"
+    if languages:
+        for lang, count in sorted(languages.items(), key=lambda x: x[1], reverse=True)[:5]:
+            clean_lang = lang.replace('"', '').replace("'", "")
+            language_chart += f'    "{clean_lang}" : {count}\n'
+            language_distribution_array.append({"name": clean_lang, "value": count})
+    else:
+        language_chart += '    "No languages detected" : 1\n'
+        language_distribution_array.append({"name": "No languages detected", "value": 1})
+ 
+    # Activity chart (simplified) - using repository count per year instead
+    years = [date[:4] for date in creation_dates if date]  # Extract years
+    year_counts = Counter(years)
+    
+    activity_chart = "pie\n"
+    activity_distribution_array = []
+    if year_counts:
+        for year, count in sorted(year_counts.items())[-5:]:  # Last 5 years with activity
+            activity_chart += f'    "{year}" : {count}\n'
+            activity_distribution_array.append({"name": year, "value": count})
+    else:
+        activity_chart += '    "No activity data" : 1\n'
+        activity_distribution_array.append({"name": "No activity data", "value": 1})
+    
+    # Create prompt for LLM
+    prompt_started = time.perf_counter()
+    prompt = f"""
+    You are a senior engineering manager reviewing a candidate's GitHub profile. Analyze the following repository data to provide insights into their tech stack and development practices.
+
+    GITHUB PROFILE DATA:
+    Username: {username}
+    Number of repositories: {len(repos)}
+    
+    Repository Details:
+    {compact_repo_table(repo_data)}
+
+    CHART DATA PROVIDED:
+    Language Distribution Chart ({"bytes of code" if language_bytes else "repositories per primary language"}): {language_chart}
+    Repository Activity Chart: {activity_chart}
+
+    Please analyze the profile and provide a response in the following JSON format. ALL VALUES MUST BE STRINGS:
+    {{
+        "techStack": "<detailed analysis of the technology stack and programming languages used>",
+        "codeQualityInsights": "<insights about code quality based on repository structure, naming, descriptions, and activity>",
+        "languageDistributionChart": "{language_chart.strip()}",
+        "repositoryCreationActivityChart": "{activity_chart.strip()}",
+        "overallSuggestions": "<suggestions for improving the GitHub profile and development practices>"
+    }}
+
+    IMPORTANT: 
+    - Use the exact chart data provided above for languageDistributionChart and repositoryCreationActivityChart
+    - Do NOT modify the chart syntax - copy it exactly as shown
+    - All fields should be detailed string responses
+
+    Focus on:
+    1. Diversity and depth of technology stack
+    2. Project complexity and innovation
+    3. Consistency in development activity
+    4. Documentation quality (based on descriptions)
+    5. Open source contributions and collaboration
+    6. Professional presentation of work
+    """
+    record_stage("prompt_build", prompt_started)
+    
+    # Get response from Gemini
+    response_data = await generate_json(prompt, GitHubProfileResponse, fields=GITHUB_PROFILE_LLM_FIELDS)
+    response_data = ensure_string_values(response_data)
+    response_data["languageDistribution"] = language_distribution_array
+    response_data["languageDistributionChart"] = language_chart.strip()
+    response_data["repositoryCreationActivity"] = activity_distribution_array
+    response_data["repositoryCreationActivityChart"] = activity_chart.strip()
+    
+    with stage_timer("validation"):
+        return GitHubProfileResponse(**response_data)
+
 @app.post("/api/github-analyzer/profile", response_model=GitHubProfileResponse)
 async def analyze_github_profile(request: GitHubProfileRequest):
     """Analyze GitHub user profile for tech stack and code quality insights"""
     try:
         logger.info(f"🐙 Starting GitHub profile analysis for: {request.githubUsername}")
         
-        # Fetch user repositories
-        repos = await fetch_github_user_repos(request.githubUsername)
-        
-        # Prepare repository data for analysis
-        repo_data = []
-        languages = {}
-        creation_dates = []
-        
-        for repo in repos:
-            repo_info = {
-                "name": repo["name"],
-                "description": repo["description"] or "No description",
-                "language": repo["language"],
-                "created_at": repo["created_at"],
-                "updated_at": repo["updated_at"],
-                "stars": repo["stargazers_count"],
-                "forks": repo["forks_count"]
-            }
-            repo_data.append(repo_info)
-            
-            # Count languages
-            if repo["language"]:
-                languages[repo["language"]] = languages.get(repo["language"], 0) + 1
-            
-            # Track creation dates for activity chart
-            creation_dates.append(repo["created_at"][:7])  # YYYY-MM format
-        
-        # Create Mermaid charts with simpler, more compatible syntax
-        # Prepare language distribution for charts
-        language_distribution_array = []
-        language_chart = "pie\n"
-        if languages:
-            for lang, count in sorted(languages.items(), key=lambda x: x[1], reverse=True)[:5]:
-                clean_lang = lang.replace('"', '').replace("'", "")
-                language_chart += f'    "{clean_lang}" : {count}\n'
-                language_distribution_array.append({"name": clean_lang, "value": count})
-        else:
-            language_chart += '    "No languages detected" : 1\n'
-            language_distribution_array.append({"name": "No languages detected", "value": 1})
- 
-        # Activity chart (simplified) - using repository count per year instead
-        years = [date[:4] for date in creation_dates if date]  # Extract years
-        year_counts = Counter(years)
-        
-        activity_chart = "pie\n"
-        activity_distribution_array = []
-        if year_counts:
-            for year, count in sorted(year_counts.items())[-5:]:  # Last 5 years with activity
-                activity_chart += f'    "{year}" : {count}\n'
-                activity_distribution_array.append({"name": year, "value": count})
-        else:
-            activity_chart += '    "No activity data" : 1\n'
-            activity_distribution_array.append({"name": "No activity data", "value": 1})
-        
-        # Create prompt for LLM
-        prompt = f"""
-        You are a senior engineering manager reviewing a candidate's GitHub profile. Analyze the following repository data to provide insights into their tech stack and development practices.
+        cache_key = result_cache.make_key("github-profile", normalize_github_username(request.githubUsername))
+        cached = await result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("⚡ Returning cached GitHub profile analysis")
+            return GitHubProfileResponse(**cached)
 
-        GITHUB PROFILE DATA:
-        Username: {request.githubUsername}
-        Number of repositories: {len(repos)}
-        
-        Repository Details:
-        {json.dumps(repo_data, indent=2)}
-
-        CHART DATA PROVIDED:
-        Language Distribution Chart: {language_chart}
-        Repository Activity Chart: {activity_chart}
-
-        Please analyze the profile and provide a response in the following JSON format. ALL VALUES MUST BE STRINGS:
-        {{
-            "techStack": "<detailed analysis of the technology stack and programming languages used>",
-            "codeQualityInsights": "<insights about code quality based on repository structure, naming, descriptions, and activity>",
-            "languageDistributionChart": "{language_chart.strip()}",
-            "repositoryCreationActivityChart": "{activity_chart.strip()}",
-            "overallSuggestions": "<suggestions for improving the GitHub profile and development practices>"
-        }}
-
-        IMPORTANT: 
-        - Use the exact chart data provided above for languageDistributionChart and repositoryCreationActivityChart
-        - Do NOT modify the chart syntax - copy it exactly as shown
-        - All fields should be detailed string responses
-
-        Focus on:
-        1. Diversity and depth of technology stack
-        2. Project complexity and innovation
-        3. Consistency in development activity
-        4. Documentation quality (based on descriptions)
-        5. Open source contributions and collaboration
-        6. Professional presentation of work
-        """
-        
-        # Get response from Gemini
-        response_text = await call_gemini(prompt)
-        response_data = await extract_clean_json(response_text)
-        response_data = ensure_string_values(response_data)
-        response_data["languageDistribution"] = language_distribution_array
-        response_data["languageDistributionChart"] = language_chart.strip()
-        response_data["repositoryCreationActivity"] = activity_distribution_array
-        response_data["repositoryCreationActivityChart"] = activity_chart.strip()
-        
+        result = await coalesced_analysis(cache_key, lambda: run_github_profile_analysis(request.githubUsername))
         logger.info("✅ GitHub profile analysis completed successfully")
-        return GitHubProfileResponse(**response_data)
+        return result
     
     except HTTPException:
         raise
@@ -789,49 +5223,63 @@ async def analyze_github_profile(request: GitHubProfileRequest):
         logger.error(f"❌ Error in GitHub profile analysis: {str(e)}")
         raise HTTPException(status_code=500, detail="Error processing your request")
 
+async def run_github_repository_analysis(repository_url: str) -> GitHubRepoResponse:
+    """Fetch a repository's README and review its quality and clarity"""
+    # Fetch README content
+    with stage_timer("github_fetch"):
+        readme_content = await fetch_github_readme(repository_url)
+    
+    # Create prompt for LLM
+    prompt_started = time.perf_counter()
+    prompt = f"""
+    You are an experienced open-source project maintainer and documentation expert. Analyze the following repository README for quality, clarity, and completeness.
+
+    REPOSITORY URL: {repository_url}
+    
+    README CONTENT:
+    {budget_document(readme_content, "github-repository", kind="markdown")}
+
+    Please analyze the README and provide a response in the following JSON format:
+    {{
+        "purposeFeedback": "<feedback on how clearly the project purpose and goals are communicated>",
+        "documentationQualityFeedback": "<feedback on documentation quality, completeness, and clarity>",
+        "overallSuggestions": "<overall suggestions for improving the repository documentation>"
+    }}
+
+    Focus on:
+    1. Project description and purpose clarity
+    2. Installation and setup instructions
+    3. Usage examples and documentation
+    4. Contribution guidelines
+    5. Code organization and structure explanation
+    6. Professional presentation
+    7. Missing essential sections
+    8. Technical accuracy and completeness
+    """
+    record_stage("prompt_build", prompt_started)
+    
+    # Get response from Gemini
+    response_data = await generate_json(prompt, GitHubRepoResponse)
+    response_data = ensure_all_keys(response_data, REQUIRED_KEYS_REPO)
+    response_data = ensure_string_values(response_data)
+    with stage_timer("validation"):
+        return GitHubRepoResponse(**response_data)
+
 @app.post("/api/github-analyzer/repository", response_model=GitHubRepoResponse)
 async def analyze_github_repository(request: GitHubRepoRequest):
     """Analyze a single GitHub repository's README for quality and clarity"""
     try:
         logger.info(f"📖 Starting GitHub repository analysis for: {request.repositoryUrl}")
         
-        # Fetch README content
-        readme_content = await fetch_github_readme(request.repositoryUrl)
-        
-        # Create prompt for LLM
-        prompt = f"""
-        You are an experienced open-source project maintainer and documentation expert. Analyze the following repository README for quality, clarity, and completeness.
+        cache_key = result_cache.make_key("github-repository", normalize_repository_url(request.repositoryUrl))
+        cached = await result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("⚡ Returning cached GitHub repository analysis")
+            return GitHubRepoResponse(**cached)
 
-        REPOSITORY URL: {request.repositoryUrl}
-        
-        README CONTENT:
-        {readme_content}
-
-        Please analyze the README and provide a response in the following JSON format:
-        {{
-            "purposeFeedback": "<feedback on how clearly the project purpose and goals are communicated>",
-            "documentationQualityFeedback": "<feedback on documentation quality, completeness, and clarity>",
-            "overallSuggestions": "<overall suggestions for improving the repository documentation>"
-        }}
-
-        Focus on:
-        1. Project description and purpose clarity
-        2. Installation and setup instructions
-        3. Usage examples and documentation
-        4. Contribution guidelines
-        5. Code organization and structure explanation
-        6. Professional presentation
-        7. Missing essential sections
-        8. Technical accuracy and completeness
-        """
-        
-        # Get response from Gemini
-        response_text = await call_gemini(prompt)
-        response_data = await extract_clean_json(response_text)
-        response_data = ensure_all_keys(response_data, REQUIRED_KEYS_REPO)
-        response_data = ensure_string_values(response_data)
+        result = await coalesced_analysis(cache_key, lambda: run_github_repository_analysis(request.repositoryUrl))
         logger.info("✅ GitHub repository analysis completed successfully")
-        return GitHubRepoResponse(**response_data)
+        return result
     
     except HTTPException:
         raise
@@ -839,33 +5287,489 @@ async def analyze_github_repository(request: GitHubRepoRequest):
         logger.error(f"❌ Error in GitHub repository analysis: {str(e)}")
         raise HTTPException(status_code=500, detail="Error processing your request")
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+# Asynchronous job API: submit now, poll or subscribe for the result later
+JOB_DOCUMENT_KINDS = {"resume-job-description", "resume-comprehensive", "linkedin-optimizer"}
 
-@app.get("/models")
-async def list_available_models():
-    """List available Gemini models"""
+class JobStatusResponse(BaseModel):
+    jobId: str
+    kind: str
+    status: str
+    progress: str
+    attempts: int
+    createdAt: str
+    updatedAt: str
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+class JobStore:
+    """
+    Durable job queue in SQLite (WAL mode, safe to share between worker processes).
+    Jobs are claimed with a lease; a job whose worker died is picked up again once
+    its lease expires, so work survives restarts. The dedupe key (the result cache key)
+    is unique, so duplicate submissions map to the same job.
+    """
+
+    def __init__(self, db_path: str, data_dir: str, lease_seconds: float, max_attempts: int, retention_seconds: float):
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.owner = f"{os.uname().nodename if hasattr(os, 'uname') else 'local'}:{os.getpid()}"
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(self.data_dir, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, dedupe_key TEXT NOT NULL UNIQUE, "
+                "status TEXT NOT NULL, progress TEXT NOT NULL, params TEXT NOT NULL, document_path TEXT, "
+                "result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "lease_owner TEXT, lease_expires_at REAL, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+                "enqueued_at REAL)"
+            )
+            columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+            if "enqueued_at" not in columns:
+                try:
+                    self._db.execute("ALTER TABLE jobs ADD COLUMN enqueued_at REAL")
+                except sqlite3.OperationalError:
+                    pass  # Another worker process added it first
+            self._db.execute("UPDATE jobs SET enqueued_at = created_at WHERE enqueued_at IS NULL")
+            self._db.execute("DROP INDEX IF EXISTS jobs_claim")
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, enqueued_at)")
+        return self._db
+
+    def submit(self, kind: str, dedupe_key: str, params: dict, document: Optional[SpooledUpload] = None) -> tuple:
+        """Create a job, or return the existing one for the same input. Returns (job, created)."""
+        with self._lock:
+            db = self._connect()
+            existing = db.execute("SELECT * FROM jobs WHERE dedupe_key = ?", (dedupe_key,)).fetchone()
+            if existing is not None and existing["status"] != "failed":
+                return dict(existing), False
+
+            job_id = existing["id"] if existing is not None else uuid.uuid4().hex
+            document_path = None
+            if document is not None:
+                document_path = os.path.join(self.data_dir, f"{job_id}.pdf")
+                if document.path:
+                    shutil.move(document.path, document_path)
+                    document.path = None
+                else:
+                    with open(document_path, "wb") as handle:
+                        handle.write(document.data)
+            now = time.time()
+            if existing is not None:
+                # Resubmitting a failed job retries it, behind the jobs already waiting
+                db.execute(
+                    "UPDATE jobs SET status = 'queued', progress = 'queued', params = ?, document_path = ?, "
+                    "result = NULL, error = NULL, attempts = 0, lease_owner = NULL, lease_expires_at = NULL, "
+                    "enqueued_at = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(params), document_path, now, now, job_id),
+                )
+            else:
+                db.execute(
+                    "INSERT INTO jobs (id, kind, dedupe_key, status, progress, params, document_path, created_at, "
+                    "updated_at, enqueued_at) VALUES (?, ?, ?, 'queued', 'queued', ?, ?, ?, ?, ?)",
+                    (job_id, kind, dedupe_key, json.dumps(params), document_path, now, now, now),
+                )
+            return dict(db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()), True
+
+    def claim(self) -> Optional[dict]:
+        """
+        Take the job queued longest (by when it was last queued, so a resubmitted or retried job
+        waits its turn), or one whose lease has expired. An expired job that has already used
+        all its attempts (its worker keeps dying on it) is failed instead.
+        """
+        with self._lock:
+            db = self._connect()
+            now = time.time()
+            exhausted = []
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                exhausted = [
+                    row["document_path"] for row in db.execute(
+                        "SELECT document_path FROM jobs WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                        (now, self.max_attempts),
+                    ).fetchall()
+                ]
+                if exhausted:
+                    db.execute(
+                        "UPDATE jobs SET status = 'failed', progress = 'failed', "
+                        "error = 'Job worker stopped responding on every attempt', lease_owner = NULL, "
+                        "lease_expires_at = NULL, document_path = NULL, updated_at = ? "
+                        "WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                        (now, now, self.max_attempts),
+                    )
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND lease_expires_at < ? AND attempts < ?) ORDER BY enqueued_at LIMIT 1",
+                    (now, self.max_attempts),
+                ).fetchone()
+                if row is None:
+                    db.execute("COMMIT")
+                    for path in exhausted:
+                        self._remove_document(path)
+                    return None
+                db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                    (self.owner, now + self.lease_seconds, now, row["id"]),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        for path in exhausted:
+            self._remove_document(path)
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def set_progress(self, job_id: str, progress: str):
+        with self._lock:
+            now = time.time()
+            self._connect().execute(
+                "UPDATE jobs SET progress = ?, lease_expires_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (progress, now + self.lease_seconds, now, job_id, self.owner),
+            )
+
+    def finish(self, job: dict, result: Optional[dict] = None, error: Optional[str] = None, retry: bool = False):
+        with self._lock:
+            db = self._connect()
+            now = time.time()
+            # Only while we still hold the lease: once it expired another worker may own the job
+            if retry and job["attempts"] < self.max_attempts:
+                db.execute(
+                    "UPDATE jobs SET status = 'queued', progress = 'retrying', error = ?, lease_owner = NULL, "
+                    "lease_expires_at = NULL, enqueued_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                    (error, now, now, job["id"], self.owner),
+                )
+                return
+            status = "completed" if error is None else "failed"
+            finished = db.execute(
+                "UPDATE jobs SET status = ?, progress = ?, result = ?, error = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, document_path = NULL, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (status, status, json.dumps(result) if result is not None else None, error, now, job["id"], self.owner),
+            ).rowcount
+        if finished:
+            self._remove_document(job.get("document_path"))
+        else:
+            logger.warning(f"⚠️ Lease on job {job['id']} was lost, leaving it to its new worker")
+
+    def release_owned(self):
+        """On graceful shutdown hand our running jobs straight back to the queue"""
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', progress = 'queued', attempts = MAX(attempts - 1, 0), "
+                "lease_owner = NULL, lease_expires_at = NULL, updated_at = ? WHERE status = 'running' AND lease_owner = ?",
+                (time.time(), self.owner),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            db = self._connect()
+            cutoff = time.time() - self.retention_seconds
+            removed = db.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?", (cutoff,)
+            ).rowcount
+        return removed
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def _remove_document(self, path: Optional[str]):
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+def job_to_response(job: dict) -> JobStatusResponse:
+    return JobStatusResponse(
+        jobId=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        progress=job["progress"],
+        attempts=job["attempts"],
+        createdAt=datetime.fromtimestamp(job["created_at"]).isoformat(),
+        updatedAt=datetime.fromtimestamp(job["updated_at"]).isoformat(),
+        result=json.loads(job["result"]) if job.get("result") else None,
+        error=job.get("error"),
+    )
+
+class JobWorkerPool:
+    """Local asyncio workers that drain the durable job queue"""
+
+    def __init__(self, store: JobStore, workers: int, poll_interval: float):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+        self._listeners = {}  # job id -> set of asyncio.Event for SSE subscribers in this process
+        self.processed = 0
+        self.failed = 0
+
+    def start(self):
+        if self._tasks or self.workers <= 0:
+            return
+        self._tasks = [asyncio.create_task(self._run(number)) for number in range(self.workers)]
+        logger.info(f"🧰 Job workers started ({self.workers})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(self.store.release_owned)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def notify(self, job_id: str):
+        for event in self._listeners.get(job_id, ()):
+            event.set()
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        event = asyncio.Event()
+        self._listeners.setdefault(job_id, set()).add(event)
+        return event
+
+    def unsubscribe(self, job_id: str, event: asyncio.Event):
+        listeners = self._listeners.get(job_id)
+        if listeners is not None:
+            listeners.discard(event)
+            if not listeners:
+                del self._listeners[job_id]
+
+    async def _run(self, number: int):
+        last_purge = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_purge > 3600:
+                    last_purge = time.monotonic()
+                    await asyncio.to_thread(self.store.purge_expired)
+                job = await asyncio.to_thread(self.store.claim)
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Job worker {number} error: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _progress(self, job: dict, progress: str):
+        await asyncio.to_thread(self.store.set_progress, job["id"], progress)
+        self.notify(job["id"])
+
+    async def _process(self, job: dict):
+        logger.info(f"🧰 Processing job {job['id']} ({job['kind']}, attempt {job['attempts']})")
+        # Stage metrics of queued work are labelled by job kind instead of a route
+        request_endpoint.set(f"job:{job['kind']}")
+        try:
+            result = await execute_job(job, self._progress)
+        except HTTPException as e:
+            # Client errors (bad PDF, unknown user) will not succeed on retry
+            self.failed += 1
+            await asyncio.to_thread(
+                self.store.finish, job, error=str(e.detail), retry=e.status_code >= 500
+            )
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"❌ Job {job['id']} failed: {str(e)}")
+            await asyncio.to_thread(self.store.finish, job, error="Error processing your request", retry=True)
+        else:
+            self.processed += 1
+            await asyncio.to_thread(self.store.finish, job, result=result)
+            logger.info(f"✅ Job {job['id']} completed")
+        self.notify(job["id"])
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "running": bool(self._tasks), "processed": self.processed, "failed": self.failed}
+
+def job_analysis_mode() -> str:
+    # Jobs exist to get the full LLM analysis, so a lite default does not apply to them
+    return resolve_analysis_mode(None, ("monolithic", "fanout"))
+
+async def execute_job(job: dict, report_progress) -> dict:
+    """Run one queued analysis, reusing the result cache the synchronous endpoints fill"""
+    cached = await result_cache.get(job["dedupe_key"])
+    if cached is not None:
+        return cached
+
+    kind = job["kind"]
+    params = json.loads(job["params"])
+    if kind in JOB_DOCUMENT_KINDS:
+        if not job.get("document_path") or not os.path.exists(job["document_path"]):
+            raise HTTPException(status_code=410, detail="Uploaded document is no longer available")
+        await report_progress(job, "extracting")
+        text = await pdf_pool.extract(job["document_path"])
+        if kind != "linkedin-optimizer" and params.get("sha256"):
+            await index_resume_text(params["sha256"], params.get("filename"), text)
+        await report_progress(job, "analyzing")
+        mode = job_analysis_mode()
+        if kind == "resume-job-description":
+            analyze = lambda: run_job_description_analysis(text, params["jobDescription"])
+        elif kind == "resume-comprehensive":
+            analyze = lambda: run_comprehensive_analysis(text, mode)
+        else:
+            analyze = lambda: run_linkedin_analysis(text, mode)
+    elif kind == "github-profile":
+        await report_progress(job, "analyzing")
+        analyze = lambda: run_github_profile_analysis(params["githubUsername"])
+    elif kind == "github-repository":
+        await report_progress(job, "analyzing")
+        analyze = lambda: run_github_repository_analysis(params["repositoryUrl"])
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {kind}")
+
+    # Shares the computation with a synchronous request for the same input that is already running
+    result = await coalesced_analysis(job["dedupe_key"], analyze)
+    return result.model_dump()
+
+job_store = JobStore(
+    db_path=os.getenv("JOBS_DB_PATH", "careerai_jobs.sqlite3"),
+    data_dir=os.getenv("JOBS_DATA_DIR", "job_documents"),
+    lease_seconds=env_float("JOB_LEASE_SECONDS", 300.0),
+    max_attempts=env_int("JOB_MAX_ATTEMPTS", 3),
+    retention_seconds=env_float("JOB_RETENTION_SECONDS", 24 * 3600),
+)
+job_workers = JobWorkerPool(
+    job_store,
+    workers=env_int("JOB_WORKERS", 2),
+    poll_interval=env_float("JOB_POLL_INTERVAL_SECONDS", 1.0),
+)
+
+async def submit_job(kind: str, dedupe_key: str, params: dict, document: Optional[SpooledUpload] = None) -> JSONResponse:
     try:
-        models = genai.list_models()
-        available_models = []
-        for model in models:
-            if 'generateContent' in model.supported_generation_methods:
-                available_models.append({
-                    "name": model.name,
-                    "display_name": model.display_name,
-                    "supported_methods": model.supported_generation_methods
-                })
-        return {"available_models": available_models}
-    except Exception as e:
-        logger.error(f"Error listing models: {str(e)}")
-        return {"error": "Could not fetch available models", "detail": str(e)}
+        job, created = await asyncio.to_thread(job_store.submit, kind, dedupe_key, params, document)
+    finally:
+        if document is not None:
+            document.cleanup()
+    if created:
+        logger.info(f"🧰 Queued job {job['id']} ({kind})")
+        job_workers.wake()
+    else:
+        logger.info(f"🧰 Duplicate submission mapped to job {job['id']} ({job['status']})")
+    return JSONResponse(status_code=202, content=job_to_response(job).model_dump())
 
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {"message": "CareerAI Toolkit API", "version": "1.0.0"}
+@app.post("/api/jobs/resume-analyzer/job-description", status_code=202, response_model=JobStatusResponse)
+async def submit_resume_job_description_job(
+    resume: UploadFile = File(...),
+    jobDescription: str = Form(...)
+):
+    """Queue a resume-vs-job-description analysis and return its job id immediately"""
+    upload = await spool_upload(resume)
+    dedupe_key = result_cache.make_key("resume-job-description", upload.sha256, normalize_text_input(jobDescription))
+    params = {"jobDescription": jobDescription, "sha256": upload.sha256, "filename": resume.filename}
+    return await submit_job("resume-job-description", dedupe_key, params, upload)
+
+@app.post("/api/jobs/resume-analyzer/comprehensive", status_code=202, response_model=JobStatusResponse)
+async def submit_resume_comprehensive_job(resume: UploadFile = File(...)):
+    """Queue a comprehensive resume analysis and return its job id immediately"""
+    upload = await spool_upload(resume)
+    dedupe_key = document_analysis_key("resume-comprehensive", upload.sha256, job_analysis_mode())
+    params = {"sha256": upload.sha256, "filename": resume.filename}
+    return await submit_job("resume-comprehensive", dedupe_key, params, upload)
+
+@app.post("/api/jobs/linkedin-optimizer", status_code=202, response_model=JobStatusResponse)
+async def submit_linkedin_optimizer_job(profile: UploadFile = File(...)):
+    """Queue a LinkedIn profile optimization and return its job id immediately"""
+    upload = await spool_upload(profile)
+    dedupe_key = document_analysis_key("linkedin-optimizer", upload.sha256, job_analysis_mode())
+    return await submit_job("linkedin-optimizer", dedupe_key, {}, upload)
+
+@app.post("/api/jobs/github-analyzer/profile", status_code=202, response_model=JobStatusResponse)
+async def submit_github_profile_job(request: GitHubProfileRequest):
+    """Queue a GitHub profile analysis and return its job id immediately"""
+    dedupe_key = result_cache.make_key("github-profile", normalize_github_username(request.githubUsername))
+    return await submit_job("github-profile", dedupe_key, {"githubUsername": request.githubUsername})
+
+@app.post("/api/jobs/github-analyzer/repository", status_code=202, response_model=JobStatusResponse)
+async def submit_github_repository_job(request: GitHubRepoRequest):
+    """Queue a GitHub repository analysis and return its job id immediately"""
+    dedupe_key = result_cache.make_key("github-repository", normalize_repository_url(request.repositoryUrl))
+    return await submit_job("github-repository", dedupe_key, {"repositoryUrl": request.repositoryUrl})
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """Current status of a job, including the result once it has completed"""
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_response(job)
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Server-Sent Events: a status event on every change, ending with completed or failed"""
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        changed = job_workers.subscribe(job_id)
+        last_seen = None
+        last_sent_at = time.monotonic()
+        try:
+            while True:
+                current = await asyncio.to_thread(job_store.get, job_id)
+                if current is None:
+                    yield sse_event("failed", {"jobId": job_id, "error": "Job expired"})
+                    return
+                snapshot = (current["status"], current["progress"], current["attempts"])
+                if snapshot != last_seen:
+                    last_seen = snapshot
+                    last_sent_at = time.monotonic()
+                    response = job_to_response(current).model_dump()
+                    if current["status"] in ("completed", "failed"):
+                        yield sse_event(current["status"], response)
+                        return
+                    yield sse_event("status", response)
+                elif time.monotonic() - last_sent_at > 15:
+                    last_sent_at = time.monotonic()
+                    yield ": keep-alive\n\n"
+                if await request.is_disconnected():
+                    return
+                changed.clear()
+                try:
+                    # Woken immediately by local workers; polling covers other processes
+                    await asyncio.wait_for(changed.wait(), timeout=job_workers.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            job_workers.unsubscribe(job_id, changed)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 if __name__ == "__main__":
     print("🚀 Starting server with uvicorn...")